@@ -0,0 +1,7 @@
+# Los subpaquetes de cada proveedor se importan bajo demanda (por ejemplo al acceder a api_caller.banxico)
+from ._lazy import lazy_exports
+
+_EXPORTS = {'baseapi': '.baseapi', 'banxico': '.banxico', 'fed': '.fed', 'inegi': '.inegi', 'bis': '.bis', 'wrldbank': '.wrldbank', 'QueryPlanner': '.query', 'StaleWhileRevalidate': '.serving', 'ServedResult': '.serving'}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
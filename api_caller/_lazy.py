@@ -0,0 +1,71 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+import importlib
+
+# Clase ----------------------------------------------------------------------------------------
+
+class LazyModule:
+    """
+    Referencia a un modulo que solo se importa al acceder al primero de sus atributos. Permite escribir
+    'pd = LazyModule("pandas")' al inicio de un modulo y usar 'pd.DataFrame' normalmente, sin pagar el costo de
+    importar pandas hasta que realmente se necesita.
+    """
+
+    def __init__(self, name:str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attribute:str):
+        # Solo se llega aqui la primera vez que se pide cada atributo; despues se lee directo del diccionario
+        value = getattr(self._load(), attribute)
+        self.__dict__[attribute] = value
+        return value
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'cargado' if self.__dict__['_module'] is not None else 'sin cargar'
+        return f"<LazyModule {self.__dict__['_name']!r} ({state})>"
+
+
+# Funciones ------------------------------------------------------------------------------------
+
+def lazy_exports(package:str, exports:dict):
+    """
+    Crea las funciones __getattr__ y __dir__ de un paquete cuyos nombres publicos se importan bajo demanda.
+
+    Args:
+        package (str): El nombre del paquete (__name__).
+        exports (dict): Diccionario {nombre publico: submodulo relativo}, por ejemplo {'Banxico_SIE': '.sie'}.
+
+    Returns:
+        tuple: Las funciones __getattr__ y __dir__ del paquete.
+
+    Example:
+        >>> __getattr__, __dir__ = lazy_exports(__name__, {'Banxico_SIE': '.sie'})
+    """
+
+    def __getattr__(name:str):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module = importlib.import_module(exports[name], package)
+
+        # Un nombre igual al del submodulo exporta el submodulo completo (por ejemplo api_caller.banxico)
+        value = module if exports[name].lstrip('.') == name else getattr(module, name)
+
+        # Se guarda en el paquete para que los siguientes accesos no pasen por __getattr__
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(exports) | set(vars(importlib.import_module(package))))
+
+    return __getattr__, __dir__
@@ -1 +1,6 @@
-from .sie import Banxico_SIE  # Importa BanxicoSIE directamente
+from .._lazy import lazy_exports
+
+_EXPORTS = {'Banxico_SIE': '.sie', 'AsyncBanxico_SIE': '.sie'}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,16 +1,41 @@
 
 # Librerias necesarias -------------------------------------------------------------------------
 
-import pandas as pd
+from __future__ import annotations
+
+import math
+import asyncio
+from functools import partial
+from operator import itemgetter
 from ..baseapi.baseapi import BaseAPI
+from ..baseapi.frames import build_frame
+from ..baseapi.columnar import ColumnarSeries
+from ..baseapi.parsing import parse_observations, parse_dates
+from ..baseapi.streaming import stream_series
+from ..baseapi.asyncapi import AsyncBaseAPI
+
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+pd = LazyModule('pandas')
 
 # Clase ---------------------------------------------------------------------------------------
 
 class Banxico_SIE(BaseAPI):
-    def __init__(self, api_key):
-        super().__init__(api_key, "https://www.banxico.org.mx/SieAPIRest/service/v1")
+    provider = 'banxico'
+
+    # Limites de la API del SIE para una sola solicitud
+    MAX_SERIES_PER_REQUEST = 20
+    MAX_URL_LENGTH = 2000
+
+    def __init__(self, api_key, **kwargs):
+        super().__init__(api_key, "https://www.banxico.org.mx/SieAPIRest/service/v1", **kwargs)
+
+    def _set_series_params(self, serie_id:str | list,  last_data:bool=False, start_date:str=None, end_date:str=None, percentage_change:str=None, no_decimals:bool=False, get_series_metadata:bool=False) -> tuple:
 
-    def _set_series_params(self, serie_id:str | list,  last_data:bool=False, start_date:str=None, end_date:str=pd.Timestamp.today().strftime('%Y-%m-%d'), percentage_change:str=None, no_decimals:bool=False, get_series_metadata:bool=False) -> tuple:
+        # La fecha de fin por defecto es el dia de hoy. Se calcula en cada llamada y no al importar el modulo
+        if end_date is None:
+            end_date = pd.Timestamp.today().strftime('%Y-%m-%d')
         
         # Encabezados para la solicitud con el token de la API
         headers = {
@@ -83,6 +108,10 @@ class Banxico_SIE(BaseAPI):
             # Definir la URL de la API en un rango de fechas
             endpoint += f"/datos/{start_date}/{end_date}"
 
+        else:
+            # Sin fecha de inicio se solicita la serie completa; la fecha de fin se aplica al armar el resultado
+            endpoint += f"/datos"
+
         
         # Definir los parámetros adicionales si se proporcionan
         additional_params = []
@@ -100,16 +129,80 @@ class Banxico_SIE(BaseAPI):
             endpoint = f"{endpoint}?{additional_params_str}"
 
         return endpoint, headers
-    
+
+
+    def _plan_batches(self, serie_id:str | list, **params) -> list:
+        """
+        Divide una lista de IDs en lotes que respetan el numero maximo de series por solicitud y la longitud maxima de la URL.
+        Primero se calcula el numero minimo de lotes y despues los IDs se reparten de forma equilibrada entre ellos, para que
+        las solicitudes concurrentes tarden lo mismo.
+
+        Args:
+            serie_id (str | list): El ID de la serie o una lista de IDs de series.
+            **params: Los demas argumentos de _set_series_params.
+
+        Returns:
+            list: Una lista de tuplas (endpoint, headers), una por lote.
+        """
+
+        serie_id = self._validate_serie_id(serie_id)
+
+        if len(serie_id) <= 1:
+            return [self._set_series_params(serie_id, **params)]
+
+        # Espacio disponible para los IDs en la URL, descontando la URL base y el resto de la ruta
+        probe_endpoint, _ = self._set_series_params(serie_id[:1], **params)
+        budget = self.MAX_URL_LENGTH - len(self.base_url) - len(probe_endpoint) + len(serie_id[0])
+
+        # Reparto voraz para obtener el numero minimo de lotes
+        batches, current, length = [], [], 0
+        for id in serie_id:
+            extra = len(id) + (1 if current else 0)
+            if current and (len(current) == self.MAX_SERIES_PER_REQUEST or length + extra > budget):
+                batches.append(current)
+                current, length, extra = [], 0, len(id)
+            current.append(id)
+            length += extra
+        batches.append(current)
+
+        # Reparto equilibrado con el mismo numero de lotes, si respeta los limites
+        if len(batches) > 1:
+            size = math.ceil(len(serie_id) / len(batches))
+            balanced = [serie_id[i:i + size] for i in range(0, len(serie_id), size)]
+            if len(balanced) == len(batches) and all(len(','.join(batch)) <= budget for batch in balanced):
+                batches = balanced
+
+        return [self._set_series_params(batch, **params) for batch in batches]
+
+
+    def _validate_serie_id(self, serie_id:str | list) -> list:
+
+        # Validar los tipos de datos de las series
+        if isinstance(serie_id, str):
+            serie_id = [serie_id]
+        elif not (isinstance(serie_id, list) and all(isinstance(i, str) for i in serie_id)):
+            raise ValueError("El 'serie_id' debe ser una cadena de texto o una lista de cadenas de texto.")
+
+        return serie_id
+
+
+    def _merge_responses(self, responses:list) -> dict:
+        # Une las respuestas de varios lotes en una sola estructura como la que devuelve la API
+        return {'bmx': {'series': [serie for response in responses for serie in response['bmx']['series']]}}
 
     
-    def get_series_metadata(self, serie_id:str | list) -> dict:
+    def get_series_metadata(self, serie_id:str | list, max_workers:int=4, refresh:bool=False) -> dict:
         """
-        Obtiene los metadatos de una serie económica desde la API de Banxico (SIE).
+        Obtiene los metadatos de una serie económica desde la API de Banxico (SIE). Los metadatos se guardan en el
+        registro de metadatos del conector y solo se consultan a la API los IDs que no estan en el registro.
 
         Args:
             serie_id (str | list): El ID de la serie o una lista de IDs de series a consultar desde la API de Banxico. 
                                 Si se proporciona un solo ID, puede ser una cadena de texto (str).
+            max_workers (int, optional): Numero de lotes que se solicitan en paralelo cuando la lista de IDs excede
+                                los limites de una sola solicitud. Por defecto es 4.
+            refresh (bool, optional): Si se establece en True, se ignoran los metadatos del registro y se vuelven a consultar.
+                                Por defecto es False.
 
         Returns:
             dict: Un diccionario con informacion de la serie
@@ -121,9 +214,38 @@ class Banxico_SIE(BaseAPI):
             >>> metadata = get_series_metadata(serie_id='SF43718')
         """
         
-        # Definir la URL de la API con el ID de la serie para obtener los metadatos de las series y realizar la solicitud
-        endpoint, headers = self._set_series_params(serie_id, get_series_metadata=True)
-        metadata_json = self._make_request(endpoint, headers=headers)
+        serie_id = self._validate_serie_id(serie_id)
+        if refresh:
+            self.metadata_registry.invalidate(self.provider, serie_id)
+
+        # Consultar primero el registro de metadatos
+        metadata, missing = self.metadata_registry.get_many(self.provider, serie_id)
+        if not missing:
+            return metadata
+
+        # Definir las URLs de la API por lote de series faltantes para obtener los metadatos y realizar las solicitudes
+        calls = [{'endpoint': endpoint, 'headers': headers} for endpoint, headers in self._plan_batches(missing, get_series_metadata=True)]
+        metadata_json = self._merge_responses(self._make_requests(calls, max_workers=max_workers))
+        
+        fetched = self._parse_series_metadata(metadata_json)
+        self.metadata_registry.update(self.provider, fetched)
+        metadata.update(fetched)
+
+        return metadata
+
+
+    def prefetch_metadata(self, serie_id:str | list, max_workers:int=4) -> dict:
+        """
+        Carga por adelantado en el registro los metadatos de un conjunto de series, de modo que las consultas de datos
+        posteriores no necesiten solicitarlos.
+
+        Example:
+            >>> banxico_api.prefetch_metadata(['SF43718', 'SF61745', 'SP68257'])
+        """
+        return self.get_series_metadata(serie_id, max_workers=max_workers)
+
+
+    def _parse_series_metadata(self, metadata_json:dict) -> dict:
         
         # Inicializar un diccionario para almacenar los metadatos
         series_dict = {}
@@ -136,9 +258,10 @@ class Banxico_SIE(BaseAPI):
     
 
     # Función para obtener los datos de una serie desde la API de Banxico
-    def get_series_data(self, serie_id:str | list, last_data:bool=False, start_date:str=None, end_date:str=pd.Timestamp.today().strftime('%Y-%m-%d'), percentage_change:str=None, no_decimals:bool=False) -> pd.DataFrame:
+    def get_series_data(self, serie_id:str | list, last_data:bool=False, start_date:str=None, end_date:str=None, percentage_change:str=None, no_decimals:bool=False, max_workers:int=4, stream:bool=False, columnar:bool=False) -> pd.DataFrame | list:
         """
         Obtiene datos de series económicas desde la API de Banxico (SIE) y los devuelve en un DataFrame de pandas.
+        Las listas grandes de IDs se dividen automaticamente en lotes que respetan los limites de la API.
 
         Args:
             serie_id (str | list): El ID de la serie o una lista de IDs de series a consultar desde la API de Banxico. 
@@ -146,13 +269,19 @@ class Banxico_SIE(BaseAPI):
             last_data (bool, optional): Si se establece en True, obtendrá solo las últimas observaciones disponibles de la serie.
                                     Por defecto es False.
             start_date (datetime, optional): La fecha de inicio de consulta tipo datetime para obtener datos en formato 'YYYY-MM-DD'. 
-                                            Por defecto es '2000-01-01'.
+                                            Por defecto se obtiene la serie completa.
             end_date (datetime, optional): La fecha de fin de consulta tipo datetime  para obtener datos en formato 'YYYY-MM-DD'.
                                             Por defecto es la fecha actual.
             percentage_change (str, optional): Parámetro opcional que define si se desea obtener los incrmentos porcentuales de datos de la serie con respecto a observaciones anteriores
                                     ('PorcObsAnt', 'PorcAnual', 'PorcAcumAnual'). Por defecto es None.
             no_decimals (bool, optional): Si se establece en True, los datos se devolverán sin decimales. 
                                             Por defecto es False.
+            max_workers (int, optional): Numero de lotes que se solicitan en paralelo. Por defecto es 4.
+            stream (bool, optional): Si se establece en True, las respuestas se leen de forma incremental y las observaciones
+                                            se convierten por bloques, reduciendo el pico de memoria en descargas grandes. Los lotes
+                                            se leen uno a la vez y no pasan por la cache. Requiere la libreria 'ijson'. Por defecto es False.
+            columnar (bool, optional): Si se establece en True, devuelve una lista de ColumnarSeries en lugar de un DataFrame.
+                                            Ocupa menos memoria al mantener muchas series. Por defecto es False.
 
         Returns:
             pandas.DataFrame: Un DataFrame con las series obtenidas. Las columnas representan las series, y las filas 
@@ -170,55 +299,97 @@ class Banxico_SIE(BaseAPI):
             >>> df, dict = get_SIE_data(serie_id='SF43718', start_date='2020-01-01', end_date='2023-01-01', percentage_change='PorcAnual')
         """
 
+        # La fecha de fin por defecto es el dia de hoy
+        if end_date is None:
+            end_date = pd.Timestamp.today().strftime('%Y-%m-%d')
+
         # Ajuste para datos trimestrales
-        if not last_data:
+        if not last_data and start_date is not None:
             start_date = pd.to_datetime(start_date) + pd.DateOffset(months=-2)
         
-        # Definir la URL de la API con el ID de la serie para obtener los datos de las series y realizar la solicitud
-        endpoint_datos, headers = self._set_series_params(serie_id, last_data, start_date, end_date, percentage_change, no_decimals)
-        data_json = self._make_request(endpoint_datos, headers=headers)
+        # Definir las URLs de la API por lote de series
+        batches = self._plan_batches(serie_id, last_data=last_data, start_date=start_date, end_date=end_date, percentage_change=percentage_change, no_decimals=no_decimals)
 
-        # Definir la URL de la API con el ID de la serie para obtener los metadatos de las series y realizar la solicitud
-        metadata = self.get_series_metadata(serie_id)
-        
-        # Inicializar un DataFrame vacío para almacenar los datos de las series
-        series_df = pd.DataFrame()
+        if stream:
+            metadata = self.get_series_metadata(serie_id, max_workers=max_workers)
+            return self._assemble_series_data(self._stream_series_data(batches), metadata, last_data, start_date, end_date, columnar)
 
-        for serie_data in data_json['bmx']['series']:
+        # Los metadatos (necesarios para la periodicidad) se toman del registro. Los que falten se solicitan junto con los datos
+        metadata, missing = self.metadata_registry.get_many(self.provider, self._validate_serie_id(serie_id))
+        metadata_batches = self._plan_batches(missing, get_series_metadata=True) if missing else []
 
-            serie_id = serie_data['idSerie']
+        # Realizar todas las solicitudes en una sola ronda y separar las respuestas de datos y de metadatos
+        calls = [{'endpoint': endpoint, 'headers': headers} for endpoint, headers in batches + metadata_batches]
+        responses = self._make_requests(calls, max_workers=max_workers)
+        data_json = self._merge_responses(responses[:len(batches)])
 
-            # Extraer datos de la serie
-            serie_data = serie_data['datos']
+        if missing:
+            fetched = self._parse_series_metadata(self._merge_responses(responses[len(batches):]))
+            self.metadata_registry.update(self.provider, fetched)
+            metadata.update(fetched)
 
-            # Extraer los valores y las fechas
-            obs_values = [float(entry['dato'].replace(",", "")) if entry['dato'] != 'N/E' else pd.NA for entry in serie_data]
-            time_periods = [entry['fecha'] for entry in serie_data]
+        return self._parse_series_data(data_json, metadata, last_data, start_date, end_date, columnar)
 
-            # Formatear los periodos de tiempo
-            time_periods_formatted = [pd.to_datetime(period, dayfirst=True) for period in time_periods]
 
-            # Crear una serie de pandas con los datos obtenidos
-            serie = pd.Series(obs_values, index=time_periods_formatted, name=serie_id)
-            
-            # Verificar que el indice es del  tipo datetime
-            if not pd.api.types.is_datetime64_any_dtype(serie.index):
-                serie.index = pd.to_datetime(serie.index)
+    def _parse_series_data(self, data_json:dict, metadata:dict, last_data:bool, start_date, end_date, columnar:bool=False) -> pd.DataFrame | list:
 
-            # Para series trimestrales se ajusta la fecha dos periodos hacia adelante. Esto es para que la fecha sea el último mes del trimestre
-            if metadata[serie_id]['periodicidad'] == 'Trimestral':
-                serie.index = serie.index + pd.DateOffset(months=2)
+        if self.parser is not None:
+            # Las series se reparten entre los procesos del backend, que devuelven las fechas y los valores ya convertidos
+            entries = (
+                (serie_data['idSerie'], list(map(itemgetter('fecha'), serie_data['datos'])), list(map(itemgetter('dato'), serie_data['datos'])), ())
+                for serie_data in data_json['bmx']['series']
+            )
+            parsed = self.parser.parse(entries, partial(parse_dates, date_format='%d/%m/%Y'), na_values=('N/E',), thousands=',')
+            return self._assemble_series_data(parsed, metadata, last_data, start_date, end_date, columnar)
+
+        # Extraer y convertir los valores y las fechas de cada serie de forma vectorizada
+        parsed = (
+            (serie_data['idSerie'], *parse_observations(serie_data['datos'], 'fecha', 'dato', '%d/%m/%Y', na_values=('N/E',), thousands=','))
+            for serie_data in data_json['bmx']['series']
+        )
+
+        return self._assemble_series_data(parsed, metadata, last_data, start_date, end_date, columnar)
+
+
+    def _stream_series_data(self, batches:list):
+
+        # Leer cada lote de forma incremental. Las observaciones se convierten por bloques sin construir el JSON completo
+        for endpoint, headers in batches:
+            with self._stream_request(endpoint, headers=headers) as response:
+                for header, time_periods, obs_values in stream_series(response.raw, 'datos', 'fecha', 'dato', '%d/%m/%Y', series_path='bmx.series', header_keys=('idSerie',), na_values=('N/E',), thousands=','):
+                    yield header['idSerie'], time_periods, obs_values
+
+
+    def _assemble_series_data(self, parsed, metadata:dict, last_data:bool, start_date, end_date, columnar:bool=False) -> pd.DataFrame | list:
+        
+        # Inicializar una lista para almacenar las series. El DataFrame se arma una sola vez al final
+        series_list = []
+
+        for serie_id, time_periods, obs_values in parsed:
+
+            # Crear una serie columnar con los datos obtenidos, sin copiar los arreglos
+            serie_metadata = metadata[serie_id]
+            serie = ColumnarSeries.from_index(serie_id, time_periods, obs_values, provider=self.provider, freq=serie_metadata['periodicidad'], title=serie_metadata['titulo'], unit=serie_metadata['unidad'])
 
-            # Agregar la serie al DataFrame
-            series_df = pd.concat([series_df, serie], axis=1, join='outer')
+            # Para series trimestrales se ajusta la fecha dos periodos hacia adelante. Esto es para que la fecha sea el último mes del trimestre
+            if serie_metadata['periodicidad'] == 'Trimestral':
+                serie = serie.with_index(serie.index + pd.DateOffset(months=2))
 
-        # Ordenar el DataFrame por fecha
-        series_df = series_df.sort_index()
+            # Agregar la serie a la lista
+            series_list.append(serie)
 
         # Ajustamos la fecha a su dato original
         if not last_data:
-            start_date = pd.to_datetime(start_date) + pd.DateOffset(months=2)
+            start_date = pd.to_datetime(start_date) + pd.DateOffset(months=2) if start_date is not None else None
             end_date = pd.to_datetime(end_date)
+
+        if columnar:
+            return series_list if last_data else [serie.between(start_date, end_date) for serie in series_list]
+
+        # Alinear todas las series sobre la union de sus fechas en un solo paso (el resultado queda ordenado por fecha)
+        series_df = build_frame(series_list)
+
+        if not last_data:
             series_df = series_df.loc[start_date:end_date]
 
         # Verificar que el indice es del  tipo datetime
@@ -227,3 +398,67 @@ class Banxico_SIE(BaseAPI):
 
         return series_df
 
+
+
+class AsyncBanxico_SIE(Banxico_SIE, AsyncBaseAPI):
+    """
+    Variante asincrona de Banxico_SIE. Los metodos publicos son corrutinas y las solicitudes de datos y
+    metadatos se realizan de forma concurrente.
+
+    Example:
+        >>> banxico_api = AsyncBanxico_SIE(token, max_connections_per_host=8)
+        >>> df = asyncio.run(banxico_api.get_series_data(['SF43718', 'SF61745'], start_date='2020-01-01'))
+    """
+
+    async def get_series_metadata(self, serie_id:str | list, refresh:bool=False) -> dict:
+        """
+        Version asincrona de Banxico_SIE.get_series_metadata. Los lotes faltantes en el registro se solicitan de forma concurrente.
+        """
+
+        serie_id = self._validate_serie_id(serie_id)
+        if refresh:
+            self.metadata_registry.invalidate(self.provider, serie_id)
+
+        metadata, missing = self.metadata_registry.get_many(self.provider, serie_id)
+        if not missing:
+            return metadata
+        
+        batches = self._plan_batches(missing, get_series_metadata=True)
+        responses = await asyncio.gather(*(self._make_request(endpoint, headers=headers) for endpoint, headers in batches))
+
+        fetched = self._parse_series_metadata(self._merge_responses(responses))
+        self.metadata_registry.update(self.provider, fetched)
+        metadata.update(fetched)
+
+        return metadata
+
+
+    async def prefetch_metadata(self, serie_id:str | list) -> dict:
+        """
+        Version asincrona de Banxico_SIE.prefetch_metadata.
+        """
+        return await self.get_series_metadata(serie_id)
+
+
+    async def get_series_data(self, serie_id:str | list, last_data:bool=False, start_date:str=None, end_date:str=None, percentage_change:str=None, no_decimals:bool=False, columnar:bool=False) -> pd.DataFrame | list:
+        """
+        Version asincrona de Banxico_SIE.get_series_data. Todos los lotes de datos y de metadatos se solicitan al mismo tiempo.
+        """
+
+        # La fecha de fin por defecto es el dia de hoy
+        if end_date is None:
+            end_date = pd.Timestamp.today().strftime('%Y-%m-%d')
+
+        # Ajuste para datos trimestrales
+        if not last_data and start_date is not None:
+            start_date = pd.to_datetime(start_date) + pd.DateOffset(months=-2)
+        
+        # Se solicitan los lotes de datos y los metadatos de forma concurrente
+        batches = self._plan_batches(serie_id, last_data=last_data, start_date=start_date, end_date=end_date, percentage_change=percentage_change, no_decimals=no_decimals)
+        responses, metadata = await asyncio.gather(
+            asyncio.gather(*(self._make_request(endpoint, headers=headers) for endpoint, headers in batches)),
+            self.get_series_metadata(serie_id),
+        )
+        data_json = self._merge_responses(responses)
+
+        return self._parse_series_data(data_json, metadata, last_data, start_date, end_date, columnar)
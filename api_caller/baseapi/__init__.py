@@ -0,0 +1,21 @@
+# Los nombres publicos se importan bajo demanda, para que usar la cache o los metadatos no cargue pandas ni pyarrow
+from .._lazy import lazy_exports
+
+_EXPORTS = {
+    'BaseAPI': '.baseapi',
+    'AsyncBaseAPI': '.asyncapi',
+    'ResponseCache': '.cache', 'SQLiteCache': '.cache', 'FileCache': '.cache',
+    'SeriesStore': '.store',
+    'ArrowStore': '.arrowstore',
+    'ColumnarSeries': '.columnar', 'SeriesHeader': '.columnar',
+    'MetadataRegistry': '.metadata', 'get_metadata_registry': '.metadata',
+    'TokenBucket': '.ratelimit', 'get_rate_limiter': '.ratelimit', 'set_rate_limit': '.ratelimit', 'get_rate_limit_stats': '.ratelimit',
+    'Instrumentation': '.instrumentation', 'RequestEvent': '.instrumentation', 'MetricsCollector': '.instrumentation',
+    'OpenTelemetryExporter': '.instrumentation', 'get_instrumentation': '.instrumentation',
+    'ConnectionManager': '.connections', 'HTTP2Adapter': '.connections', 'get_connection_manager': '.connections', 'set_connection_manager': '.connections',
+    'SingleFlight': '.singleflight', 'get_single_flight': '.singleflight', 'set_single_flight': '.singleflight',
+    'ProcessParser': '.parallel',
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,278 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+import re
+import json
+import inspect
+import logging
+import threading
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from .columnar import ColumnarSeries, SeriesHeader
+from .frames import build_frame
+from .store import merge_observations
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# Constantes -----------------------------------------------------------------------------------
+
+FORMATS = {'arrow': 'arrow', 'parquet': 'parquet'}
+
+# Clase ----------------------------------------------------------------------------------------
+
+class ArrowStore:
+    """
+    Almacen local en formato columnar (Arrow IPC o Parquet) para las series descargadas, particionado por proveedor
+    e ID de serie. Un manifiesto registra los rangos de fechas que ya se consultaron para cada serie, de modo que las
+    consultas por rango se resuelven con los archivos locales y solo los tramos faltantes se solicitan a la API.
+    Los archivos Arrow se leen mapeados en memoria. Requiere la libreria opcional 'pyarrow'.
+
+    Es la version columnar de SeriesStore: combina las observaciones y detecta las revisiones con la misma regla
+    (merge_observations) y deja las revisiones de la ultima consulta en 'last_revisions'. SeriesStore sigue siendo el
+    almacen sin dependencias opcionales para las actualizaciones incrementales desde la ultima observacion.
+
+    Los tramos recientes solo se marcan como consultados hasta la ultima observacion recibida, para que los datos que
+    la fuente publique despues se soliciten en la siguiente consulta. Los tramos que terminan antes de los ultimos
+    'refresh_days' dias se marcan completos aunque no tengan observaciones.
+
+    Args:
+        directory (str): Directorio del almacen. Se crea si no existe.
+        format (str, optional): Formato de los archivos, 'arrow' (Arrow IPC, se lee mapeado en memoria) o 'parquet'.
+                            Por defecto es 'arrow'.
+        refresh_days (int, optional): Dias antes de hoy en los que aun pueden publicarse datos. Por defecto es 365,
+                                    suficiente para el rezago de publicacion de las series anuales.
+
+    Example:
+        >>> store = ArrowStore('series_store')
+        >>> df = store.get(Banxico_SIE(token), ['SF43718', 'SF61745'], start_date='2010-01-01', end_date='2024-12-31')
+        >>> store.last_revisions
+    """
+
+    def __init__(self, directory:str, format:str='arrow', refresh_days:int=365):
+        if pa is None:
+            raise ImportError("ArrowStore requiere la libreria 'pyarrow'. Instalala con: pip install pyarrow")
+        if format not in FORMATS:
+            raise ValueError(f"format debe ser uno de los siguientes valores: {', '.join(FORMATS)}")
+        if not isinstance(refresh_days, int) or refresh_days < 0:
+            raise ValueError("refresh_days debe ser un entero mayor o igual a 0.")
+
+        self.directory = directory
+        self.format = format
+        self.refresh_days = refresh_days
+        self.last_revisions = {}
+        self._lock = threading.RLock()
+        self._manifest_path = os.path.join(directory, 'manifest.json')
+        os.makedirs(directory, exist_ok=True)
+
+        self._manifest = {}
+        if os.path.exists(self._manifest_path):
+            try:
+                with open(self._manifest_path, encoding='utf-8') as file:
+                    self._manifest = json.load(file)
+            except ValueError:
+                logging.warning(f"No se pudo leer el manifiesto '{self._manifest_path}'. Se reconstruira.")
+
+    def _path(self, provider:str, serie_id:str) -> str:
+        safe_id = re.sub(r'[^\w.-]', '_', serie_id)
+        return os.path.join(self.directory, f"provider={provider}", f"{safe_id}.{FORMATS[self.format]}")
+
+    def _save_manifest(self):
+        tmp_path = f"{self._manifest_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self._manifest, file)
+        os.replace(tmp_path, self._manifest_path)
+
+    def coverage(self, provider:str, serie_id:str) -> list:
+        """
+        Devuelve los rangos de fechas ya consultados de una serie, como lista de pares (inicio, fin) inclusivos.
+        """
+        with self._lock:
+            ranges = self._manifest.get(provider, {}).get(serie_id, [])
+            return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in ranges]
+
+    def missing_ranges(self, provider:str, serie_id:str, start_date, end_date) -> list:
+        """
+        Devuelve los tramos de [start_date, end_date] que no estan cubiertos por el almacen.
+        """
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        missing = []
+        for covered_start, covered_end in self.coverage(provider, serie_id):
+            if covered_end < start or covered_start > end:
+                continue
+            if covered_start > start:
+                missing.append((start, covered_start - pd.Timedelta(days=1)))
+            start = max(start, covered_end + pd.Timedelta(days=1))
+            if start > end:
+                break
+        if start <= end:
+            missing.append((start, end))
+        return missing
+
+    def _add_coverage(self, provider:str, serie_id:str, start, end):
+        # Se agrega el rango y se unen los rangos contiguos o traslapados
+        ranges = sorted(self.coverage(provider, serie_id) + [(pd.Timestamp(start), pd.Timestamp(end))])
+        merged = [list(ranges[0])]
+        for range_start, range_end in ranges[1:]:
+            if range_start <= merged[-1][1] + pd.Timedelta(days=1):
+                merged[-1][1] = max(merged[-1][1], range_end)
+            else:
+                merged.append([range_start, range_end])
+        self._manifest.setdefault(provider, {})[serie_id] = [[start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')] for start, end in merged]
+
+    def _read_table(self, path:str):
+        if self.format == 'arrow':
+            # El archivo se mapea en memoria: solo se leen del disco las paginas que se usan
+            return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return pq.read_table(path, memory_map=True)
+
+    def _write_table(self, path:str, table):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Escritura atomica para no dejar archivos corruptos si el proceso se interrumpe
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        if self.format == 'arrow':
+            with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def load(self, provider:str, serie_id:str, start_date=None, end_date=None) -> ColumnarSeries:
+        """
+        Lee una serie del almacen, opcionalmente filtrada por fechas, o devuelve None si no existe.
+        """
+        path = self._path(provider, serie_id)
+        if not os.path.exists(path):
+            return None
+
+        table = self._read_table(path)
+        dates = table.column('date').combine_chunks().cast(pa.int64()).to_numpy()
+        values = table.column('value').combine_chunks().to_numpy(zero_copy_only=False)
+        return ColumnarSeries(SeriesHeader(serie_id, provider=provider), dates, values).between(start_date, end_date)
+
+    def save(self, provider:str, serie_id:str, serie:ColumnarSeries | pd.Series, start_date=None, end_date=None) -> pd.DataFrame:
+        """
+        Guarda las observaciones de una serie, combinandolas con las existentes (ver merge_observations), y registra
+        el rango [start_date, end_date] como consultado. Si no se indica el rango se usa el de las observaciones.
+
+        Returns:
+            pandas.DataFrame: Las observaciones revisadas (columnas 'anterior' y 'nuevo').
+        """
+        if isinstance(serie, ColumnarSeries):
+            serie = serie.to_pandas()
+
+        with self._lock:
+            old = self.load(provider, serie_id)
+            merged, revisions = merge_observations(old.to_pandas() if old is not None else None, serie, keep_missing=True)
+
+            table = pa.table({
+                'date': pa.array(merged.index.to_numpy(dtype='datetime64[ns]')),
+                'value': pa.array(merged.to_numpy(dtype='float64'), type=pa.float64()),
+            })
+            self._write_table(self._path(provider, serie_id), table)
+
+            if start_date is None or end_date is None:
+                if serie.dropna().empty:
+                    return revisions
+                start_date = serie.index.min() if start_date is None else start_date
+                end_date = serie.index.max() if end_date is None else end_date
+            start_date, end_date = pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize()
+            if start_date <= end_date:
+                self._add_coverage(provider, serie_id, start_date, end_date)
+                self._save_manifest()
+
+        return revisions
+
+    def invalidate(self, provider:str, serie_ids:list=None):
+        """
+        Elimina la cobertura registrada de las series indicadas, o de todo el proveedor, para que se vuelvan a consultar.
+        Los archivos se conservan y se actualizan con la siguiente descarga.
+        """
+        with self._lock:
+            if serie_ids is None:
+                self._manifest.pop(provider, None)
+            else:
+                for serie_id in serie_ids:
+                    self._manifest.get(provider, {}).pop(serie_id, None)
+            self._save_manifest()
+
+    def get(self, connector, serie_id:str | list, start_date:str='2000-01-01', end_date:str=None, columnar:bool=False) -> pd.DataFrame | list:
+        """
+        Devuelve las series en el rango indicado. Los tramos ya consultados se leen de los archivos locales y solo
+        los tramos faltantes se solicitan a la API por medio del conector; lo descargado se guarda en el almacen.
+        Las series que comparten el mismo tramo faltante se solicitan juntas.
+
+        Args:
+            connector: Un conector con atributo 'provider' y metodo get_series_data (por ejemplo Banxico_SIE o Fred).
+                    Si el conector no acepta start_date y end_date (INEGI_BIE), se descarga la serie completa.
+            serie_id (str | list): El ID de la serie o una lista de IDs.
+            start_date (str, optional): Fecha de inicio. Por defecto es '2000-01-01'.
+            end_date (str, optional): Fecha de fin. Por defecto es la fecha actual.
+            columnar (bool, optional): Si es True devuelve una lista de ColumnarSeries en lugar de un DataFrame.
+
+        Returns:
+            pandas.DataFrame | list: Las series en el rango indicado.
+        """
+
+        if isinstance(serie_id, str):
+            serie_id = [serie_id]
+        elif not (isinstance(serie_id, list) and all(isinstance(i, str) for i in serie_id)):
+            raise ValueError("El 'serie_id' debe ser una cadena de texto o una lista de cadenas de texto.")
+
+        provider = connector.provider
+        today = pd.Timestamp.today().normalize()
+        start_date = pd.Timestamp(start_date).normalize()
+        end_date = today if end_date is None else pd.Timestamp(end_date).normalize()
+
+        # Agrupar las series por el tramo que falta en el almacen
+        groups = {}
+        for id in serie_id:
+            for missing in self.missing_ranges(provider, id, start_date, end_date):
+                groups.setdefault(missing, []).append(id)
+
+        # Antes de esta fecha se asume que la fuente ya publico todos los datos
+        settled = today - pd.Timedelta(days=self.refresh_days)
+
+        self.last_revisions = {}
+        parameters = inspect.signature(connector.get_series_data).parameters
+        for (missing_start, missing_end), ids in groups.items():
+            kwargs = {'start_date': missing_start.strftime('%Y-%m-%d'), 'end_date': missing_end.strftime('%Y-%m-%d')} if 'start_date' in parameters else {}
+
+            # Si el conector lo permite se piden las series columnares, que conservan solo las observaciones de cada serie
+            if 'columnar' in parameters:
+                fetched = {serie.name: serie.to_pandas() for serie in connector.get_series_data(ids, columnar=True, **kwargs)}
+            else:
+                new_df = connector.get_series_data(ids, **kwargs)
+                fetched = {id: new_df[id].dropna() for id in ids if id in new_df.columns}
+
+            for id in ids:
+                new = fetched.get(id, pd.Series(dtype='float64'))
+                observed = new.dropna()
+
+                # El tramo reciente solo se marca como consultado hasta la ultima observacion recibida, y nunca despues
+                # de hoy, porque aun pueden publicarse datos
+                last = observed.index.max() if not observed.empty else settled
+                covered_end = min(missing_end, today, max(last.normalize(), settled))
+                revisions = self.save(provider, id, new, missing_start, covered_end)
+
+                if not revisions.empty:
+                    logging.info(f"{provider}:{id} tiene {len(revisions)} observaciones revisadas.")
+                    self.last_revisions[id] = revisions
+
+        series_list = []
+        for id in serie_id:
+            serie = self.load(provider, id, start_date, end_date)
+            series_list.append(serie if serie is not None else ColumnarSeries.from_index(id, [], [], provider=provider))
+
+        return series_list if columnar else build_frame(series_list)
@@ -0,0 +1,100 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+import time
+import asyncio
+import weakref
+import threading
+from urllib.parse import urlsplit
+
+from .baseapi import BaseAPI
+
+# Clase ----------------------------------------------------------------------------------------
+
+class AsyncBaseAPI(BaseAPI):
+    """
+    Contraparte asincrona de BaseAPI. Las solicitudes se despachan sobre la misma sesion de requests
+    en hilos de trabajo, de modo que varias llamadas pueden estar en vuelo al mismo tiempo. El numero
+    de solicitudes simultaneas hacia un mismo host se limita con un semaforo por host.
+
+    Args:
+        api_key (str, optional): La clave de la API.
+        base_url (str, optional): La URL base de la API.
+        timeout (int, optional): Tiempo maximo de espera por solicitud en segundos.
+        max_connections_per_host (int, optional): Numero maximo de solicitudes simultaneas por host. Por defecto es 8.
+        **kwargs: Argumentos adicionales de BaseAPI (por ejemplo 'cache').
+    """
+
+    def __init__(self, api_key:str=None, base_url:str="", timeout:int=10, max_connections_per_host:int=8, **kwargs):
+        if not isinstance(max_connections_per_host, int) or max_connections_per_host < 1:
+            raise ValueError("max_connections_per_host debe ser un entero mayor o igual a 1.")
+
+        # El pool de conexiones debe ser al menos del tamaño de la concurrencia permitida
+        super().__init__(api_key, base_url, timeout, pool_maxsize=max_connections_per_host, **kwargs)
+        self.max_connections_per_host = max_connections_per_host
+
+        # Semaforos por event loop y por host (un semaforo no puede compartirse entre loops distintos)
+        self._host_semaphores = weakref.WeakKeyDictionary()
+
+        # Solicitudes en vuelo por event loop, para que las corrutinas identicas esperen en el loop y no ocupen hilos
+        self._in_flight = weakref.WeakKeyDictionary()
+
+        # Espera del limitador ya cubierta en el event loop para la solicitud del hilo de trabajo actual
+        self._reserved = threading.local()
+
+    def _host_semaphore(self, url:str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        host = urlsplit(url).netloc
+        semaphores = self._host_semaphores.setdefault(loop, {})
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return semaphores[host]
+
+    def _wait_rate_limit(self, event):
+        # El turno del primer intento ya se espero en el event loop (ver _dispatch); los reintentos esperan en el hilo
+        waited = getattr(self._reserved, 'wait', None)
+        if waited is None:
+            return super()._wait_rate_limit(event)
+        self._reserved.wait = None
+        event.timings['queue'] = event.timings.get('queue', 0.0) + waited
+
+    def _reserved_request(self, waited:float, endpoint, headers, params, data, json, raw:bool):
+        # Se ejecuta en el hilo de trabajo con el turno del limitador ya reservado
+        self._reserved.wait = waited
+        try:
+            return BaseAPI._make_request(self, endpoint, headers, params, data, json, raw)
+        finally:
+            self._reserved.wait = None
+
+    async def _dispatch(self, url:str, endpoint, headers, params, data, json, raw:bool):
+        # Se limita la concurrencia por host y se ejecuta la solicitud bloqueante fuera del event loop
+        async with self._host_semaphore(url):
+            if self.rate_limiter is None:
+                return await asyncio.to_thread(BaseAPI._make_request, self, endpoint, headers, params, data, json, raw)
+
+            # El turno del limitador se espera en el event loop, sin ocupar un hilo de trabajo mientras tanto
+            start = time.perf_counter()
+            await self.rate_limiter.acquire_async()
+            return await asyncio.to_thread(self._reserved_request, time.perf_counter() - start, endpoint, headers, params, data, json, raw)
+
+    async def _make_request(self, endpoint, headers=None, params=None, data=None, json=None, raw:bool=False):
+        url = f"{self.base_url}{endpoint}"
+
+        key = self._coalescing_key(url, headers, params, data, json, raw)
+        if key is None:
+            return await self._dispatch(url, endpoint, headers, params, data, json, raw)
+
+        # La primera corrutina crea la tarea; las demas la esperan. Con shield la tarea sigue aunque se cancele quien la creo
+        in_flight = self._in_flight.setdefault(asyncio.get_running_loop(), {})
+        task = in_flight.get(key)
+        if task is None:
+            task = in_flight[key] = asyncio.ensure_future(self._dispatch(url, endpoint, headers, params, data, json, raw))
+            task.add_done_callback(lambda _: in_flight.pop(key, None))
+            return await asyncio.shield(task)
+
+        try:
+            result = await asyncio.shield(task)
+        except Exception as error:
+            self._record_shared(url, error)
+            raise
+        self._record_shared(url)
+        return result
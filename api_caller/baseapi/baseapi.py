@@ -1,53 +1,309 @@
 
 # Librerias necesarias -------------------------------------------------------------------------
 
+import time
 import requests
 import logging
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
+from email.utils import parsedate_to_datetime
+from json import loads as json_loads
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import ResponseCache
+from .metadata import MetadataRegistry, get_metadata_registry
+from .ratelimit import TokenBucket, get_rate_limiter
+from .instrumentation import Instrumentation, RequestEvent, get_instrumentation
+from .connections import ConnectionManager, get_connection_manager, capture_connection_timings
+from .singleflight import SingleFlight, get_single_flight
+from .parallel import ProcessParser
 
 # Clase ----------------------------------------------------------------------------------------
 
 class BaseAPI:
-    def __init__(self, api_key:str=None, base_url:str="", timeout:int=10):
+    # Nombre corto del proveedor, usado para identificar sus series en los almacenes locales
+    provider = None
+
+    # Numero de reintentos ante respuestas 429 (Too Many Requests)
+    max_rate_limit_retries = 3
+
+    def __init__(self, api_key:str=None, base_url:str="", timeout:int=10, pool_maxsize:int=10, cache:ResponseCache=None, metadata_registry:MetadataRegistry=None, rate_limiter:TokenBucket | bool=None, instrumentation:Instrumentation=None, connection_manager:ConnectionManager=None, single_flight:SingleFlight | bool=None, parser:ProcessParser=None):
         self.__api_key = api_key
         self.base_url = base_url
         self.timeout = timeout
-        self.session = requests.Session()
-        retries = Retry(total=5, backoff_factor=1, status_forcelist=[502, 503, 504])
-        self.session.mount('http://', HTTPAdapter(max_retries=retries))
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        self.cache = cache
+        self.metadata_registry = metadata_registry if metadata_registry is not None else get_metadata_registry()
+
+        # Por defecto se usa el limitador compartido del proveedor. Con rate_limiter=False no se limita el ritmo de solicitudes
+        if rate_limiter is None:
+            rate_limiter = get_rate_limiter(self.provider)
+        self.rate_limiter = rate_limiter or None
+        self.instrumentation = instrumentation if instrumentation is not None else get_instrumentation()
+
+        # Las solicitudes identicas en vuelo se agrupan en el grupo compartido del proceso. Con single_flight=False no se agrupan
+        if single_flight is None:
+            single_flight = get_single_flight()
+        self.single_flight = single_flight or None
+
+        # Backend opcional para convertir en varios procesos las respuestas con muchas series (Banxico e INEGI)
+        self.parser = parser
+
+        # La sesion y sus pools de conexiones son compartidos por todos los conectores del administrador
+        self.connection_manager = connection_manager if connection_manager is not None else get_connection_manager()
+        self.session = self.connection_manager.session
+        self._mount_adapters(pool_maxsize)
         logging.basicConfig(level=logging.INFO)
 
-    def _make_request(self, endpoint, headers=None, params=None, data=None, json=None):
+    @property
+    def api_key(self) -> str:
+        # Solo lectura, para los componentes que hacen solicitudes en nombre del conector (por ejemplo los catalogos de INEGI)
+        return self.__api_key
+
+    def _mount_adapters(self, pool_maxsize:int):
+        # El pool del host se amplia si hace falta; nunca se reduce porque otros conectores pueden compartirlo
+        self.pool_maxsize = self.connection_manager.ensure_pool_size(self.base_url, pool_maxsize) if self.base_url else pool_maxsize
+
+    def prewarm_connections(self, connections:int=None) -> int:
+        """
+        Abre conexiones con el host de la API antes de las primeras solicitudes, para no pagar la resolucion DNS y el
+        saludo TLS durante una descarga concurrente.
+
+        Args:
+            connections (int, optional): Numero de conexiones a abrir. Por defecto es el tamaño del pool del host.
+
+        Returns:
+            int: Numero de conexiones abiertas con exito.
+        """
+        return self.connection_manager.prewarm(self.base_url, connections or self.pool_maxsize, timeout=self.timeout)
+
+    def _redact(self, url:str) -> str:
+        # URL para metricas y trazas: sin parametros de consulta y sin la llave de la API (INEGI la recibe en la ruta)
+        url = url.split('?')[0]
+        api_key = self._BaseAPI__api_key
+        return url.replace(api_key, '***') if api_key else url
+
+    def _wait_rate_limit(self, event:RequestEvent):
+        # Esperar el turno en el limitador del proveedor
+        if self.rate_limiter is not None:
+            start = time.perf_counter()
+            self.rate_limiter.acquire()
+            event.timings['queue'] = event.timings.get('queue', 0.0) + time.perf_counter() - start
+
+    def _make_request(self, endpoint, headers=None, params=None, data=None, json=None, raw:bool=False):
+        # Con raw=True se devuelve el cuerpo de la respuesta en bytes, para formatos distintos de JSON (por ejemplo CSV)
         url = f"{self.base_url}{endpoint}"
         if headers is None:
             headers = {}
         if params is None:
             params = {}
-        headers['Authorization'] = f"Bearer {self._BaseAPI__api_key}"
+        if self._BaseAPI__api_key is not None:
+            headers['Authorization'] = f"Bearer {self._BaseAPI__api_key}"
+
+        # Las llamadas simultaneas identicas comparten una sola solicitud y su respuesta decodificada
+        key = self._coalescing_key(url, headers, params, data, json, raw)
+        if key is None:
+            return self._send_request(url, headers, params, data, json, raw)
+
+        result, _ = self.single_flight.do(key, lambda: self._send_request(url, headers, params, data, json, raw), on_shared=lambda error: self._record_shared(url, error))
+        return result
+
+    def _coalescing_key(self, url:str, headers:dict, params:dict, data=None, json=None, raw:bool=False) -> str:
+        # Llave de agrupacion de la solicitud, o None si no se agrupa (sin grupo o con cuerpo)
+        if self.single_flight is None or data is not None or json is not None:
+            return None
+        headers = dict(headers or {})
+        if self._BaseAPI__api_key is not None:
+            headers['Authorization'] = f"Bearer {self._BaseAPI__api_key}"
+        return self.single_flight.make_key('GET', url, params, headers, raw)
+
+    def _record_shared(self, url:str, error:BaseException=None):
+        # Las llamadas que recibieron la respuesta de otra solicitud en vuelo se registran sin fases de red
+        event = RequestEvent(self.provider, 'GET', self._redact(url))
+        event.coalesced = True
+        if error is not None:
+            event.error = str(error)
+        self.instrumentation.after_request(self, event, None)
+
+    def _send_request(self, url:str, headers:dict, params:dict, data=None, json=None, raw:bool=False):
+        instrumentation = self.instrumentation
+        event = RequestEvent(self.provider, 'GET', self._redact(url))
+        instrumentation.before_request(self, 'GET', url, headers, params)
+        response = None
 
         try:
-            response = self.session.request(
-                method='GET',
-                url=url,
-                headers=headers,
-                params=params,
-                data=data,
-                json=json,
-                timeout=self.timeout
-            )
+            # Consultar la cache antes de ir a la red. Si la entrada expiro se revalida con una solicitud condicional
+            cache_key, cached = None, None
+            if self.cache is not None:
+                cache_key = self.cache.make_key('GET', url, params)
+                cached = self.cache.get(cache_key)
+                event.cache = 'miss'
+                if cached is not None:
+                    if self.cache.is_fresh(cached):
+                        event.cache = 'hit'
+                        return cached['body'] if raw else json_loads(cached['body'])
+                    if cached['etag']:
+                        headers['If-None-Match'] = cached['etag']
+                    if cached['last_modified']:
+                        headers['If-Modified-Since'] = cached['last_modified']
+
+            for attempt in range(self.max_rate_limit_retries + 1):
+
+                self._wait_rate_limit(event)
+
+                start = time.perf_counter()
+                with capture_connection_timings(event.timings) as phases:
+                    response = self.session.request(
+                        method='GET',
+                        url=url,
+                        headers=headers,
+                        params=params,
+                        data=data,
+                        json=json,
+                        timeout=self.timeout
+                    )
+
+                # requests descarga el cuerpo completo antes de regresar. 'elapsed' mide hasta recibir los encabezados,
+                # incluida la apertura de la conexion, que se registra aparte en 'dns', 'connect' y 'tls'
+                event.status = response.status_code
+                elapsed = response.elapsed.total_seconds()
+                event.timings['ttfb'] = max(0.0, elapsed - sum(phases.values()))
+                event.timings['download'] = max(0.0, time.perf_counter() - start - elapsed)
+
+                if response.status_code != 429 or attempt == self.max_rate_limit_retries:
+                    break
+
+                # Ante un 429 se detienen todas las solicitudes al proveedor durante el tiempo indicado en Retry-After
+                event.retries += 1
+                wait = self._retry_after(response, attempt)
+                logging.warning(f"Rate limit reached for {url.split('?')[0]}. Retrying in {wait:.1f} seconds.")
+                if self.rate_limiter is not None:
+                    self.rate_limiter.penalize(wait)
+                else:
+                    time.sleep(wait)
+
+            event.response_bytes = len(response.content)
+
+            # El servidor confirma que la entrada en cache sigue vigente
+            if cached is not None and response.status_code == 304:
+                event.cache = 'revalidated'
+                self.cache.refresh(cache_key, url)
+                return cached['body'] if raw else json_loads(cached['body'])
+
             response.raise_for_status()
 
-            return response.json()
+            if raw:
+                result = response.content
+            else:
+                start = time.perf_counter()
+                result = response.json()
+                event.timings['decode'] = time.perf_counter() - start
+
+            if self.cache is not None:
+                self.cache.set(cache_key, response.content, url, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+            return result
         
         except requests.exceptions.HTTPError as http_err:
+            event.error = str(http_err)
             logging.error(f"HTTP error occurred: {http_err}")
             raise
         except requests.exceptions.RequestException as req_err:
+            event.error = str(req_err)
             logging.error(f"Request error occurred: {req_err}")
             raise
         except ValueError as json_err:
+            event.error = str(json_err)
             logging.error(f"JSON decode error: {json_err}")
             raise
+        finally:
+            instrumentation.after_request(self, event, response)
+
+    def _stream_request(self, endpoint, headers=None, params=None):
+        """
+        Realiza una solicitud sin descargar el cuerpo completo, para que la respuesta se procese de forma incremental.
+        Las respuestas en streaming no pasan por la cache.
+
+        Returns:
+            requests.Response: La respuesta abierta. Debe usarse como administrador de contexto para liberar la conexion.
+
+        Example:
+            >>> with self._stream_request(endpoint) as response:
+            ...     for header, index, values in stream_series(response.raw, ...):
+        """
+        url = f"{self.base_url}{endpoint}"
+        if headers is None:
+            headers = {}
+        if self._BaseAPI__api_key is not None:
+            headers['Authorization'] = f"Bearer {self._BaseAPI__api_key}"
+
+        instrumentation = self.instrumentation
+        event = RequestEvent(self.provider, 'GET', self._redact(url), stream=True)
+        instrumentation.before_request(self, 'GET', url, headers, params)
+        response = None
+
+        try:
+            self._wait_rate_limit(event)
+            with capture_connection_timings(event.timings) as phases:
+                response = self.session.request(method='GET', url=url, headers=headers, params=params, timeout=self.timeout, stream=True)
+            event.status = response.status_code
+            event.timings['ttfb'] = max(0.0, response.elapsed.total_seconds() - sum(phases.values()))
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as http_err:
+            event.error = str(http_err)
+            logging.error(f"HTTP error occurred: {http_err}")
+            raise
+        except requests.exceptions.RequestException as req_err:
+            event.error = str(req_err)
+            logging.error(f"Request error occurred: {req_err}")
+            raise
+        finally:
+            instrumentation.after_request(self, event, response)
+
+        # Descomprimir de forma transparente si el servidor responde con gzip o deflate
+        response.raw.decode_content = True
+        return response
+
+    def _retry_after(self, response, attempt:int) -> float:
+        # El encabezado Retry-After puede venir en segundos o como fecha HTTP. Si no viene, se usa un backoff exponencial
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        return float(2 ** attempt)
+
+    def _make_requests(self, calls:list, max_workers:int=None) -> list:
+        """
+        Realiza varias solicitudes sobre la sesion compartida y devuelve las respuestas en el mismo orden.
+
+        Args:
+            calls (list): Lista de diccionarios con los argumentos de cada llamada a _make_request.
+            max_workers (int, optional): Numero de hilos para realizar las solicitudes en paralelo. 
+                                    Si es None o 1, las solicitudes se realizan de forma secuencial.
+
+        Returns:
+            list: Las respuestas JSON decodificadas, en el orden de 'calls'.
+        """
+        return self._run_concurrently(lambda call: self._make_request(**call), calls, max_workers)
+
+    def _run_concurrently(self, function, items:list, max_workers:int=None) -> list:
+        """
+        Aplica una funcion que realiza solicitudes a cada elemento de una lista, en paralelo sobre la sesion compartida,
+        y devuelve los resultados en el mismo orden.
+        """
+
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            raise ValueError("max_workers debe ser un entero mayor o igual a 1.")
+
+        if max_workers is None or max_workers == 1 or len(items) <= 1:
+            return [function(item) for item in items]
+
+        # Se amplia el pool de conexiones para que cada hilo pueda reutilizar su propia conexion
+        max_workers = min(max_workers, len(items))
+        if max_workers > self.pool_maxsize:
+            self._mount_adapters(max_workers)
 
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(function, items))
@@ -0,0 +1,200 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+
+# Clases ---------------------------------------------------------------------------------------
+
+class ResponseCache(ABC):
+    """
+    Interfaz comun de las caches de respuestas de BaseAPI. Las entradas se identifican por metodo, URL y
+    parametros, y se guardan comprimidas junto con sus validadores HTTP (ETag y Last-Modified) para poder
+    revalidarlas con solicitudes condicionales una vez que expiran. Las subclases implementan el almacenamiento
+    (get, set, refresh, delete y clear).
+
+    Args:
+        ttl (float, optional): Tiempo de vida por defecto de las entradas en segundos. Por defecto es una hora.
+        ttl_rules (dict, optional): Diccionario {patron regex: segundos} que define el tiempo de vida segun la URL.
+                                Se aplica la primera regla cuyo patron coincida. Un valor de 0 obliga a revalidar siempre.
+
+    Example:
+        >>> cache = SQLiteCache('api_cache.sqlite', ttl=86400, ttl_rules={r'/datos/oportuno': 0})
+        >>> banxico_api = Banxico_SIE(token, cache=cache)
+    """
+
+    def __init__(self, ttl:float=3600, ttl_rules:dict=None):
+        self.ttl = ttl
+        self.ttl_rules = [(re.compile(pattern), seconds) for pattern, seconds in (ttl_rules or {}).items()]
+
+    def make_key(self, method:str, url:str, params:dict=None) -> str:
+        # Se usa un hash para no guardar en claro los tokens que algunas APIs reciben en la URL
+        params_str = json.dumps(sorted((params or {}).items()), default=str)
+        return hashlib.sha256(f"{method.upper()} {url} {params_str}".encode('utf-8')).hexdigest()
+
+    def ttl_for(self, url:str) -> float:
+        for pattern, seconds in self.ttl_rules:
+            if pattern.search(url):
+                return seconds
+        return self.ttl
+
+    def is_fresh(self, entry:dict) -> bool:
+        return entry['expires_at'] > time.time()
+
+    @abstractmethod
+    def get(self, key:str) -> dict:
+        """
+        Devuelve la entrada (cuerpo, validadores y fecha de expiracion) o None si no existe.
+        """
+
+    @abstractmethod
+    def set(self, key:str, body:bytes, url:str, etag:str=None, last_modified:str=None):
+        """
+        Guarda una respuesta con el tiempo de vida que corresponde a su URL.
+        """
+
+    @abstractmethod
+    def refresh(self, key:str, url:str):
+        """
+        Renueva la expiracion de una entrada que el servidor confirmo como vigente (respuesta 304).
+        """
+
+    @abstractmethod
+    def delete(self, key:str):
+        """
+        Elimina una entrada.
+        """
+
+    @abstractmethod
+    def clear(self):
+        """
+        Elimina todas las entradas.
+        """
+
+
+class SQLiteCache(ResponseCache):
+    """
+    Cache de respuestas respaldada por una base de datos SQLite local. Los cuerpos se guardan comprimidos con zlib.
+
+    Args:
+        path (str): Ruta del archivo SQLite.
+        ttl (float, optional): Tiempo de vida por defecto de las entradas en segundos.
+        ttl_rules (dict, optional): Tiempos de vida por patron de URL.
+    """
+
+    def __init__(self, path:str, ttl:float=3600, ttl_rules:dict=None):
+        super().__init__(ttl, ttl_rules)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, body BLOB, etag TEXT, last_modified TEXT, stored_at REAL, expires_at REAL)"
+            )
+
+    def get(self, key:str) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, stored_at, expires_at = row
+        return {'body': zlib.decompress(body), 'etag': etag, 'last_modified': last_modified, 'stored_at': stored_at, 'expires_at': expires_at}
+
+    def set(self, key:str, body:bytes, url:str, etag:str=None, last_modified:str=None):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, zlib.compress(body), etag, last_modified, now, now + self.ttl_for(url)),
+            )
+
+    def refresh(self, key:str, url:str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, expires_at = ? WHERE key = ?", (now, now + self.ttl_for(url), key)
+            )
+
+    def delete(self, key:str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+
+class FileCache(ResponseCache):
+    """
+    Cache de respuestas respaldada por un directorio de archivos comprimidos. Cada entrada se guarda en un
+    archivo '.zz' con el cuerpo comprimido y un archivo '.json' con sus validadores y fechas.
+
+    Args:
+        directory (str): Directorio donde se guardan las entradas. Se crea si no existe.
+        ttl (float, optional): Tiempo de vida por defecto de las entradas en segundos.
+        ttl_rules (dict, optional): Tiempos de vida por patron de URL.
+    """
+
+    def __init__(self, directory:str, ttl:float=3600, ttl_rules:dict=None):
+        super().__init__(ttl, ttl_rules)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key:str) -> tuple:
+        base = os.path.join(self.directory, key)
+        return f"{base}.zz", f"{base}.json"
+
+    def _write_meta(self, meta_path:str, meta:dict):
+        # Escritura atomica para que un lector concurrente nunca vea un archivo a medias
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(meta, file)
+        os.replace(tmp_path, meta_path)
+
+    def get(self, key:str) -> dict:
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as file:
+                meta = json.load(file)
+            with open(body_path, 'rb') as file:
+                meta['body'] = zlib.decompress(file.read())
+        except (FileNotFoundError, ValueError, zlib.error):
+            return None
+        return meta
+
+    def set(self, key:str, body:bytes, url:str, etag:str=None, last_modified:str=None):
+        body_path, meta_path = self._paths(key)
+        now = time.time()
+        tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(zlib.compress(body))
+        os.replace(tmp_path, body_path)
+        self._write_meta(meta_path, {'etag': etag, 'last_modified': last_modified, 'stored_at': now, 'expires_at': now + self.ttl_for(url)})
+
+    def refresh(self, key:str, url:str):
+        entry = self.get(key)
+        if entry is None:
+            return
+        now = time.time()
+        self._write_meta(self._paths(key)[1], {'etag': entry['etag'], 'last_modified': entry['last_modified'], 'stored_at': now, 'expires_at': now + self.ttl_for(url)})
+
+    def delete(self, key:str):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(('.zz', '.json')):
+                os.remove(os.path.join(self.directory, name))
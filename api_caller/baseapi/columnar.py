@@ -0,0 +1,150 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+from __future__ import annotations
+
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# Funciones ------------------------------------------------------------------------------------
+
+def _epoch_ns(index) -> np.ndarray:
+    # Fechas como int64 en nanosegundos. Si el indice ya esta en nanosegundos se devuelve una vista, no una copia
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    return index.to_numpy().astype('datetime64[ns]', copy=False).view('int64')
+
+
+def _timestamp_ns(date) -> int:
+    return int(np.datetime64(pd.Timestamp(date).to_datetime64(), 'ns').view('int64'))
+
+# Clases ---------------------------------------------------------------------------------------
+
+class SeriesHeader:
+    """
+    Encabezado de una serie: identificador y metadatos descriptivos. Usa __slots__ para que miles de series en
+    memoria no carguen un diccionario de atributos por instancia.
+    """
+
+    __slots__ = ('serie_id', 'provider', 'freq', 'title', 'unit')
+
+    def __init__(self, serie_id:str, provider:str=None, freq:str=None, title:str=None, unit:str=None):
+        self.serie_id = serie_id
+        self.provider = provider
+        self.freq = freq
+        self.title = title
+        self.unit = unit
+
+    def __repr__(self):
+        return f"SeriesHeader(serie_id={self.serie_id!r}, provider={self.provider!r}, freq={self.freq!r})"
+
+
+class ColumnarSeries:
+    """
+    Representacion compacta de una serie en memoria: un arreglo int64 con las fechas (nanosegundos desde la epoca),
+    un arreglo float64 con los valores y una mascara de bits con las observaciones faltantes. Es la salida comun de
+    los parsers de get_series_data y solo se convierte a pandas cuando se pide, sin copiar los arreglos.
+
+    Args:
+        header (SeriesHeader): El encabezado de la serie.
+        dates (numpy.ndarray): Fechas como int64 en nanosegundos desde la epoca.
+        values (numpy.ndarray): Valores float64, con NaN en las observaciones faltantes.
+
+    Example:
+        >>> series = banxico_api.get_series_data(['SF43718', 'SF61745'], columnar=True)
+        >>> series[0].to_pandas()
+    """
+
+    __slots__ = ('header', 'dates', 'values', '_missing')
+
+    def __init__(self, header:SeriesHeader, dates:np.ndarray, values:np.ndarray):
+        dates = np.asarray(dates, dtype='int64')
+        values = np.asarray(values, dtype='float64')
+        if dates.shape != values.shape or dates.ndim != 1:
+            raise ValueError("dates y values deben ser arreglos de una dimension con la misma longitud.")
+
+        self.header = header
+        self.dates = dates
+        self.values = values
+
+        # Una observacion faltante ocupa un bit en lugar de un byte
+        self._missing = np.packbits(np.isnan(values))
+
+    @classmethod
+    def from_index(cls, serie_id:str, index, values:np.ndarray, **header) -> 'ColumnarSeries':
+        """
+        Crea una serie a partir de un indice de fechas de pandas y sus valores, reutilizando los buffers existentes.
+
+        Args:
+            serie_id (str): El ID de la serie.
+            index: Las fechas de las observaciones (DatetimeIndex o cualquier valor aceptado por pd.DatetimeIndex).
+            values (numpy.ndarray): Los valores de las observaciones.
+            **header: Campos adicionales del encabezado (provider, freq, title, unit).
+        """
+        return cls(SeriesHeader(serie_id, **header), _epoch_ns(index), values)
+
+    @property
+    def name(self) -> str:
+        return self.header.serie_id
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """
+        Las fechas como DatetimeIndex. Es una vista del arreglo int64, no una copia.
+        """
+        return pd.DatetimeIndex(self.dates.view('datetime64[ns]'))
+
+    @property
+    def missing(self) -> np.ndarray:
+        """
+        Arreglo booleano con True en las observaciones faltantes.
+        """
+        return np.unpackbits(self._missing, count=len(self.dates)).astype(bool)
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + self.values.nbytes + self._missing.nbytes
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __repr__(self):
+        return f"ColumnarSeries({self.header.serie_id!r}, observaciones={len(self)}, faltantes={int(self.missing.sum())})"
+
+    def with_index(self, index) -> 'ColumnarSeries':
+        """
+        Devuelve la misma serie con otro indice de fechas, compartiendo el buffer de valores.
+        """
+        series = ColumnarSeries.__new__(ColumnarSeries)
+        series.header, series.dates, series.values, series._missing = self.header, _epoch_ns(index), self.values, self._missing
+        if len(series.dates) != len(series.values):
+            raise ValueError("El nuevo indice debe tener la misma longitud que la serie.")
+        return series
+
+    def between(self, start_date=None, end_date=None) -> 'ColumnarSeries':
+        """
+        Filtra las observaciones entre dos fechas (inclusivas). Si las fechas estan ordenadas el resultado es una vista.
+        """
+        start = _timestamp_ns(start_date) if start_date is not None else None
+        end = _timestamp_ns(end_date) if end_date is not None else None
+
+        if len(self.dates) < 2 or np.all(self.dates[1:] >= self.dates[:-1]):
+            lower = np.searchsorted(self.dates, start, side='left') if start is not None else 0
+            upper = np.searchsorted(self.dates, end, side='right') if end is not None else len(self.dates)
+            return ColumnarSeries(self.header, self.dates[lower:upper], self.values[lower:upper])
+
+        mask = np.ones(len(self.dates), dtype=bool)
+        if start is not None:
+            mask &= self.dates >= start
+        if end is not None:
+            mask &= self.dates <= end
+        return ColumnarSeries(self.header, self.dates[mask], self.values[mask])
+
+    def to_pandas(self) -> pd.Series:
+        """
+        Convierte la serie a pandas.Series sin copiar las fechas ni los valores.
+        """
+        return pd.Series(self.values, index=self.index, name=self.header.serie_id, copy=False)
@@ -0,0 +1,456 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+import io
+import time
+import socket
+import logging
+import threading
+import importlib
+import requests
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util import Retry
+from urllib3.util.connection import allowed_gai_family
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError, ConnectTimeoutError
+
+# Constantes -----------------------------------------------------------------------------------
+
+DEFAULT_POOL_MAXSIZE = 10
+
+# Reintentos ante errores transitorios del servidor, comunes a los transportes HTTP/1.1 y HTTP/2
+RETRY_TOTAL = 5
+RETRY_BACKOFF_FACTOR = 1
+RETRY_STATUS = (502, 503, 504)
+
+# Fases de conexion de la solicitud en curso en cada hilo, ver capture_connection_timings
+_connection_phases = threading.local()
+
+# Funciones ------------------------------------------------------------------------------------
+
+@contextmanager
+def capture_connection_timings(timings:dict):
+    """
+    Mide las fases de conexion de las solicitudes que se realizan en el bloque, en el hilo actual. Al salir suma los
+    segundos de cada fase a 'timings': 'dns' (resolucion del host), 'connect' (conexion TCP) y 'tls' (saludo TLS).
+    Las fases solo aparecen cuando la solicitud abre una conexion nueva; una conexion reutilizada del pool no las tiene.
+
+    Args:
+        timings (dict): Diccionario donde se acumulan los segundos por fase, por ejemplo RequestEvent.timings.
+
+    Returns:
+        dict: Las fases medidas dentro del bloque.
+
+    Example:
+        >>> with capture_connection_timings(event.timings) as phases:
+        ...     response = session.get(url)
+        >>> ttfb = response.elapsed.total_seconds() - sum(phases.values())
+    """
+    phases = {}
+    previous = getattr(_connection_phases, 'timings', None)
+    _connection_phases.timings = phases
+    try:
+        yield phases
+    finally:
+        _connection_phases.timings = previous
+        for phase, seconds in phases.items():
+            timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+def _record_phase(phase:str, seconds:float):
+    phases = getattr(_connection_phases, 'timings', None)
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+# Clases ---------------------------------------------------------------------------------------
+
+class _TimedConnectionMixin:
+    # urllib3 resuelve el host y conecta en una sola llamada. Para separar las fases se resuelve primero y despues se
+    # conecta a cada direccion obtenida, en el mismo orden en que lo haria urllib3
+    def _new_conn(self):
+        if getattr(_connection_phases, 'timings', None) is None:
+            return super()._new_conn()
+
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror:
+            # urllib3 vuelve a resolver y convierte el error en NameResolutionError
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        _record_phase('dns', resolved - start)
+
+        dns_host = self._dns_host
+        try:
+            for position, address in enumerate(addresses):
+                self._dns_host = address[4][0]
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (NewConnectionError, ConnectTimeoutError):
+                    if position == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+
+        _record_phase('connect', time.perf_counter() - resolved)
+        return sock
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        phases = getattr(_connection_phases, 'timings', None)
+        if phases is None:
+            return super().connect()
+
+        # El saludo TLS es el tiempo de connect() que no se fue en resolver el host ni en abrir el socket
+        opened = phases.get('dns', 0.0) + phases.get('connect', 0.0)
+        start = time.perf_counter()
+        super().connect()
+        elapsed = time.perf_counter() - start
+        _record_phase('tls', max(0.0, elapsed - (phases.get('dns', 0.0) + phases.get('connect', 0.0) - opened)))
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    # HTTPAdapter cuyas conexiones nuevas registran las fases de DNS, conexion y TLS, ver capture_connection_timings
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool, 'https': _TimedHTTPSConnectionPool}
+
+
+class _HTTP2Stream(io.RawIOBase):
+    # Cuerpo de una respuesta de httpx con la interfaz de response.raw que esperan requests e ijson. httpx ya
+    # descomprime el cuerpo, por lo que 'decode_content' solo existe por compatibilidad
+    def __init__(self, response, release):
+        super().__init__()
+        self.decode_content = True
+        self._response = response
+        self._chunks = response.iter_bytes()
+        self._buffer = memoryview(b'')
+        self._release = release
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._response.close()
+            self._release()
+        super().close()
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    Adaptador de requests que envia las solicitudes con httpx sobre HTTP/2 cuando el servidor lo negocia (ALPN) y
+    sobre HTTP/1.1 en caso contrario. Con HTTP/2 las solicitudes concurrentes a un host comparten una sola conexion.
+    Requiere la libreria opcional 'httpx[http2]'. Ver ConnectionManager(http2=True).
+
+    Los reintentos ante 502, 503 y 504 y ante errores de conexion siguen la misma politica que el adaptador HTTP/1.1.
+    La verificacion TLS es la de httpx por defecto; los argumentos 'verify', 'cert' y 'proxies' de cada solicitud se
+    ignoran.
+
+    Args:
+        pool_maxsize (int, optional): Numero maximo de conexiones con el host. Por defecto es 10.
+    """
+
+    def __init__(self, pool_maxsize:int=DEFAULT_POOL_MAXSIZE):
+        super().__init__()
+        # httpx se importa solo al crear el adaptador, para que importar el paquete sea rapido
+        try:
+            self._httpx = importlib.import_module('httpx')
+            importlib.import_module('h2')
+        except ImportError:
+            raise ImportError("HTTP/2 requiere la libreria 'httpx[http2]'. Instalala con: pip install httpx[http2]")
+
+        limits = self._httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+        self.client = self._httpx.Client(http2=True, limits=limits, follow_redirects=False)
+        self._active = 0
+        self._closing = False
+        self._lock = threading.Lock()
+
+    def _timeout(self, timeout):
+        # requests acepta un numero o una tupla (conexion, lectura)
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect=connect)
+        return self._httpx.Timeout(timeout)
+
+    def _trace(self, event_name:str, info:dict, started:dict):
+        # httpcore resuelve el host dentro de connect_tcp, por lo que con este adaptador 'connect' incluye el DNS
+        phases = {'connection.connect_tcp': 'connect', 'connection.start_tls': 'tls'}
+        name, _, stage = event_name.rpartition('.')
+        if name in phases:
+            if stage == 'started':
+                started[name] = time.perf_counter()
+            elif stage == 'complete' and name in started:
+                _record_phase(phases[name], time.perf_counter() - started.pop(name))
+
+    def _send(self, request:requests.PreparedRequest, stream:bool, timeout):
+        httpx = self._httpx
+        started = {}
+        extensions = {'trace': lambda event_name, info: self._trace(event_name, info, started)}
+        httpx_request = self.client.build_request(request.method, request.url, headers=list(request.headers.items()),
+                                                  content=request.body, timeout=self._timeout(timeout), extensions=extensions)
+        try:
+            return self.client.send(httpx_request, stream=stream)
+        except httpx.ConnectTimeout as timeout_err:
+            raise requests.exceptions.ConnectTimeout(timeout_err, request=request) from timeout_err
+        except httpx.TimeoutException as timeout_err:
+            raise requests.exceptions.ReadTimeout(timeout_err, request=request) from timeout_err
+        except httpx.DecodingError as decode_err:
+            raise requests.exceptions.ContentDecodingError(decode_err, request=request) from decode_err
+        except httpx.TransportError as transport_err:
+            raise requests.exceptions.ConnectionError(transport_err, request=request) from transport_err
+
+    def _release(self):
+        with self._lock:
+            self._active -= 1
+            close = self._closing and self._active == 0
+        if close:
+            self.client.close()
+
+    def send(self, request:requests.PreparedRequest, stream:bool=False, timeout=None, verify=True, cert=None, proxies=None) -> requests.Response:
+        with self._lock:
+            if self._closing:
+                raise requests.exceptions.ConnectionError("El adaptador HTTP/2 esta cerrado.", request=request)
+            self._active += 1
+
+        try:
+            # Misma politica que Retry(total=5, backoff_factor=1) de urllib3: la primera espera es 0 y luego se duplica
+            for attempt in range(RETRY_TOTAL + 1):
+                if attempt:
+                    time.sleep(RETRY_BACKOFF_FACTOR * 2 ** (attempt - 1) if attempt > 1 else 0)
+                try:
+                    httpx_response = self._send(request, stream, timeout)
+                except requests.exceptions.ConnectionError:
+                    if attempt == RETRY_TOTAL or request.method not in ('GET', 'HEAD'):
+                        raise
+                    continue
+                if httpx_response.status_code not in RETRY_STATUS or attempt == RETRY_TOTAL or request.method not in ('GET', 'HEAD'):
+                    break
+                httpx_response.close()
+        except BaseException:
+            self._release()
+            raise
+
+        response = requests.Response()
+        response.status_code = httpx_response.status_code
+        response.headers = CaseInsensitiveDict(httpx_response.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = httpx_response.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+
+        if stream:
+            response.raw = _HTTP2Stream(httpx_response, self._release)
+        else:
+            try:
+                response._content = httpx_response.read()
+            except self._httpx.HTTPError as read_err:
+                raise requests.exceptions.ConnectionError(read_err, request=request) from read_err
+            finally:
+                httpx_response.close()
+                self._release()
+        return response
+
+    def close(self):
+        # Las solicitudes en curso terminan antes de cerrar el cliente, como ocurre con el pool de HTTPAdapter
+        with self._lock:
+            self._closing = True
+            close = self._active == 0
+        if close:
+            self.client.close()
+
+
+class ConnectionManager:
+    """
+    Administrador de conexiones compartido por los conectores. Todas las instancias usan la misma sesion de requests,
+    por lo que las conexiones persistentes (keep-alive) y las sesiones TLS se reutilizan entre instancias y entre
+    conectores del mismo proveedor. Cada host tiene su propio pool, dimensionado de forma independiente.
+
+    Por defecto todos los conectores del proceso comparten el mismo administrador, ver get_connection_manager.
+
+    Args:
+        pool_maxsize (int, optional): Tamaño por defecto del pool de cada host. Por defecto es 10.
+        pool_sizes (dict, optional): Tamaños por host, por ejemplo {'api.stlouisfed.org': 32}.
+        pool_block (bool, optional): Si es True, cuando el pool de un host esta lleno las solicitudes esperan una conexion
+                                libre en lugar de abrir una conexion temporal que despues se descarta. Por defecto es False.
+        http2 (bool, optional): Si es True, los hosts HTTPS usan HTTP2Adapter, que negocia HTTP/2 cuando el servidor
+                                lo admite. Requiere 'httpx[http2]'. Los hosts HTTP siguen en HTTP/1.1. Por defecto es False.
+
+    Example:
+        >>> manager = ConnectionManager(pool_sizes={'api.stlouisfed.org': 32}, pool_block=True)
+        >>> fred_api = Fred(token, connection_manager=manager)
+        >>> fred_api.prewarm_connections(8)
+    """
+
+    def __init__(self, pool_maxsize:int=DEFAULT_POOL_MAXSIZE, pool_sizes:dict=None, pool_block:bool=False, http2:bool=False):
+        if not isinstance(pool_maxsize, int) or pool_maxsize < 1:
+            raise ValueError("pool_maxsize debe ser un entero mayor o igual a 1.")
+
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.http2 = http2
+        self.session = requests.Session()
+        self._pool_sizes = {}
+        self._lock = threading.Lock()
+
+        self._mount('http://', self._adapter('http://', pool_maxsize))
+        self._mount('https://', self._adapter('https://', pool_maxsize))
+        for host, size in (pool_sizes or {}).items():
+            self.set_pool_size(host, size)
+
+    def _adapter(self, prefix:str, pool_maxsize:int) -> BaseAdapter:
+        # httpx solo negocia HTTP/2 sobre TLS, por lo que los hosts HTTP se quedan con urllib3
+        if self.http2 and prefix.startswith('https://'):
+            return HTTP2Adapter(pool_maxsize)
+        retries = Retry(total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF_FACTOR, status_forcelist=list(RETRY_STATUS))
+        return _TimedHTTPAdapter(max_retries=retries, pool_maxsize=pool_maxsize, pool_block=self.pool_block)
+
+    def _mount(self, prefix:str, adapter:BaseAdapter):
+        # Se reemplaza el diccionario completo de adaptadores para que los hilos que estan resolviendo una solicitud
+        # nunca vean el diccionario a medio modificar. requests usa el prefijo mas largo que coincide con la URL
+        adapters = OrderedDict(self.session.adapters)
+        replaced = adapters.get(prefix)
+        adapters[prefix] = adapter
+        self.session.adapters = OrderedDict(sorted(adapters.items(), key=lambda item: len(item[0]), reverse=True))
+
+        # Se cierran las conexiones libres del pool anterior; las que estan en uso se cierran al devolverse
+        if replaced is not None:
+            replaced.close()
+
+    def _prefix(self, url:str) -> str:
+        # Prefijo de montaje de un host, a partir de una URL o de un nombre de host. La diagonal final evita que el
+        # prefijo coincida con otros hosts que empiezan igual (api.host.com y api.host.com.mx)
+        parts = urlsplit(url if '://' in url else f"https://{url}")
+        return f"{parts.scheme}://{parts.netloc}/"
+
+    def pool_size(self, url:str) -> int:
+        """
+        Devuelve el tamaño del pool del host de una URL.
+        """
+        return self._pool_sizes.get(self._prefix(url), self.pool_maxsize)
+
+    def set_pool_size(self, url:str, pool_maxsize:int):
+        """
+        Define el tamaño del pool de un host. Las conexiones libres del pool anterior se cierran de inmediato y las
+        que estan en uso cuando terminan las solicitudes que las usan.
+
+        Args:
+            url (str): Una URL del host o el nombre del host.
+            pool_maxsize (int): Numero maximo de conexiones persistentes con el host.
+        """
+        if not isinstance(pool_maxsize, int) or pool_maxsize < 1:
+            raise ValueError("pool_maxsize debe ser un entero mayor o igual a 1.")
+
+        prefix = self._prefix(url)
+        with self._lock:
+            self._pool_sizes[prefix] = pool_maxsize
+            self._mount(prefix, self._adapter(prefix, pool_maxsize))
+
+    def ensure_pool_size(self, url:str, pool_maxsize:int) -> int:
+        """
+        Amplia el pool de un host si es menor a 'pool_maxsize'. Nunca lo reduce, porque otros conectores pueden
+        necesitar el tamaño actual.
+
+        Returns:
+            int: El tamaño del pool del host.
+        """
+        prefix = self._prefix(url)
+        with self._lock:
+            current = self._pool_sizes.get(prefix, self.pool_maxsize)
+            if pool_maxsize > current or prefix not in self._pool_sizes:
+                current = max(current, pool_maxsize)
+                self._pool_sizes[prefix] = current
+                self._mount(prefix, self._adapter(prefix, current))
+            return current
+
+    def prewarm(self, url:str, connections:int=1, timeout:float=10) -> int:
+        """
+        Abre conexiones con un host antes de usarlas, de modo que la resolucion DNS y el saludo TLS no se paguen en
+        las primeras solicitudes. Se realizan solicitudes HEAD concurrentes y las conexiones quedan en el pool.
+
+        Args:
+            url (str): Una URL del host.
+            connections (int, optional): Numero de conexiones a abrir. Se limita al tamaño del pool. Por defecto es 1.
+            timeout (float, optional): Tiempo maximo de espera por conexion en segundos.
+
+        Returns:
+            int: Numero de conexiones abiertas con exito.
+        """
+        prefix = self._prefix(url)
+        connections = max(1, min(connections, self.pool_size(url)))
+
+        def open_connection(_):
+            try:
+                self.session.head(prefix, timeout=timeout, allow_redirects=False).close()
+                return True
+            except requests.exceptions.RequestException as req_err:
+                logging.warning(f"No se pudo abrir una conexion con {prefix}: {req_err}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            return sum(executor.map(open_connection, range(connections)))
+
+    def close(self):
+        self.session.close()
+
+
+# Administrador compartido por todos los conectores del proceso
+_default_manager = None
+_default_manager_lock = threading.Lock()
+
+
+def get_connection_manager() -> ConnectionManager:
+    """
+    Devuelve el administrador de conexiones compartido por el proceso, creandolo la primera vez.
+    """
+    global _default_manager
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = ConnectionManager()
+        return _default_manager
+
+
+def set_connection_manager(manager:ConnectionManager):
+    """
+    Reemplaza el administrador de conexiones compartido por el proceso. Afecta a los conectores que se creen despues.
+
+    Example:
+        >>> set_connection_manager(ConnectionManager(pool_maxsize=20, pool_block=True))
+    """
+    global _default_manager
+    if not isinstance(manager, ConnectionManager):
+        raise ValueError("manager debe ser una instancia de ConnectionManager.")
+    with _default_manager_lock:
+        _default_manager = manager
@@ -0,0 +1,53 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+from __future__ import annotations
+
+from .columnar import ColumnarSeries
+
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# Funciones ------------------------------------------------------------------------------------
+
+def build_frame(series_list:list, preallocate:bool=True) -> pd.DataFrame:
+    """
+    Une varias series en un DataFrame en un solo paso, alineandolas sobre la union ordenada de sus indices.
+    Sustituye a llamar pd.concat una vez por serie, que copia todo el DataFrame en cada iteracion.
+
+    Args:
+        series_list (list): Lista de pandas.Series con nombre o de ColumnarSeries. Cada nombre se usa como columna.
+        preallocate (bool, optional): Si es True y todas las series son numericas, los valores se escriben
+                                directamente en un bloque float64 preasignado. Por defecto es True.
+
+    Returns:
+        pandas.DataFrame: Un DataFrame con una columna por serie, ordenado por el indice.
+
+    Example:
+        >>> df = build_frame([serie_a, serie_b, serie_c])
+    """
+
+    if not series_list:
+        return pd.DataFrame()
+
+    # Las series columnares se exponen como pandas.Series sin copiar sus arreglos
+    series_list = [serie.to_pandas() if isinstance(serie, ColumnarSeries) else serie for serie in series_list]
+
+    numeric = all(pd.api.types.is_numeric_dtype(serie.dtype) for serie in series_list)
+    if not (preallocate and numeric):
+        return pd.concat(series_list, axis=1, join='outer').sort_index()
+
+    # Union de los indices en una sola pasada. Si los tipos de los indices no son comparables se usa pd.concat
+    try:
+        index = pd.Index(np.unique(np.concatenate([serie.index.to_numpy() for serie in series_list])))
+    except TypeError:
+        return pd.concat(series_list, axis=1, join='outer').sort_index()
+
+    # Bloque float64 preasignado. Cada serie se escribe en su columna a partir de sus posiciones en el indice comun
+    block = np.full((len(index), len(series_list)), np.nan, dtype='float64')
+    for column, serie in enumerate(series_list):
+        block[index.get_indexer(serie.index), column] = serie.to_numpy(dtype='float64', na_value=np.nan)
+
+    return pd.DataFrame(block, index=index, columns=[serie.name for serie in series_list], copy=False)
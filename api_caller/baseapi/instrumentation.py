@@ -0,0 +1,335 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+import time
+import bisect
+import logging
+import threading
+import importlib
+
+# Constantes -----------------------------------------------------------------------------------
+
+# Limites de los histogramas de duracion, en segundos
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Funciones ------------------------------------------------------------------------------------
+
+def _format_labels(labels:tuple) -> str:
+    # Las comillas, diagonales invertidas y saltos de linea se escapan segun el formato de texto de Prometheus
+    escaped = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+# Clases ---------------------------------------------------------------------------------------
+
+class RequestEvent:
+    """
+    Registro de una solicitud de BaseAPI. Se entrega a los hooks posteriores y a los callbacks de eventos.
+
+    Attributes:
+        provider (str): El proveedor del conector.
+        method (str): El metodo HTTP.
+        url (str): La URL sin parametros de consulta y con la llave de la API oculta.
+        status (int): El codigo de respuesta, o None si la solicitud fallo antes de recibirlo.
+        cache (str): 'hit' (respondida por la cache), 'revalidated' (304), 'miss' (consulto la red con cache) o None sin cache.
+        retries (int): Numero de reintentos por respuestas 429.
+        response_bytes (int): Tamaño del cuerpo recibido.
+        timings (dict): Segundos por fase: 'queue' (espera en el limitador), 'dns' (resolucion del host), 'connect'
+                        (conexion TCP), 'tls' (saludo TLS), 'ttfb' (desde enviar la solicitud hasta recibir los
+                        encabezados), 'download' (cuerpo), 'decode' (JSON) y 'total'. 'dns', 'connect' y 'tls' solo
+                        aparecen si la solicitud abrio una conexion nueva; con HTTP2Adapter 'connect' incluye el DNS.
+        started_at (int): Inicio de la solicitud en nanosegundos desde la epoca.
+        error (str): Descripcion del error, si la solicitud fallo.
+        stream (bool): True si la respuesta se lee de forma incremental (sin fases de descarga ni decodificacion).
+        coalesced (bool): True si la llamada recibio la respuesta de una solicitud identica que ya estaba en vuelo.
+    """
+
+    __slots__ = ('provider', 'method', 'url', 'status', 'cache', 'retries', 'response_bytes', 'timings', 'started_at', 'error', 'stream', 'coalesced', '_start')
+
+    def __init__(self, provider:str, method:str, url:str, stream:bool=False):
+        self.provider = provider
+        self.method = method
+        self.url = url
+        self.status = None
+        self.cache = None
+        self.retries = 0
+        self.response_bytes = 0
+        self.timings = {}
+        self.started_at = time.time_ns()
+        self.error = None
+        self.stream = stream
+        self.coalesced = False
+        self._start = time.perf_counter()
+
+    def finish(self):
+        self.timings['total'] = time.perf_counter() - self._start
+
+    def __repr__(self):
+        return f"RequestEvent({self.provider!r}, {self.url!r}, status={self.status}, cache={self.cache!r}, total={self.timings.get('total', 0):.4f}s)"
+
+
+class Instrumentation:
+    """
+    Punto de extension para observar las solicitudes de los conectores. Permite registrar:
+
+    - Hooks previos, llamados como hook(connector, method, url, headers, params) antes de cada solicitud. Pueden
+      modificar los encabezados (por ejemplo para agregar un identificador de traza).
+    - Hooks posteriores, llamados como hook(connector, event, response) al terminar cada solicitud. 'response' es
+      None si la respuesta vino de la cache o si la solicitud fallo.
+    - Callbacks de eventos, llamados como callback(event) con cada RequestEvent (por ejemplo MetricsCollector).
+
+    Por defecto todos los conectores del proceso comparten la misma instancia, ver get_instrumentation. Un error en un
+    hook o callback se registra en el log y no interrumpe la solicitud.
+
+    Example:
+        >>> metrics = MetricsCollector()
+        >>> get_instrumentation().add_event_callback(metrics)
+        >>> df = Fred(token).get_series_data(['GDP', 'UNRATE'])
+        >>> print(metrics.to_prometheus())
+    """
+
+    def __init__(self):
+        self._pre_hooks = []
+        self._post_hooks = []
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return bool(self._pre_hooks or self._post_hooks or self._callbacks)
+
+    def add_pre_request_hook(self, hook):
+        with self._lock:
+            self._pre_hooks = self._pre_hooks + [hook]
+        return hook
+
+    def add_post_request_hook(self, hook):
+        with self._lock:
+            self._post_hooks = self._post_hooks + [hook]
+        return hook
+
+    def add_event_callback(self, callback):
+        with self._lock:
+            self._callbacks = self._callbacks + [callback]
+        return callback
+
+    def remove(self, function):
+        """
+        Elimina un hook o callback registrado.
+        """
+        with self._lock:
+            self._pre_hooks = [hook for hook in self._pre_hooks if hook is not function]
+            self._post_hooks = [hook for hook in self._post_hooks if hook is not function]
+            self._callbacks = [callback for callback in self._callbacks if callback is not function]
+
+    def before_request(self, connector, method:str, url:str, headers:dict, params:dict):
+        for hook in self._pre_hooks:
+            try:
+                hook(connector, method, url, headers, params)
+            except Exception as hook_err:
+                logging.error(f"Instrumentation pre-request hook failed: {hook_err}")
+
+    def after_request(self, connector, event:RequestEvent, response=None):
+        event.finish()
+        for hook in self._post_hooks:
+            try:
+                hook(connector, event, response)
+            except Exception as hook_err:
+                logging.error(f"Instrumentation post-request hook failed: {hook_err}")
+        for callback in self._callbacks:
+            try:
+                callback(event)
+            except Exception as callback_err:
+                logging.error(f"Instrumentation event callback failed: {callback_err}")
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets:tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value:float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsCollector:
+    """
+    Callback de eventos que acumula contadores e histogramas por proveedor y los exporta en formato de texto
+    de Prometheus.
+
+    Metricas:
+        api_caller_requests_total{provider, status}: Solicitudes terminadas por codigo de respuesta ('cached' si las respondio
+                                                la cache, 'coalesced' si compartieron una solicitud en vuelo, 'error' si fallaron).
+        api_caller_cache_total{provider, result}: Resultado de la consulta a la cache ('hit', 'revalidated', 'miss').
+        api_caller_retries_total{provider}: Reintentos por respuestas 429.
+        api_caller_response_bytes_total{provider}: Bytes recibidos.
+        api_caller_request_duration_seconds{provider, phase}: Histograma de duracion por fase.
+
+    Args:
+        buckets (tuple, optional): Limites de los histogramas en segundos.
+
+    Example:
+        >>> metrics = get_instrumentation().add_event_callback(MetricsCollector())
+    """
+
+    def __init__(self, buckets:tuple=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def _increment(self, name:str, labels:tuple, amount:float=1):
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def __call__(self, event:RequestEvent):
+        provider = event.provider or 'unknown'
+        with self._lock:
+            status = 'error' if event.error is not None else 'coalesced' if event.coalesced else 'cached' if event.status is None else str(event.status)
+            self._increment('api_caller_requests_total', (('provider', provider), ('status', status)))
+            if event.cache is not None:
+                self._increment('api_caller_cache_total', (('provider', provider), ('result', event.cache)))
+            if event.retries:
+                self._increment('api_caller_retries_total', (('provider', provider),), event.retries)
+            if event.response_bytes:
+                self._increment('api_caller_response_bytes_total', (('provider', provider),), event.response_bytes)
+
+            for phase, seconds in event.timings.items():
+                key = (('provider', provider), ('phase', phase))
+                if key not in self._histograms:
+                    self._histograms[key] = _Histogram(self.buckets)
+                self._histograms[key].observe(seconds)
+
+    def counters(self) -> dict:
+        """
+        Devuelve los contadores como {(nombre, etiquetas): valor}.
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def histogram(self, provider:str, phase:str='total') -> dict:
+        """
+        Devuelve el histograma de una fase como diccionario con 'buckets' (acumulados), 'sum' y 'count'.
+        """
+        with self._lock:
+            histogram = self._histograms.get((('provider', provider), ('phase', phase)))
+            if histogram is None:
+                return {'buckets': {}, 'sum': 0.0, 'count': 0}
+            cumulative, total = {}, 0
+            for bound, count in zip(list(self.buckets) + [float('inf')], histogram.counts):
+                total += count
+                cumulative[bound] = total
+            return {'buckets': cumulative, 'sum': histogram.sum, 'count': histogram.count}
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+
+    def to_prometheus(self) -> str:
+        """
+        Exporta las metricas en el formato de texto de Prometheus.
+        """
+
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(histogram.counts), histogram.sum, histogram.count) for key, histogram in self._histograms.items()}
+
+        descriptions = {
+            'api_caller_requests_total': 'Solicitudes terminadas por proveedor y codigo de respuesta.',
+            'api_caller_cache_total': 'Consultas a la cache de respuestas por resultado.',
+            'api_caller_retries_total': 'Reintentos por respuestas 429.',
+            'api_caller_response_bytes_total': 'Bytes recibidos.',
+        }
+
+        lines = []
+        for name, description in descriptions.items():
+            samples = sorted((labels, value) for (metric, labels), value in counters.items() if metric == name)
+            if not samples:
+                continue
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            lines += [f"{name}{_format_labels(labels)} {value:g}" for labels, value in samples]
+
+        if histograms:
+            name = 'api_caller_request_duration_seconds'
+            lines += [f"# HELP {name} Duracion de las solicitudes por fase.", f"# TYPE {name} histogram"]
+            for labels, (counts, total_sum, count) in sorted(histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(list(self.buckets) + ['+Inf'], counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound if bound == '+Inf' else f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total_sum:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        return '\n'.join(lines) + '\n'
+
+
+class OpenTelemetryExporter:
+    """
+    Callback de eventos que registra cada solicitud como un span de OpenTelemetry, con la duracion real de la
+    solicitud y sus fases como atributos. Requiere la libreria opcional 'opentelemetry-api'.
+
+    Args:
+        tracer: Un tracer de OpenTelemetry. Por defecto se usa trace.get_tracer('api_caller').
+
+    Example:
+        >>> get_instrumentation().add_event_callback(OpenTelemetryExporter())
+    """
+
+    def __init__(self, tracer=None):
+        # opentelemetry se importa solo al crear el exportador, porque importarlo toma varias decenas de milisegundos
+        try:
+            self._trace = importlib.import_module('opentelemetry.trace')
+        except ImportError:
+            self._trace = None
+
+        if tracer is None:
+            if self._trace is None:
+                raise ImportError("OpenTelemetryExporter requiere la libreria 'opentelemetry-api'. Instalala con: pip install opentelemetry-api")
+            tracer = self._trace.get_tracer('api_caller')
+        self.tracer = tracer
+
+    def __call__(self, event:RequestEvent):
+        attributes = {
+            'http.request.method': event.method,
+            'url.full': event.url,
+            'api_caller.provider': event.provider or 'unknown',
+            'api_caller.retries': event.retries,
+            'api_caller.response_bytes': event.response_bytes,
+        }
+        if event.status is not None:
+            attributes['http.response.status_code'] = event.status
+        if event.cache is not None:
+            attributes['api_caller.cache'] = event.cache
+        if event.coalesced:
+            attributes['api_caller.coalesced'] = True
+        for phase, seconds in event.timings.items():
+            attributes[f"api_caller.{phase}_seconds"] = seconds
+
+        span = self.tracer.start_span(f"{event.method} {event.provider or 'api_caller'}", start_time=event.started_at, attributes=attributes)
+        if event.error is not None and self._trace is not None:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, event.error))
+        span.end(end_time=event.started_at + int(event.timings.get('total', 0) * 1e9))
+
+
+# Instrumentacion compartida por todos los conectores del proceso
+_default_instrumentation = None
+_default_instrumentation_lock = threading.Lock()
+
+
+def get_instrumentation() -> Instrumentation:
+    """
+    Devuelve la instrumentacion compartida por el proceso, creandola la primera vez.
+    """
+    global _default_instrumentation
+    with _default_instrumentation_lock:
+        if _default_instrumentation is None:
+            _default_instrumentation = Instrumentation()
+        return _default_instrumentation
@@ -0,0 +1,86 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+import time
+import threading
+
+# Clase ----------------------------------------------------------------------------------------
+
+class MetadataRegistry:
+    """
+    Registro en memoria de los metadatos de las series (titulo, periodicidad, unidades, etc.) por proveedor e ID.
+    Los metadatos cambian muy rara vez, por lo que se conservan con un tiempo de vida largo y los conectores
+    solo consultan a la API los IDs que no estan en el registro.
+
+    Por defecto todos los conectores del proceso comparten el mismo registro, ver get_metadata_registry.
+
+    Args:
+        ttl (float, optional): Segundos que los metadatos se consideran vigentes. Por defecto son 30 dias.
+
+    Example:
+        >>> registry = MetadataRegistry(ttl=7*86400)
+        >>> banxico_api = Banxico_SIE(token, metadata_registry=registry)
+        >>> banxico_api.prefetch_metadata(['SF43718', 'SF61745'])
+    """
+
+    def __init__(self, ttl:float=30*86400):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, provider:str, serie_ids:list) -> tuple:
+        """
+        Busca los metadatos vigentes de varias series.
+
+        Returns:
+            tuple: Un diccionario {serie_id: metadatos} con las series encontradas y una lista con los IDs faltantes.
+        """
+        now = time.time()
+        found, missing = {}, []
+        with self._lock:
+            for serie_id in serie_ids:
+                entry = self._entries.get((provider, serie_id))
+                if entry is not None and now - entry[0] < self.ttl:
+                    found[serie_id] = dict(entry[1])
+                else:
+                    missing.append(serie_id)
+        return found, missing
+
+    def update(self, provider:str, metadata:dict):
+        """
+        Guarda los metadatos de un diccionario {serie_id: metadatos}.
+        """
+        now = time.time()
+        with self._lock:
+            for serie_id, serie_metadata in metadata.items():
+                self._entries[(provider, serie_id)] = (now, dict(serie_metadata))
+
+    def invalidate(self, provider:str, serie_ids:list=None):
+        """
+        Elimina los metadatos de las series indicadas, o de todo el proveedor si no se indican IDs.
+        """
+        with self._lock:
+            if serie_ids is None:
+                self._entries = {key: value for key, value in self._entries.items() if key[0] != provider}
+            else:
+                for serie_id in serie_ids:
+                    self._entries.pop((provider, serie_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+
+# Registro compartido por todos los conectores del proceso
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_metadata_registry() -> MetadataRegistry:
+    """
+    Devuelve el registro de metadatos compartido por el proceso, creandolo la primera vez.
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = MetadataRegistry()
+        return _default_registry
@@ -0,0 +1,167 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+import threading
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from .parsing import parse_values
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# Constantes -----------------------------------------------------------------------------------
+
+# Por debajo de este numero de observaciones convertir en el proceso principal es mas rapido que enviar los datos a otros procesos
+DEFAULT_MIN_OBSERVATIONS = 100_000
+
+# Funciones ------------------------------------------------------------------------------------
+
+def _parse_entry(entry:tuple, date_parser, na_values:tuple, thousands:str) -> tuple:
+    # Convierte una serie (ID, fechas en texto, valores en texto, argumentos adicionales del parser de fechas)
+    _, dates, values, date_args = entry
+    index = pd.DatetimeIndex(date_parser(dates, *date_args))
+    return index.to_numpy().astype('datetime64[ns]', copy=False).view('int64'), parse_values(values, na_values, thousands)
+
+
+def _parse_chunk(shm_name:str, total:int, start:int, entries:list, date_parser, na_values:tuple, thousands:str):
+    # Se ejecuta en un proceso de trabajo. Escribe las fechas y los valores del bloque en su tramo de la memoria compartida
+    shm = SharedMemory(name=shm_name)
+    dates = values = None
+    try:
+        dates = np.ndarray(total, dtype='int64', buffer=shm.buf)
+        values = np.ndarray(total, dtype='float64', buffer=shm.buf, offset=total * 8)
+        for entry in entries:
+            entry_dates, entry_values = _parse_entry(entry, date_parser, na_values, thousands)
+            end = start + len(entry_dates)
+            dates[start:end] = entry_dates
+            values[start:end] = entry_values
+            start = end
+    finally:
+        # Las vistas deben liberarse antes de cerrar el bloque, tambien si la conversion fallo
+        dates = values = None
+        shm.close()
+
+
+def _split_entries(entries:list, lengths:list, n_chunks:int) -> list:
+    # Divide la lista en bloques contiguos con un numero parecido de observaciones, conservando el orden de las series
+    bounds = np.cumsum(lengths)
+    targets = bounds[-1] * np.arange(1, n_chunks) / n_chunks
+    cuts = [0, *np.unique(np.searchsorted(bounds, targets, side='left') + 1).tolist(), len(entries)]
+    return [(cuts[i], cuts[i + 1]) for i in range(len(cuts) - 1) if cuts[i] < cuts[i + 1]]
+
+# Clase ----------------------------------------------------------------------------------------
+
+class ProcessParser:
+    """
+    Backend opcional que convierte las respuestas con muchas series en varios procesos. La lista de series se divide
+    en bloques contiguos con un numero parecido de observaciones; cada proceso convierte las fechas y los valores de su
+    bloque y los escribe directamente en un buffer de memoria compartida, de modo que los resultados no se serializan
+    con pickle. El proceso principal lee el buffer una sola vez y arma las series y el DataFrame final.
+
+    Las respuestas con menos de 'min_observations' observaciones, o con una sola serie, se convierten en el proceso
+    principal, porque enviarlas a otros procesos cuesta mas de lo que se ahorra. El pool de procesos se crea la primera
+    vez que se necesita y se reutiliza; una misma instancia puede compartirse entre conectores. Con 'spawn' (el metodo
+    por defecto en Windows y macOS) el script principal debe proteger su codigo con if __name__ == '__main__'.
+
+    Args:
+        max_workers (int, optional): Numero de procesos. Por defecto el numero de nucleos disponibles.
+        min_observations (int, optional): Observaciones minimas para usar los procesos. Por defecto es 100,000.
+        mp_context (str, optional): Metodo de inicio de los procesos ('fork', 'spawn' o 'forkserver'). Por defecto el de multiprocessing.
+
+    Example:
+        >>> with ProcessParser(max_workers=16) as parser:
+        ...     banxico_api = Banxico_SIE(token, parser=parser)
+        ...     df = banxico_api.get_series_data(series_ids, start_date='1990-01-01')
+    """
+
+    def __init__(self, max_workers:int=None, min_observations:int=DEFAULT_MIN_OBSERVATIONS, mp_context:str=None):
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            raise ValueError("max_workers debe ser un entero mayor o igual a 1.")
+        if not isinstance(min_observations, int) or min_observations < 0:
+            raise ValueError("min_observations debe ser un entero mayor o igual a 0.")
+
+        if max_workers is None:
+            max_workers = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+        self.max_workers = max_workers
+        self.min_observations = min_observations
+        self.mp_context = mp_context
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                context = multiprocessing.get_context(self.mp_context) if self.mp_context else None
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            return self._pool
+
+    def parse(self, entries, date_parser, na_values:tuple=(), thousands:str=None) -> list:
+        """
+        Convierte las fechas y los valores de varias series.
+
+        Args:
+            entries: Lista de tuplas (ID, fechas en texto, valores en texto, argumentos adicionales de date_parser).
+            date_parser: Funcion de nivel de modulo (o functools.partial) llamada como date_parser(fechas, *argumentos)
+                        que devuelve las fechas. Debe poder enviarse a otros procesos.
+            na_values (tuple, optional): Valores que representan una observacion faltante.
+            thousands (str, optional): Separador de miles.
+
+        Returns:
+            list: Tuplas (ID, DatetimeIndex, arreglo float64 de valores), en el orden de 'entries'.
+
+        Example:
+            >>> parser.parse([('SF43718', ['01/01/2024'], ['17.05'], ())], partial(parse_dates, date_format='%d/%m/%Y'))
+        """
+
+        entries = list(entries)
+        lengths = [len(entry[1]) for entry in entries]
+        total = sum(lengths)
+
+        if self.max_workers == 1 or len(entries) < 2 or total < max(self.min_observations, 1):
+            parsed = (_parse_entry(entry, date_parser, na_values, thousands) for entry in entries)
+            return [(entry[0], pd.DatetimeIndex(dates.view('datetime64[ns]')), values) for entry, (dates, values) in zip(entries, parsed)]
+
+        offsets = np.cumsum([0] + lengths)
+        chunks = _split_entries(entries, lengths, min(len(entries), self.max_workers * 2))
+
+        # Un solo bloque de memoria compartida: primero todas las fechas (int64) y despues todos los valores (float64)
+        shm = SharedMemory(create=True, size=total * 16)
+        try:
+            executor = self._executor()
+            futures = [executor.submit(_parse_chunk, shm.name, total, int(offsets[first]), entries[first:last], date_parser, na_values, thousands) for first, last in chunks]
+
+            # Se espera a todos los procesos antes de liberar el bloque, aunque alguno falle
+            wait(futures)
+            for future in futures:
+                future.result()
+
+            # Una sola copia para poder liberar la memoria compartida; cada serie es una vista de estos arreglos
+            dates = np.ndarray(total, dtype='int64', buffer=shm.buf).copy()
+            values = np.ndarray(total, dtype='float64', buffer=shm.buf, offset=total * 8).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        dates = dates.view('datetime64[ns]')
+        return [(entry[0], pd.DatetimeIndex(dates[offsets[i]:offsets[i + 1]]), values[offsets[i]:offsets[i + 1]]) for i, entry in enumerate(entries)]
+
+    def close(self):
+        """
+        Detiene el pool de procesos. Se vuelve a crear si se usa de nuevo.
+        """
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
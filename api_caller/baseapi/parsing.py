@@ -0,0 +1,78 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+from __future__ import annotations
+
+from operator import itemgetter
+
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# Funciones ------------------------------------------------------------------------------------
+
+def parse_values(values:list, na_values:tuple=(), thousands:str=None) -> np.ndarray:
+    """
+    Convierte un arreglo completo de valores en texto a un arreglo float64 en una sola llamada. Los valores
+    centinela (por ejemplo 'N/E' en Banxico o '.' en FRED) y los valores nulos se marcan como NaN.
+
+    Args:
+        values (list): Los valores de las observaciones.
+        na_values (tuple, optional): Valores que representan una observacion faltante.
+        thousands (str, optional): Separador de miles que se elimina antes de la conversion.
+
+    Returns:
+        numpy.ndarray: Un arreglo float64 con NaN en las observaciones faltantes.
+    """
+
+    values = pd.Series(values, dtype=object)
+    if values.empty:
+        return np.array([], dtype='float64')
+
+    mask = values.isna()
+    if na_values:
+        mask |= values.isin(na_values)
+    values = values.mask(mask)
+
+    if thousands:
+        values = values.str.replace(thousands, '', regex=False)
+
+    return pd.to_numeric(values, errors='raise').to_numpy(dtype='float64', na_value=np.nan)
+
+
+def parse_dates(dates:list, date_format:str) -> pd.DatetimeIndex:
+    """
+    Convierte un arreglo completo de fechas en texto a un DatetimeIndex con un formato explicito.
+
+    Args:
+        dates (list): Las fechas de las observaciones.
+        date_format (str): El formato de las fechas, por ejemplo '%d/%m/%Y'.
+
+    Returns:
+        pandas.DatetimeIndex: Las fechas convertidas.
+    """
+    return pd.DatetimeIndex(pd.to_datetime(pd.Index(dates, dtype=object), format=date_format))
+
+
+def parse_observations(entries:list, date_key:str, value_key:str, date_format:str, na_values:tuple=(), thousands:str=None) -> tuple:
+    """
+    Extrae y convierte las fechas y valores de una lista de observaciones en formato JSON.
+
+    Args:
+        entries (list): Lista de diccionarios con las observaciones.
+        date_key (str): La llave de la fecha en cada observacion.
+        value_key (str): La llave del valor en cada observacion.
+        date_format (str): El formato de las fechas.
+        na_values (tuple, optional): Valores que representan una observacion faltante.
+        thousands (str, optional): Separador de miles.
+
+    Returns:
+        tuple: Un DatetimeIndex con las fechas y un arreglo float64 con los valores.
+
+    Example:
+        >>> index, values = parse_observations(serie_data['datos'], 'fecha', 'dato', '%d/%m/%Y', na_values=('N/E',), thousands=',')
+    """
+    dates = list(map(itemgetter(date_key), entries))
+    values = list(map(itemgetter(value_key), entries))
+    return parse_dates(dates, date_format), parse_values(values, na_values, thousands)
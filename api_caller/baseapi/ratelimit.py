@@ -0,0 +1,164 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+import time
+import asyncio
+import threading
+
+# Constantes -----------------------------------------------------------------------------------
+
+# Cuotas por proveedor como (solicitudes, periodo en segundos). FRED publica 120 solicitudes por minuto y Banxico
+# 200 consultas cada 5 minutos; INEGI, el BIS y el Banco Mundial no publican una cuota, por lo que se usan valores conservadores.
+PROVIDER_RATE_LIMITS = {
+    'banxico': (200, 300),
+    'fred': (120, 60),
+    'inegi': (300, 60),
+    'inegi_denue': (300, 60),
+    'bis': (60, 60),
+    'worldbank': (120, 60),
+}
+
+# Fraccion de la cuota que se utiliza, para quedar justo por debajo del limite del proveedor
+SAFETY_FACTOR = 0.95
+
+# Clase ----------------------------------------------------------------------------------------
+
+class TokenBucket:
+    """
+    Limitador de solicitudes de tipo token bucket, seguro para hilos y para asyncio. Cada solicitud reserva un token;
+    si no hay tokens disponibles, la solicitud espera el tiempo necesario para que se genere uno nuevo. Las reservas
+    se hacen bajo un candado, por lo que el orden de llegada se respeta entre hilos y corrutinas.
+
+    Args:
+        rate (float): Numero de solicitudes permitidas por periodo.
+        per (float, optional): Duracion del periodo en segundos. Por defecto es 1.
+        burst (int, optional): Numero maximo de solicitudes que pueden salir de golpe. Por defecto es 1 (solicitudes espaciadas uniformemente).
+        name (str, optional): Nombre del limitador, usado en las metricas.
+
+    Example:
+        >>> limiter = TokenBucket(120, per=60, name='fred')
+        >>> fred_api = Fred(token, rate_limiter=limiter)
+    """
+
+    def __init__(self, rate:float, per:float=1.0, burst:int=1, name:str=None):
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate y per deben ser mayores a 0.")
+        if not isinstance(burst, int) or burst < 1:
+            raise ValueError("burst debe ser un entero mayor o igual a 1.")
+
+        self.name = name
+        self.fill_rate = rate / per
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        # Metricas de espera
+        self._requests = 0
+        self._waited = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._penalties = 0
+
+    def _reserve(self) -> float:
+        # Reserva un token y devuelve los segundos que hay que esperar para usarlo
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.fill_rate)
+            self._updated_at = now
+            self._tokens -= 1
+
+            wait = -self._tokens / self.fill_rate if self._tokens < 0 else 0.0
+            wait = max(wait, self._blocked_until - now)
+
+            self._requests += 1
+            if wait > 0:
+                self._waited += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            return wait
+
+    def acquire(self):
+        """
+        Espera (bloqueando el hilo) hasta que la siguiente solicitud pueda realizarse.
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """
+        Espera (sin bloquear el event loop) hasta que la siguiente solicitud pueda realizarse.
+        """
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, seconds:float):
+        """
+        Detiene todas las solicitudes durante los segundos indicados, por ejemplo tras un 429 con encabezado Retry-After.
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._penalties += 1
+
+    def stats(self) -> dict:
+        """
+        Devuelve las metricas de espera del limitador.
+
+        Returns:
+            dict: Numero de solicitudes, solicitudes que tuvieron que esperar, tiempo de espera total, promedio y maximo
+                en segundos, y numero de penalizaciones por respuestas 429.
+        """
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'waited': self._waited,
+                'total_wait': self._total_wait,
+                'mean_wait': self._total_wait / self._requests if self._requests else 0.0,
+                'max_wait': self._max_wait,
+                'penalties': self._penalties,
+            }
+
+
+# Limitadores compartidos por todos los conectores del proceso, uno por proveedor
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider:str) -> TokenBucket:
+    """
+    Devuelve el limitador compartido de un proveedor, o None si el proveedor no tiene una cuota configurada.
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            if provider not in PROVIDER_RATE_LIMITS:
+                return None
+            rate, per = PROVIDER_RATE_LIMITS[provider]
+
+            # La rafaga se limita al margen de seguridad, de modo que ninguna ventana del periodo exceda la cuota
+            burst = max(1, int(rate * (1 - SAFETY_FACTOR)))
+            _limiters[provider] = TokenBucket(rate * SAFETY_FACTOR, per, burst=burst, name=provider)
+        return _limiters[provider]
+
+
+def set_rate_limit(provider:str, rate:float, per:float=1.0, burst:int=1) -> TokenBucket:
+    """
+    Reemplaza la cuota compartida de un proveedor. Afecta a los conectores que se creen despues de la llamada.
+
+    Example:
+        >>> set_rate_limit('inegi', 10, per=1)
+    """
+    limiter = TokenBucket(rate, per, burst, name=provider)
+    with _limiters_lock:
+        _limiters[provider] = limiter
+    return limiter
+
+
+def get_rate_limit_stats() -> dict:
+    """
+    Devuelve las metricas de espera de todos los limitadores compartidos, por proveedor.
+    """
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {provider: limiter.stats() for provider, limiter in limiters.items()}
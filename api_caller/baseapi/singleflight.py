@@ -0,0 +1,135 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+import json
+import hashlib
+import threading
+
+# Clases ---------------------------------------------------------------------------------------
+
+class _Call:
+    # Solicitud en vuelo: el primer hilo la ejecuta y los demas esperan su resultado
+    __slots__ = ('done', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Agrupa las solicitudes identicas que estan en vuelo al mismo tiempo. La primera llamada con una llave ejecuta la
+    solicitud y las llamadas que llegan mientras tanto con la misma llave esperan y reciben el mismo resultado (o la
+    misma excepcion), sin volver a consultar la API. En cuanto la solicitud termina, la llave se libera y la siguiente
+    llamada vuelve a ir a la red (o a la cache).
+
+    Por defecto todos los conectores del proceso comparten el mismo grupo, ver get_single_flight. Los hilos de los
+    conectores asincronos tambien pasan por el grupo, por lo que las corrutinas se agrupan de la misma forma.
+
+    Example:
+        >>> group = get_single_flight()
+        >>> group.stats()
+        {'leaders': 10, 'followers': 32, 'in_flight': 0}
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._followers = 0
+
+    @staticmethod
+    def make_key(method:str, url:str, params:dict=None, headers:dict=None, raw:bool=False) -> str:
+        # Los encabezados son parte de la llave para que dos claves de API distintas nunca compartan una respuesta
+        normalized = json.dumps([method.upper(), url, sorted((params or {}).items()), sorted((headers or {}).items()), raw], default=str)
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def do(self, key:str, function, on_shared=None) -> tuple:
+        """
+        Ejecuta 'function' una sola vez por cada grupo de llamadas simultaneas con la misma llave.
+
+        Args:
+            key (str): La llave normalizada de la solicitud, ver make_key.
+            function: Funcion sin argumentos que realiza la solicitud.
+            on_shared (optional): Funcion llamada como on_shared(error) en las llamadas que reciben el resultado de otra,
+                                con la excepcion compartida o None. Permite registrarlas en la instrumentacion.
+
+        Returns:
+            tuple: El resultado de la funcion y un booleano que indica si se compartio el de otra llamada.
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._leaders += 1
+            else:
+                call.followers += 1
+                self._followers += 1
+
+        if not leader:
+            call.done.wait()
+            if on_shared is not None:
+                on_shared(call.error)
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        """
+        Devuelve el numero de solicitudes ejecutadas ('leaders'), las que recibieron el resultado de otra
+        ('followers') y las que estan en vuelo.
+        """
+        with self._lock:
+            return {'leaders': self._leaders, 'followers': self._followers, 'in_flight': len(self._calls)}
+
+    def reset_stats(self):
+        with self._lock:
+            self._leaders = 0
+            self._followers = 0
+
+# Funciones ------------------------------------------------------------------------------------
+
+# Grupo compartido por todos los conectores del proceso
+_default_single_flight = None
+_default_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Devuelve el grupo de solicitudes en vuelo compartido por el proceso, creandolo la primera vez.
+    """
+    global _default_single_flight
+    with _default_single_flight_lock:
+        if _default_single_flight is None:
+            _default_single_flight = SingleFlight()
+        return _default_single_flight
+
+
+def set_single_flight(single_flight:SingleFlight):
+    """
+    Reemplaza el grupo de solicitudes en vuelo compartido por el proceso. Afecta a los conectores que se creen despues.
+    """
+    global _default_single_flight
+    if not isinstance(single_flight, SingleFlight):
+        raise ValueError("single_flight debe ser una instancia de SingleFlight.")
+    with _default_single_flight_lock:
+        _default_single_flight = single_flight
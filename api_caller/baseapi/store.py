@@ -0,0 +1,172 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+import re
+import logging
+import threading
+
+from .frames import build_frame
+from .._lazy import LazyModule
+
+# Se importa al usarse por primera vez, para que importar el paquete sea rapido
+pd = LazyModule('pandas')
+
+# Funciones ------------------------------------------------------------------------------------
+
+def merge_observations(old:pd.Series, new:pd.Series, keep_missing:bool=False) -> tuple:
+    """
+    Combina las observaciones nuevas de una serie con las guardadas. Las observaciones nuevas prevalecen sobre las
+    anteriores y las faltantes (NaN) nunca reemplazan a las guardadas. Es la regla comun de SeriesStore y ArrowStore.
+
+    Args:
+        old (pandas.Series): Las observaciones guardadas, o None si la serie no existe.
+        new (pandas.Series): Las observaciones descargadas.
+        keep_missing (bool, optional): Si es True se conservan las fechas nuevas sin valor, como las devuelve la API.
+                                    Por defecto es False.
+
+    Returns:
+        tuple: La serie combinada y un DataFrame con las observaciones revisadas (columnas 'anterior' y 'nuevo').
+    """
+    new = new.astype('float64')
+    observed = new.dropna()
+    if old is None:
+        merged = (new if keep_missing else observed).sort_index()
+        return merged, pd.DataFrame(columns=['anterior', 'nuevo'], dtype='float64')
+
+    old = old.astype('float64')
+
+    # Una revision es una fecha con valor en ambas versiones cuyo valor cambio
+    overlap = old.dropna().index.intersection(observed.index)
+    changed = overlap[(old.loc[overlap] != observed.loc[overlap]).to_numpy()]
+    revisions = pd.DataFrame({'anterior': old.loc[changed], 'nuevo': observed.loc[changed]})
+
+    merged = observed.combine_first(old)
+    if keep_missing:
+        merged = merged.combine_first(new)
+    return merged.sort_index(), revisions
+
+# Clase ----------------------------------------------------------------------------------------
+
+class SeriesStore:
+    """
+    Almacen local de series ya descargadas, organizado por proveedor e ID de serie. Permite actualizar las
+    series de forma incremental: solo se solicita a la API el tramo posterior a la ultima observacion guardada,
+    mas una ventana de revision opcional para detectar cifras revisadas por la fuente.
+
+    Args:
+        directory (str): Directorio donde se guardan las series. Se crea si no existe.
+
+    Example:
+        >>> store = SeriesStore('series_store')
+        >>> df = store.update(Banxico_SIE(token), ['SF43718', 'SF61745'], start_date='2000-01-01', lookback_days=30)
+        >>> store.last_revisions
+    """
+
+    def __init__(self, directory:str):
+        self.directory = directory
+        self.last_revisions = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, provider:str, serie_id:str) -> str:
+        safe_id = re.sub(r'[^\w.-]', '_', serie_id)
+        return os.path.join(self.directory, provider, f"{safe_id}.pkl")
+
+    def load(self, provider:str, serie_id:str) -> pd.Series:
+        """
+        Devuelve la serie guardada o None si no existe.
+        """
+        path = self._path(provider, serie_id)
+        if not os.path.exists(path):
+            return None
+        return pd.read_pickle(path)
+
+    def save(self, provider:str, serie_id:str, serie:pd.Series):
+        path = self._path(provider, serie_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Escritura atomica para no dejar archivos corruptos si el proceso se interrumpe
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        serie.rename(serie_id).to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+    def last_date(self, provider:str, serie_id:str) -> pd.Timestamp:
+        """
+        Devuelve la fecha de la ultima observacion valida guardada, o None si la serie no existe.
+        """
+        serie = self.load(provider, serie_id)
+        if serie is None:
+            return None
+        serie = serie.dropna()
+        return serie.index.max() if not serie.empty else None
+
+    def merge(self, provider:str, serie_id:str, new:pd.Series) -> tuple:
+        """
+        Combina las observaciones nuevas con las guardadas y guarda el resultado, ver merge_observations.
+
+        Returns:
+            tuple: La serie combinada y un DataFrame con las observaciones revisadas (columnas 'anterior' y 'nuevo').
+        """
+        with self._lock:
+            merged, revisions = merge_observations(self.load(provider, serie_id), new)
+            self.save(provider, serie_id, merged)
+
+        return merged.rename(serie_id), revisions
+
+    def update(self, connector, serie_id:str | list, start_date:str='2000-01-01', end_date:str=None, lookback_days:int=0) -> pd.DataFrame:
+        """
+        Actualiza de forma incremental las series indicadas y devuelve su historia completa.
+
+        Para cada serie se consulta solo el tramo entre la ultima observacion guardada (menos 'lookback_days') y
+        'end_date'. Las series que aun no existen en el almacen se descargan desde 'start_date'. Las series que
+        comparten fecha de inicio se solicitan juntas, de modo que los conectores que aceptan varias series por
+        solicitud (Banxico) realizan una sola llamada.
+
+        Args:
+            connector: Un conector con atributo 'provider' y metodo get_series_data con argumentos start_date y end_date
+                    (por ejemplo Banxico_SIE o Fred).
+            serie_id (str | list): El ID de la serie o una lista de IDs.
+            start_date (str, optional): Fecha de inicio para las series que no estan en el almacen. Por defecto es '2000-01-01'.
+            end_date (str, optional): Fecha de fin de la consulta. Por defecto es la fecha actual.
+            lookback_days (int, optional): Dias hacia atras desde la ultima observacion que se vuelven a solicitar
+                                    para detectar revisiones. Por defecto es 0.
+
+        Returns:
+            pandas.DataFrame: Un DataFrame con la historia completa de las series actualizadas.
+        """
+
+        if isinstance(serie_id, str):
+            serie_id = [serie_id]
+        elif not (isinstance(serie_id, list) and all(isinstance(i, str) for i in serie_id)):
+            raise ValueError("El 'serie_id' debe ser una cadena de texto o una lista de cadenas de texto.")
+
+        if not isinstance(lookback_days, int) or lookback_days < 0:
+            raise ValueError("lookback_days debe ser un entero mayor o igual a 0.")
+
+        provider = connector.provider
+        end_date = pd.Timestamp.today().normalize() if end_date is None else pd.to_datetime(end_date)
+
+        # Agrupar las series por la fecha desde la que hay que pedir datos
+        groups = {}
+        for id in serie_id:
+            last = self.last_date(provider, id)
+            tail_start = pd.to_datetime(start_date) if last is None else last - pd.Timedelta(days=lookback_days)
+            groups.setdefault(min(tail_start, end_date), []).append(id)
+
+        self.last_revisions = {}
+        merged_series = {}
+        for tail_start, ids in groups.items():
+            new_df = connector.get_series_data(ids, start_date=tail_start.strftime('%Y-%m-%d'), end_date=end_date.strftime('%Y-%m-%d'))
+
+            for id in ids:
+                new = new_df[id] if id in new_df.columns else pd.Series(dtype='float64')
+                merged, revisions = self.merge(provider, id, new)
+                merged_series[id] = merged
+
+                if not revisions.empty:
+                    logging.info(f"{provider}:{id} tiene {len(revisions)} observaciones revisadas.")
+                    self.last_revisions[id] = revisions
+
+        return build_frame([merged_series[id] for id in serie_id])
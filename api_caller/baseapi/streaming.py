@@ -0,0 +1,104 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+from __future__ import annotations
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+from .parsing import parse_values, parse_dates
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# Funciones ------------------------------------------------------------------------------------
+
+def iter_observation_chunks(fileobj, observations_key:str, date_key:str, value_key:str, series_path:str=None, header_keys:tuple=(), chunk_size:int=10000):
+    """
+    Recorre de forma incremental una respuesta JSON y entrega las observaciones en bloques, sin construir el arbol
+    completo de objetos de Python. Requiere la libreria opcional 'ijson'.
+
+    Args:
+        fileobj: Objeto tipo archivo con el cuerpo de la respuesta (por ejemplo response.raw).
+        observations_key (str): Llave del arreglo de observaciones dentro de cada serie ('datos', 'OBSERVATIONS'),
+                            o ruta del arreglo si la respuesta contiene una sola serie ('observations').
+        date_key (str): Llave de la fecha en cada observacion.
+        value_key (str): Llave del valor en cada observacion.
+        series_path (str, optional): Ruta del arreglo de series ('bmx.series', 'Series'). None si la respuesta contiene una sola serie.
+        header_keys (tuple, optional): Llaves escalares de cada serie que se entregan junto con sus observaciones ('idSerie', 'FREQ').
+        chunk_size (int, optional): Numero maximo de observaciones por bloque. Por defecto es 10000.
+
+    Yields:
+        tuple: Un diccionario con los encabezados de la serie, una lista de fechas y una lista de valores.
+    """
+
+    if ijson is None:
+        raise ImportError("El modo streaming requiere la libreria 'ijson'. Instalala con: pip install ijson")
+
+    item_prefix = f"{series_path}.item" if series_path else None
+    obs_array = f"{item_prefix}.{observations_key}" if item_prefix else observations_key
+    date_prefix = f"{obs_array}.item.{date_key}"
+    value_prefix = f"{obs_array}.item.{value_key}"
+    header_prefixes = {f"{item_prefix}.{key}": key for key in header_keys} if item_prefix else {}
+
+    header, dates, values = {}, [], []
+    for prefix, event, value in ijson.parse(fileobj, use_float=True):
+        if prefix == date_prefix:
+            dates.append(value)
+        elif prefix == value_prefix:
+            values.append(value)
+            if len(values) >= chunk_size and len(header) == len(header_prefixes):
+                yield header, dates, values
+                dates, values = [], []
+        elif prefix in header_prefixes and event not in ('start_map', 'start_array'):
+            header[header_prefixes[prefix]] = value
+        elif (prefix == item_prefix and event == 'end_map') or (item_prefix is None and prefix == obs_array and event == 'end_array'):
+            # Fin de una serie: se entregan las observaciones pendientes
+            yield header, dates, values
+            header, dates, values = {}, [], []
+
+
+def stream_series(fileobj, observations_key:str, date_key:str, value_key:str, date_format:str=None, series_path:str=None, header_keys:tuple=(), na_values:tuple=(), thousands:str=None, chunk_size:int=10000):
+    """
+    Convierte una respuesta JSON en series columnares de forma incremental. Cada bloque de observaciones se convierte
+    a arreglos de NumPy en cuanto se lee, por lo que las cadenas originales se liberan antes de leer el siguiente bloque.
+
+    Args:
+        fileobj: Objeto tipo archivo con el cuerpo de la respuesta.
+        date_format (str, optional): Formato de las fechas. Si es None, las fechas se entregan como arreglo de texto
+                                para que el conector las transforme (por ejemplo los periodos del BIE).
+        Los demas argumentos son los de iter_observation_chunks y parse_values.
+
+    Yields:
+        tuple: Los encabezados de la serie, un arreglo (o DatetimeIndex) con las fechas y un arreglo float64 con los valores.
+
+    Example:
+        >>> for header, index, values in stream_series(response.raw, 'datos', 'fecha', 'dato', '%d/%m/%Y', series_path='bmx.series', header_keys=('idSerie',)):
+        ...     print(header['idSerie'], len(values))
+    """
+
+    current, date_chunks, value_chunks = None, [], []
+
+    def assemble():
+        if date_format is not None:
+            index = pd.DatetimeIndex(np.concatenate([chunk.to_numpy() for chunk in date_chunks])) if date_chunks else pd.DatetimeIndex([])
+        else:
+            index = np.concatenate(date_chunks) if date_chunks else np.array([], dtype=object)
+        values = np.concatenate(value_chunks) if value_chunks else np.array([], dtype='float64')
+        return index, values
+
+    for header, dates, values in iter_observation_chunks(fileobj, observations_key, date_key, value_key, series_path, header_keys, chunk_size):
+        if current is not None and header is not current:
+            yield (current, *assemble())
+            date_chunks, value_chunks = [], []
+        current = header
+
+        if dates:
+            date_chunks.append(parse_dates(dates, date_format) if date_format is not None else np.array(dates, dtype=object))
+            value_chunks.append(parse_values(values, na_values, thousands))
+
+    if current is not None:
+        yield (current, *assemble())
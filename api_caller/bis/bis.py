@@ -1,229 +1,343 @@
 
 # Librerias necesarias -------------------------------------------------------------------------
 
-import pandas as pd
-from ..baseapi.baseapi import BaseAPI
+from __future__ import annotations
+
+import io
+import requests
 
-# Clase ---------------------------------------------------------------------------------------
+from ..baseapi.baseapi import BaseAPI
+from ..baseapi.frames import build_frame
+from ..baseapi.columnar import ColumnarSeries, SeriesHeader
+
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# Constantes -----------------------------------------------------------------------------------
+
+# SDMX-CSV es mucho mas compacto que SDMX-JSON y se puede leer con el lector de CSV de pandas, sin recorrer objetos anidados
+CSV_ACCEPT = 'application/vnd.sdmx.data+csv;version=2.0.0'
+
+# Columnas de SDMX-CSV que describen la estructura y no son dimensiones de la serie (versiones 1.0 y 2.0 del formato)
+STRUCTURE_COLUMNS = ('DATAFLOW', 'STRUCTURE', 'STRUCTURE_ID', 'STRUCTURE_NAME', 'ACTION')
+
+# Atributos de la serie que se guardan en su encabezado
+TITLE_COLUMNS = ('TITLE_TS', 'TITLE')
+UNIT_COLUMNS = ('UNIT_MEASURE', 'UNIT')
+
+# Funciones ------------------------------------------------------------------------------------
+
+def parse_periods(periods) -> pd.DatetimeIndex:
+    """
+    Convierte los periodos SDMX a la fecha de inicio de cada periodo, de forma vectorizada. Se aceptan fechas
+    ('2020', '2020-03', '2020-03-31') y periodos de reporte: anuales ('2020-A1'), semestrales ('2020-S2'),
+    cuatrimestrales ('2020-T3'), trimestrales ('2020-Q1'), mensuales ('2020-M03'), semanales ('2020-W05') y diarios
+    ('2020-D061', dia del año). Una misma lista puede mezclar frecuencias.
+
+    Args:
+        periods: Los periodos en texto.
+
+    Returns:
+        pandas.DatetimeIndex: La fecha de inicio de cada periodo.
+
+    Raises:
+        ValueError: Si algun periodo no tiene un formato SDMX valido.
+
+    Example:
+        >>> parse_periods(['2020-M03', '2020-Q2', '2020-D061'])
+        DatetimeIndex(['2020-03-01', '2020-04-01', '2020-03-01'], dtype='datetime64[ns]', freq=None)
+    """
+    periods = pd.Index(periods, dtype=object).astype(str).str.strip()
+    if len(periods) == 0:
+        return pd.DatetimeIndex([])
+
+    years = pd.to_numeric(periods.str[:4], errors='coerce')
+    kind = np.asarray(periods.str[5:6])
+    number = pd.to_numeric(periods.str[6:], errors='coerce')
+    months = pd.to_numeric(periods.str[5:7], errors='coerce').fillna(1)
+    days = pd.to_numeric(periods.str[8:10], errors='coerce').fillna(1)
+
+    # Los periodos de reporte inician en el primer mes de su periodo; las fechas se toman tal cual
+    reporting = np.isin(kind, ('A', 'S', 'T', 'Q', 'M', 'W', 'D'))
+    invalid = np.asarray(years.isna()) | (reporting & np.asarray(number.isna()))
+    number = number.fillna(1).astype('int64').to_numpy()
+    months = np.select(
+        [kind == 'A', kind == 'S', kind == 'T', kind == 'Q', kind == 'M'],
+        [1, (number - 1) * 6 + 1, (number - 1) * 4 + 1, (number - 1) * 3 + 1, number],
+        months.astype('int64').to_numpy(),
+    )
+    days = np.where(reporting, 1, days.astype('int64').to_numpy())
+
+    limits = {'A': 1, 'S': 2, 'T': 3, 'Q': 4, 'M': 12, 'D': 366}
+    for code, limit in limits.items():
+        invalid |= (kind == code) & ((number < 1) | (number > limit))
+
+    years = years.fillna(1970).astype('int64').to_numpy()
+    dates = pd.to_datetime({'year': years, 'month': months, 'day': days}, errors='coerce').to_numpy()
+
+    # Los dias de reporte se cuentan desde el 1 de enero
+    daily = (kind == 'D') & ~invalid
+    if daily.any():
+        dates[daily] = dates[daily] + (number[daily] - 1).astype('timedelta64[D]')
+        invalid |= daily & (dates.astype('datetime64[Y]').astype('int64') + 1970 != years)
+
+    # Las semanas ISO inician en lunes
+    weekly = (kind == 'W') & ~invalid
+    if weekly.any():
+        dates[weekly] = pd.to_datetime(periods[weekly].str[:4] + '-W' + periods[weekly].str[6:8] + '-1', format='%G-W%V-%u', errors='coerce').to_numpy()
+
+    invalid |= np.isnat(dates)
+    if invalid.any():
+        raise ValueError(f"Periodos SDMX no validos: {', '.join(periods[invalid][:5])}.")
+
+    return pd.DatetimeIndex(dates)
+
+
+def merge_keys(keys:list) -> list:
+    """
+    Une claves SDMX que difieren en una sola dimension, para pedirlas en una sola consulta. Se usa la sintaxis de la
+    API REST SDMX 2.0: ',' separa las opciones de una dimension y '*' es el comodin. Las claves con la sintaxis 1.0
+    ('+' y dimensiones vacias) se convierten.
+
+    Las dimensiones se unen de izquierda a derecha y la union es exacta: el resultado no incluye series que no se
+    pidieron, aunque no siempre es el menor numero de claves posible.
+
+    Example:
+        >>> merge_keys(['M.N.B.MX', 'M.N.B.US', 'D.N.B.MX'])
+        ['M,D.N.B.MX', 'M.N.B.US']
+        >>> merge_keys(['M.N.B.MX', 'M.N.B.US'])
+        ['M.N.B.MX,US']
+        >>> merge_keys(['M.N.B.', 'M.N.B.MX'])
+        ['M.N.B.*']
+    """
+    keys = [[value.replace('+', ',') or '*' for value in key.split('.')] for key in dict.fromkeys(keys)]
+    dimensions = {len(key) for key in keys}
+    if len(dimensions) != 1:
+        return list(dict.fromkeys('.'.join(key) for key in keys))
+
+    for position in range(dimensions.pop()):
+        groups = {}
+        for key in keys:
+            rest = tuple(key[:position] + key[position + 1:])
+            groups.setdefault(rest, []).extend(key[position].split(','))
+
+        # El comodin ya incluye cualquier otro valor de la dimension
+        keys = []
+        for rest, values in groups.items():
+            value = '*' if '*' in values else ','.join(dict.fromkeys(values))
+            keys.append(list(rest[:position]) + [value] + list(rest[position:]))
+
+    return ['.'.join(key) for key in keys]
+
+# Clase ----------------------------------------------------------------------------------------
 
 class BIS_SDMX(BaseAPI):
-    def __init__(self, api_key):
-        super().__init__(api_key, "https://stats.bis.org/api/v2")
+    """
+    Conector a la API SDMX del Banco de Pagos Internacionales (stats.bis.org/api/v2). Las series se identifican como
+    'DATAFLOW/CLAVE', por ejemplo 'WS_EER/M.N.B.MX'. La clave sigue la sintaxis SDMX 2.0: '*' es el comodin y ','
+    separa varias opciones de una dimension, por ejemplo 'WS_EER/M.N.B.*' o 'WS_EER/M.N.B.MX,US'. Las claves con la
+    sintaxis 1.0 ('WS_EER/M.N.B.' o 'WS_EER/M.N.B.MX+US') se convierten antes de consultar.
 
-    def _set_series_params(self, serie_id:str | list,  last_data:bool=False, start_date:str=None, end_date:str=pd.Timestamp.today().strftime('%Y-%m-%d'), percentage_change:str=None, no_decimals:bool=False, get_series_metadata:bool=False) -> tuple:
-        
-        # Encabezados para la solicitud con el token de la API
-        headers = {
-            'Bmx-Token': self._BaseAPI__api_key
-        }
+    Args:
+        api_key (str, optional): La API del BIS no requiere clave.
+        agency (str, optional): La agencia de los dataflows. Por defecto es 'BIS'.
+        version (str, optional): La version de los dataflows. Por defecto es '1.0'.
+        **kwargs: Argumentos adicionales de BaseAPI (por ejemplo 'cache').
+    """
+    provider = 'bis'
 
+    def __init__(self, api_key:str=None, agency:str='BIS', version:str='1.0', **kwargs):
+        super().__init__(api_key, "https://stats.bis.org/api/v2", **kwargs)
+        self.agency = agency
+        self.version = version
 
-        # Validar los tipos de datos de las series y los parámetros
-        if isinstance(serie_id, str):
-            serie_id = [serie_id]
-        elif isinstance(serie_id, list) and all(isinstance(i, str) for i in serie_id):
-            pass
-        else:
-            raise ValueError("El 'serie_id' debe ser una cadena de texto o una lista de cadenas de texto.")
-        
+
+    def _set_series_params(self, last_data:bool=False, start_date:str=None, end_date:str=None, last_observations:int=None, updated_after:str=None) -> dict:
 
         if not isinstance(last_data, bool):
             raise ValueError(f"last_data debe ser un valor booleano.")
-        
-        
-        if percentage_change is not None:
-            if not isinstance(percentage_change, str):
-                raise ValueError(f"percentage_change debe ser una cadena de texto.")
-            elif percentage_change not in ['PorcObsAnt', 'PorcAnual', 'PorcAcumAnual']:
-                raise ValueError(f"percentage_change debe ser uno de los siguientes valores: 'PorcObsAnt', 'PorcAnual', 'PorcAcumAnual'")
-        
-
-        if not isinstance(no_decimals, bool):
-            raise ValueError(f"no_decimals debe ser un valor booleano.")
-        
-
-        if not isinstance(get_series_metadata, bool):
-            raise ValueError(f"get_series_metadata debe ser un valor booleano.")
-        
-        
-        # Definir la URL de la API con el ID de la serie para obtener los datos de las series
-        endpoint = f"/series/{','.join(serie_id)}"
-        
-        # Devuelve la URL de la API y los encabezados si se solicitan los metadatos
-        if get_series_metadata:
-            return endpoint, headers
-        
-
-        # Definir la URL de la API con el ID de la serie para obtener los datos de las series
+
+        params = {}
+
         if last_data:
             # Validar que si last_data es True, no se proporcionen fechas de inicio y fin
-            if (start_date is not None or end_date != pd.Timestamp.today().strftime('%Y-%m-%d')):
+            if start_date is not None or end_date is not None or last_observations is not None:
                 raise ValueError("Si last_data es True, no se pueden proporcionar fechas de inicio y fin.")
-            
-            # Definir la URL de la API con el ID de la serie para obtener los datos de la última observación
-            endpoint += f"/datos/oportuno"
-        
-        elif start_date is not None:
-            
-            # Asegurar que las fechas esten en el formato correcto
-            try:
-                end_date = pd.to_datetime(end_date).strftime('%Y-%m-%d')
-            except ValueError:
-                raise ValueError("The provided dates must be in format 'YYYY-MM-DD'.")
-            
-            try:
-                start_date = pd.to_datetime(start_date).strftime('%Y-%m-%d')
-            except ValueError:
-                raise ValueError("The provided dates must be in format 'YYYY-MM-DD'.")
-        
-            # Mandar mensaje de error si la fecha de inicio es mayor a la fecha de fin
-            if start_date > end_date:
-                raise ValueError("La fecha de inicio no puede ser mayor a la fecha de fin.")
-        
-            # Definir la URL de la API en un rango de fechas
-            endpoint += f"/datos/{start_date}/{end_date}"
-
-        
-        # Definir los parámetros adicionales si se proporcionan
-        additional_params = []
-        if no_decimals:
-            additional_params.append(f'decimales=sinCeros')
-        
-        if percentage_change:
-            additional_params.append(f'incremento={percentage_change}')
-            
-        # Unir los parámetros adicionales en una cadena de query params
-        additional_params_str = '&'.join(additional_params)
-
-        # Agregar los parámetros adicionales a la URL si existen
-        if additional_params_str:
-            endpoint = f"{endpoint}?{additional_params_str}"
-
-        return endpoint, headers
-    
-
-    
-    def get_series_metadata(self, serie_id:str | list) -> dict:
-        """
-        Obtiene los metadatos de una serie económica desde la API del BIS.
+            last_observations = 1
 
-        Args:
-            serie_id (str | list): El ID de la serie o una lista de IDs de series a consultar desde la API de Banxico. 
-                                Si se proporciona un solo ID, puede ser una cadena de texto (str).
+        if last_observations is not None:
+            if not isinstance(last_observations, int) or last_observations < 1:
+                raise ValueError("last_observations debe ser un entero mayor o igual a 1.")
+            params['lastNObservations'] = last_observations
 
-        Returns:
-            dict: Un diccionario con informacion de la serie
+        # Asegurar que las fechas esten en el formato correcto
+        try:
+            if start_date is not None:
+                params['startPeriod'] = pd.to_datetime(start_date).strftime('%Y-%m-%d')
+            if end_date is not None:
+                params['endPeriod'] = pd.to_datetime(end_date).strftime('%Y-%m-%d')
+            if updated_after is not None:
+                # Solo se devuelven las observaciones modificadas despues de esta fecha, para cargas incrementales
+                params['updatedAfter'] = pd.Timestamp(updated_after).isoformat()
+        except ValueError:
+            raise ValueError("The provided dates must be in format 'YYYY-MM-DD'.")
 
-        Raises:
-            Exception: Si la solicitud a la API de Banxico falla, devuelve un mensaje con el código de error y la respuesta.
+        # Mandar mensaje de error si la fecha de inicio es mayor a la fecha de fin
+        if 'startPeriod' in params and 'endPeriod' in params and params['startPeriod'] > params['endPeriod']:
+            raise ValueError("La fecha de inicio no puede ser mayor a la fecha de fin.")
 
-        Example:
-            >>> metadata = get_series_metadata(serie_id='SF43718')
-        """
-        
-        # Definir la URL de la API con el ID de la serie para obtener los metadatos de las series y realizar la solicitud
-        endpoint, headers = self._set_series_params(serie_id, get_series_metadata=True)
-        metadata_json = self._make_request(endpoint, headers=headers)
-        
-        # Inicializar un diccionario para almacenar los metadatos
-        series_dict = {}
+        return params
 
-        for serie_metadata in metadata_json['bmx']['series']:
-            serie_id = serie_metadata['idSerie']
-            series_dict[serie_id] = {'titulo': serie_metadata['titulo'], 'periodicidad': serie_metadata['periodicidad'], 'cifra': serie_metadata['cifra'], 'unidad': serie_metadata['unidad']}
-        
-        return series_dict
-    
 
-    # Función para obtener los datos de una serie desde la API de Banxico
-    def get_series_data(self, serie_id:str | list, last_data:bool=False, start_date:str=None, end_date:str=pd.Timestamp.today().strftime('%Y-%m-%d'), percentage_change:str=None, no_decimals:bool=False) -> pd.DataFrame:
-        """
-        Obtiene datos de series económicas desde la API de Banxico (SIE) y los devuelve en un DataFrame de pandas.
+    def _plan_queries(self, serie_id:str | list) -> list:
 
-        Args:
-            serie_id (str | list): El ID de la serie o una lista de IDs de series a consultar desde la API de Banxico. 
-                                Si se proporciona un solo ID, puede ser una cadena de texto (str).
-            last_data (bool, optional): Si se establece en True, obtendrá solo las últimas observaciones disponibles de la serie.
-                                    Por defecto es False.
-            start_date (datetime, optional): La fecha de inicio de consulta tipo datetime para obtener datos en formato 'YYYY-MM-DD'. 
-                                            Por defecto es '2000-01-01'.
-            end_date (datetime, optional): La fecha de fin de consulta tipo datetime  para obtener datos en formato 'YYYY-MM-DD'.
-                                            Por defecto es la fecha actual.
-            percentage_change (str, optional): Parámetro opcional que define si se desea obtener los incrmentos porcentuales de datos de la serie con respecto a observaciones anteriores
-                                    ('PorcObsAnt', 'PorcAnual', 'PorcAcumAnual'). Por defecto es None.
-            no_decimals (bool, optional): Si se establece en True, los datos se devolverán sin decimales. 
-                                            Por defecto es False.
+        # Validar los tipos de datos de las series
+        if isinstance(serie_id, str):
+            serie_id = [serie_id]
+        elif not (isinstance(serie_id, list) and all(isinstance(i, str) for i in serie_id)):
+            raise ValueError("El 'serie_id' debe ser una cadena de texto o una lista de cadenas de texto.")
 
-        Returns:
-            pandas.DataFrame: Un DataFrame con las series obtenidas. Las columnas representan las series, y las filas 
-                            corresponden a las fechas de observación.
-            dict: Un diccionario con informacion de la serie
-                            
-        Raises:
-            Exception: Si la solicitud a la API de Banxico falla, devuelve un mensaje con el código de error y la respuesta.
+        # Agrupar las claves por dataflow y unir las que difieren en una sola dimension
+        keys = {}
+        for id in serie_id:
+            dataflow, separator, key = id.partition('/')
+            if not separator or not dataflow:
+                raise ValueError(f"El ID '{id}' debe tener el formato 'DATAFLOW/CLAVE', por ejemplo 'WS_EER/M.N.B.MX'.")
+            keys.setdefault(dataflow, []).append(key or '*')
 
-        Example:
-            Obtener la última observación de una serie:
-            >>> df, dict = get_SIE_data(serie_id='SF43718', last_data=True)
+        return [(dataflow, key) for dataflow, dataflow_keys in keys.items() for key in merge_keys(dataflow_keys)]
 
-            Obtener un rango de fechas para una serie histórica de su variación anual:
-            >>> df, dict = get_SIE_data(serie_id='SF43718', start_date='2020-01-01', end_date='2023-01-01', percentage_change='PorcAnual')
-        """
 
-        # Ajuste para datos trimestrales
-        if not last_data:
-            start_date = pd.to_datetime(start_date) + pd.DateOffset(months=-2)
-        
-        # Definir la URL de la API con el ID de la serie para obtener los datos de las series y realizar la solicitud
-        endpoint_datos, headers = self._set_series_params(serie_id, last_data, start_date, end_date, percentage_change, no_decimals)
-        data_json = self._make_request(endpoint_datos, headers=headers)
+    def _fetch_series(self, dataflow:str, key:str, params:dict) -> list:
+
+        endpoint = f"/data/dataflow/{self.agency}/{dataflow}/{self.version}/{key}"
+        try:
+            body = self._make_request(endpoint, headers={'Accept': CSV_ACCEPT}, params=params, raw=True)
+        except requests.exceptions.HTTPError as http_err:
+            # SDMX responde 404 cuando la consulta no tiene resultados
+            if http_err.response is not None and http_err.response.status_code == 404:
+                return []
+            raise
+
+        # Cada respuesta se convierte en el hilo que la descargo
+        return self._parse_series_data(body, dataflow)
+
 
-        # Definir la URL de la API con el ID de la serie para obtener los metadatos de las series y realizar la solicitud
-        metadata = self.get_series_metadata(serie_id)
-        
-        # Inicializar un DataFrame vacío para almacenar los datos de las series
-        series_df = pd.DataFrame()
+    def _parse_series_data(self, body:bytes, dataflow:str) -> list:
 
-        for serie_data in data_json['bmx']['series']:
+        if not body or not body.strip():
+            return []
 
-            serie_id = serie_data['idSerie']
+        # Se leen solo las columnas necesarias: dimensiones, periodo, valor, titulo y unidad
+        columns = pd.read_csv(io.BytesIO(body), nrows=0).columns.tolist()
+        if 'TIME_PERIOD' not in columns or 'OBS_VALUE' not in columns:
+            raise ValueError(f"La respuesta del BIS para '{dataflow}' no esta en formato SDMX-CSV.")
 
-            # Extraer datos de la serie
-            serie_data = serie_data['datos']
+        dimensions = [column for column in columns[:columns.index('TIME_PERIOD')] if column not in STRUCTURE_COLUMNS]
+        title = next((column for column in TITLE_COLUMNS if column in columns), None)
+        unit = next((column for column in UNIT_COLUMNS if column in columns and column not in dimensions), None)
+        usecols = dimensions + ['TIME_PERIOD', 'OBS_VALUE'] + [column for column in (title, unit) if column is not None]
 
-            # Extraer los valores y las fechas
-            obs_values = [float(entry['dato'].replace(",", "")) if entry['dato'] != 'N/E' else pd.NA for entry in serie_data]
-            time_periods = [entry['fecha'] for entry in serie_data]
+        df = pd.read_csv(io.BytesIO(body), usecols=usecols, dtype={**{column: 'category' for column in usecols}, 'TIME_PERIOD': object, 'OBS_VALUE': 'float64'}, keep_default_na=False, na_values={'OBS_VALUE': ['', 'NaN', 'NA']})
+        if df.empty:
+            return []
 
-            # Formatear los periodos de tiempo
-            time_periods_formatted = [pd.to_datetime(period, dayfirst=True) for period in time_periods]
+        # Los periodos se repiten entre series, por lo que solo se convierten los valores unicos
+        codes, uniques = pd.factorize(df['TIME_PERIOD'])
+        dates = parse_periods(uniques).to_numpy().astype('datetime64[ns]').view('int64')[codes]
+        values = df['OBS_VALUE'].to_numpy(dtype='float64', na_value=np.nan)
 
-            # Crear una serie de pandas con los datos obtenidos
-            serie = pd.Series(obs_values, index=time_periods_formatted, name=serie_id)
-            
-            # Verificar que el indice es del  tipo datetime
-            if not pd.api.types.is_datetime64_any_dtype(serie.index):
-                serie.index = pd.to_datetime(serie.index)
+        series_list = []
+        for series_key, indexer in df.groupby(dimensions, observed=True, sort=False).indices.items():
+            series_key = series_key if isinstance(series_key, tuple) else (series_key,)
+            indexer = indexer[np.argsort(dates[indexer], kind='stable')]
+            first = indexer[0]
 
-            # Para series trimestrales se ajusta la fecha dos periodos hacia adelante. Esto es para que la fecha sea el último mes del trimestre
-            if metadata[serie_id]['periodicidad'] == 'Trimestral':
-                serie.index = serie.index + pd.DateOffset(months=2)
+            header = SeriesHeader(
+                f"{dataflow}/{'.'.join(map(str, series_key))}",
+                provider=self.provider,
+                freq=str(df['FREQ'].iat[first]) if 'FREQ' in dimensions else None,
+                title=str(df[title].iat[first]) if title is not None else None,
+                unit=str(df[unit].iat[first]) if unit is not None else None,
+            )
+            series_list.append(ColumnarSeries(header, dates[indexer], values[indexer]))
 
-            # Agregar la serie al DataFrame
-            series_df = pd.concat([series_df, serie], axis=1, join='outer')
+        return series_list
 
-        # Ordenar el DataFrame por fecha
-        series_df = series_df.sort_index()
 
-        # Ajustamos la fecha a su dato original
-        if not last_data:
-            start_date = pd.to_datetime(start_date) + pd.DateOffset(months=2)
-            end_date = pd.to_datetime(end_date)
-            series_df = series_df.loc[start_date:end_date]
+    def _get_series(self, serie_id:str | list, params:dict, max_workers:int) -> list:
+
+        queries = self._plan_queries(serie_id)
+        results = self._run_concurrently(lambda query: self._fetch_series(query[0], query[1], params), queries, max_workers)
+        fetched = {serie.name: serie for series_list in results for serie in series_list}
+
+        # Primero las series pedidas por su clave exacta, en el orden solicitado, y despues las que resultan de comodines
+        requested = [serie_id] if isinstance(serie_id, str) else serie_id
+        ordered = {id: fetched.pop(id) for id in requested if id in fetched}
+        ordered.update(fetched)
+        return list(ordered.values())
+
+
+    def get_series_metadata(self, serie_id:str | list, max_workers:int=4) -> dict:
+        """
+        Obtiene los metadatos de una o varias series del BIS a partir de su ultima observacion.
+
+        Args:
+            serie_id (str | list): El ID de la serie ('DATAFLOW/CLAVE') o una lista de IDs. Se admiten comodines.
+            max_workers (int, optional): Numero de hilos para las consultas de distintos dataflows. Por defecto es 4.
+
+        Returns:
+            dict: Un diccionario {ID: {'frecuencia', 'titulo', 'unidad', 'ultima_fecha'}}.
+
+        Example:
+            >>> metadata = bis_api.get_series_metadata('WS_EER/M.N.B.MX')
+        """
+
+        params = self._set_series_params(last_observations=1)
+        series_dict = {}
+        for serie in self._get_series(serie_id, params, max_workers):
+            header = serie.header
+            series_dict[header.serie_id] = {'frecuencia': header.freq, 'titulo': header.title, 'unidad': header.unit, 'ultima_fecha': serie.index.max() if len(serie) else None}
+
+        return series_dict
+
+
+    def get_series_data(self, serie_id:str | list, last_data:bool=False, start_date:str=None, end_date:str=None, last_observations:int=None, updated_after:str=None, max_workers:int=4, columnar:bool=False) -> pd.DataFrame | list:
+        """
+        Obtiene series de la API SDMX del BIS y las devuelve en un DataFrame de pandas. Las claves de un mismo dataflow
+        que difieren en una sola dimension se piden en una sola consulta, y las consultas se realizan en paralelo.
+
+        Args:
+            serie_id (str | list): El ID de la serie ('DATAFLOW/CLAVE') o una lista de IDs, por ejemplo 'WS_EER/M.N.B.MX'.
+                                Una clave con comodines ('WS_EER/M.N.B.*') devuelve todas las series que coinciden.
+            last_data (bool, optional): Si se establece en True, obtiene solo la ultima observacion de cada serie.
+            start_date (str, optional): Fecha de inicio en formato 'YYYY-MM-DD' (startPeriod). Por defecto es el inicio de la serie.
+            end_date (str, optional): Fecha de fin en formato 'YYYY-MM-DD' (endPeriod). Por defecto es la ultima observacion.
+            last_observations (int, optional): Numero de observaciones mas recientes de cada serie (lastNObservations).
+            updated_after (str, optional): Devuelve solo las observaciones modificadas despues de esta fecha y hora (updatedAfter),
+                                para actualizar de forma incremental una copia local.
+            max_workers (int, optional): Numero de hilos para realizar las consultas en paralelo. Por defecto es 4.
+            columnar (bool, optional): Si se establece en True, devuelve una lista de ColumnarSeries en lugar de un DataFrame.
+
+        Returns:
+            pandas.DataFrame | list: Las series obtenidas. Las columnas representan las series y las filas las fechas de
+                            observacion, fechadas al inicio de cada periodo.
+
+        Example:
+            >>> df = bis_api.get_series_data(['WS_EER/M.N.B.MX', 'WS_EER/M.N.B.US'], start_date='2020-01-01')
+
+            Todas las series de tipos de cambio efectivos nominales amplios, modificadas en la ultima semana:
+            >>> df = bis_api.get_series_data('WS_EER/M.N.B.*', updated_after='2024-06-01T00:00:00')
+        """
 
-        # Verificar que el indice es del  tipo datetime
-        if not pd.api.types.is_datetime64_any_dtype(series_df.index):
-            series_df.index = pd.to_datetime(series_df.index)
+        params = self._set_series_params(last_data, start_date, end_date, last_observations, updated_after)
+        series_list = self._get_series(serie_id, params, max_workers)
 
-        return series_df
+        if columnar:
+            return series_list
 
+        # Alinear todas las series sobre la union de sus fechas en un solo paso (el resultado queda ordenado por fecha)
+        return build_frame(series_list)
@@ -1 +1,6 @@
-from .fed import Fred  # Importa directamente
\ No newline at end of file
+from .._lazy import lazy_exports
+
+_EXPORTS = {'Fred': '.fed', 'AsyncFred': '.fed'}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,21 +1,36 @@
 
 # Librerias necesarias -------------------------------------------------------------------------
 
-import pandas as pd
-from datetime import datetime
-from dateutil.relativedelta import relativedelta
-import requests
+from __future__ import annotations
+
+import asyncio
 
 from ..baseapi.baseapi import BaseAPI
+from ..baseapi.frames import build_frame
+from ..baseapi.columnar import ColumnarSeries
+from ..baseapi.parsing import parse_observations
+from ..baseapi.streaming import stream_series
+from ..baseapi.asyncapi import AsyncBaseAPI
+
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+pd = LazyModule('pandas')
 
 # Clase ---------------------------------------------------------------------------------------
 
 class Fred(BaseAPI):
-    def __init__(self, api_key):
-        super().__init__(api_key, "https://api.stlouisfed.org/fred")
+    provider = 'fred'
+
+    def __init__(self, api_key, **kwargs):
+        super().__init__(api_key, "https://api.stlouisfed.org/fred", **kwargs)
+
 
+    def _set_series_params(self,serie_id:str, last_data:bool=False, start_date:str=None, end_date:str=None, get_metadata:bool=False) -> str:
 
-    def _set_series_params(self,serie_id:str, last_data:bool=False, start_date:str=None, end_date:str=pd.Timestamp.today().strftime('%Y-%m-%d'), get_metadata:bool=False) -> str:
+        # La fecha de fin por defecto es el dia de hoy. Se calcula en cada llamada y no al importar el modulo
+        if end_date is None:
+            end_date = pd.Timestamp.today().strftime('%Y-%m-%d')
         
         # Validar los tipos de datos de los parámetros
         if not isinstance(last_data, bool):
@@ -116,7 +131,7 @@ class Fred(BaseAPI):
     
 
     # Función para obtener los datos de una serie desde la API
-    def get_series_data(self, serie_id:str | list, last_data:bool=False, start_date:str=None, end_date:str=pd.Timestamp.today().strftime('%Y-%m-%d')) -> pd.DataFrame:
+    def get_series_data(self, serie_id:str | list, last_data:bool=False, start_date:str=None, end_date:str=None, max_workers:int=None, stream:bool=False, columnar:bool=False) -> pd.DataFrame | list:
         """
         Obtiene datos de series económicas desde la API de Banxico (SIE) y los devuelve en un DataFrame de pandas.
 
@@ -133,10 +148,17 @@ class Fred(BaseAPI):
                                     ('PorcObsAnt', 'PorcAnual', 'PorcAcumAnual'). Por defecto es None.
             sin_decimales (bool, optional): Si se establece en True, los datos se devolverán sin decimales. 
                                             Por defecto es False.
+            max_workers (int, optional): Numero de hilos para descargar las series en paralelo sobre la sesion compartida. 
+                                            Por defecto es None (descarga secuencial).
+            stream (bool, optional): Si se establece en True, cada respuesta se lee de forma incremental y las observaciones se
+                                            convierten por bloques, reduciendo el pico de memoria en historias largas. Las respuestas
+                                            no pasan por la cache. Requiere la libreria 'ijson'. Por defecto es False.
+            columnar (bool, optional): Si se establece en True, devuelve una lista de ColumnarSeries en lugar de un DataFrame.
+                                            Ocupa menos memoria al mantener muchas series. Por defecto es False.
 
         Returns:
-            pandas.DataFrame: Un DataFrame con las series obtenidas. Las columnas representan las series, y las filas 
-                            corresponden a las fechas de observación.
+            pandas.DataFrame: Un DataFrame con las series obtenidas. Las columnas representan las series (float64), y las
+                            filas corresponden a las fechas de observación (DatetimeIndex).
             dict: Un diccionario con informacion de la serie
                             
         Raises:
@@ -148,8 +170,28 @@ class Fred(BaseAPI):
 
             Obtener un rango de fechas para una serie histórica de su variación anual:
             >>> df, dict = get_SIE_data(serie_id='SF43718', fecha_inicio='2020-01-01', end_date='2023-01-01', variacion='PorcAnual')
+
+            Descargar varias series en paralelo con 16 hilos:
+            >>> df = fred_api.get_series_data(['DFF', 'GDP', 'UNRATE'], start_date='2020-01-01', max_workers=16)
         """
 
+        # Validar los tipos de datos de las series y los parámetros
+        serie_id = self._validate_serie_id(serie_id)
+
+        # FRED solo acepta una serie por solicitud, por lo que se realiza una solicitud por cada ID
+        calls = [{'endpoint': self._set_series_params(id, last_data, start_date, end_date)} for id in serie_id]
+
+        if stream:
+            series_list = self._run_concurrently(lambda item: self._stream_series_data(item[0]['endpoint'], item[1]), list(zip(calls, serie_id)), max_workers)
+        else:
+            responses = self._make_requests(calls, max_workers=max_workers)
+            series_list = [self._parse_series_data(data_json, id) for data_json, id in zip(responses, serie_id)]
+
+        return series_list if columnar else self._build_series_frame(series_list)
+
+
+    def _validate_serie_id(self, serie_id:str | list) -> list:
+
         # Validar los tipos de datos de las series y los parámetros
         if isinstance(serie_id, str):
             serie_id = [serie_id]
@@ -157,34 +199,36 @@ class Fred(BaseAPI):
             pass
         else:
             raise ValueError("El 'serie_id' debe ser una cadena de texto o una lista de cadenas de texto.")
+        
+        return serie_id
 
-        # Inicializar un DataFrame vacío para almacenar los datos de las series
-        series_df = pd.DataFrame()
 
-        for id in serie_id:
+    def _parse_series_data(self, data_json:dict, serie_id:str) -> ColumnarSeries:
 
-            # Definir la URL de la API con el ID de la serie para obtener los datos de las series y realizar la solicitud
-            endpoint = self._set_series_params(id, last_data, start_date, end_date)
-            data_json = self._make_request(endpoint)
+        # Extraer los datos de la serie
+        serie_data = data_json['observations']
 
-            # Extraer los datos de la serie
-            serie_data = data_json['observations']
+        # Extraer y convertir los valores y las fechas de forma vectorizada. FRED marca los datos faltantes con '.'
+        time_periods, obs_values = parse_observations(serie_data, 'date', 'value', '%Y-%m-%d', na_values=('.',), thousands=',')
+        
+        # Crear la serie columnar, sin copiar los arreglos
+        return ColumnarSeries.from_index(serie_id, time_periods, obs_values, provider=self.provider)
 
-            # Extraer los valores y las fechas
-            obs_values = [float(entry['value'].replace(",", "")) if entry['value'] != '.' else pd.NA for entry in serie_data]
-            time_periods = [entry['date'] for entry in serie_data]
 
-            # Formatear los periodos de tiempo
-            time_periods_formatted = [pd.to_datetime(period).date() for period in time_periods]
-            
-            # Agregar la observación a un DataFrame de pandas
-            serie = pd.Series(obs_values, index=time_periods_formatted, name=id)
+    def _stream_series_data(self, endpoint:str, serie_id:str) -> ColumnarSeries:
+
+        # Leer la respuesta de forma incremental y convertir las observaciones por bloques
+        with self._stream_request(endpoint) as response:
+            for _, time_periods, obs_values in stream_series(response.raw, 'observations', 'date', 'value', '%Y-%m-%d', na_values=('.',), thousands=','):
+                return ColumnarSeries.from_index(serie_id, time_periods, obs_values, provider=self.provider)
+
+        return ColumnarSeries.from_index(serie_id, [], [], provider=self.provider)
 
-            # Agregar la serie al DataFrame
-            series_df = pd.concat([series_df, serie], axis=1, join='outer')
 
-        # Ordenar el DataFrame por fecha
-        series_df = series_df.sort_index()
+    def _build_series_frame(self, series_list:list) -> pd.DataFrame:
+
+        # Alinear todas las series sobre la union de sus fechas en un solo paso (el resultado queda ordenado por fecha)
+        series_df = build_frame(series_list)
 
         # Verificar que el indice es del  tipo datetime
         if not pd.api.types.is_datetime64_any_dtype(series_df.index):
@@ -193,7 +237,7 @@ class Fred(BaseAPI):
         return series_df
 
 
-    def get_releases_data(self, serie_id:str | list, last_data:bool=False, start_date:str=None, end_date:str=datetime.today().strftime('%Y-%m-%d')) -> pd.DataFrame:
+    def get_releases_data(self, serie_id:str | list, last_data:bool=False, start_date:str=None, end_date:str=None) -> pd.DataFrame:
         """
         Obtiene datos de series económicas desde la API de Banxico (SIE) y los devuelve en un DataFrame de pandas.
 
@@ -212,9 +256,7 @@ class Fred(BaseAPI):
                                             Por defecto es False.
 
         Returns:
-            pandas.DataFrame: Un DataFrame con las series obtenidas. Las columnas representan las series, y las filas 
-                            corresponden a las fechas de observación.
-            dict: Un diccionario con informacion de la serie
+            pandas.Series: La serie obtenida (float64), indexada por las fechas de observación como datetime.date.
                             
         Raises:
             Exception: Si la solicitud a la API de Banxico falla, devuelve un mensaje con el código de error y la respuesta.
@@ -234,14 +276,37 @@ class Fred(BaseAPI):
         # Extraer los datos de la serie
         serie_data = data_json['observations']
 
-        # Extraer los valores y las fechas
-        obs_values = [float(entry['value'].replace(",", "")) if entry['value'] != 'N/E' else pd.NA for entry in serie_data]
-        time_periods = [entry['date'] for entry in serie_data]
-
-        # Formatear los periodos de tiempo
-        time_periods_formatted = [pd.to_datetime(period).date() for period in time_periods]
+        # Extraer y convertir los valores y las fechas de forma vectorizada
+        time_periods, obs_values = parse_observations(serie_data, 'date', 'value', '%Y-%m-%d', na_values=('.',), thousands=',')
         
-        # Agregar la observación a un DataFrame de pandas
-        serie = pd.Series(obs_values, index=time_periods_formatted, name=serie_id)
+        # Agregar la observación a un DataFrame de pandas. El indice conserva las fechas como datetime.date
+        serie = pd.Series(obs_values, index=pd.Index(time_periods.date, dtype=object), name=serie_id)
         
-        return serie
\ No newline at end of file
+        return serie
+
+
+
+class AsyncFred(Fred, AsyncBaseAPI):
+    """
+    Variante asincrona de Fred. Como FRED solo acepta una serie por solicitud, get_series_data lanza
+    todas las solicitudes a la vez y las resuelve de forma concurrente, respetando el limite por host.
+
+    Example:
+        >>> fred_api = AsyncFred(token, max_connections_per_host=8)
+        >>> df = asyncio.run(fred_api.get_series_data(['DFF', 'GDP', 'UNRATE'], start_date='2020-01-01'))
+    """
+
+    async def get_series_data(self, serie_id:str | list, last_data:bool=False, start_date:str=None, end_date:str=None, columnar:bool=False) -> pd.DataFrame | list:
+        """
+        Version asincrona de Fred.get_series_data.
+        """
+
+        serie_id = self._validate_serie_id(serie_id)
+
+        # Se construyen todas las solicitudes antes de lanzarlas para validar los parametros de inmediato
+        endpoints = [self._set_series_params(id, last_data, start_date, end_date) for id in serie_id]
+        responses = await asyncio.gather(*(self._make_request(endpoint) for endpoint in endpoints))
+
+        series_list = [self._parse_series_data(data_json, id) for data_json, id in zip(responses, serie_id)]
+
+        return series_list if columnar else self._build_series_frame(series_list)
@@ -1 +1,11 @@
-from .bie import INEGI_BIE  # Importa directamente
\ No newline at end of file
+from .._lazy import lazy_exports
+
+_EXPORTS = {
+    'INEGI_BIE': '.bie', 'AsyncINEGI_BIE': '.bie',
+    'INEGI_DENUE': '.denue',
+    'parse_periods': '.periods', 'period_index': '.periods',
+    'CodeListCatalog': '.catalogs', 'get_code_list_catalog': '.catalogs', 'set_code_list_catalog': '.catalogs',
+}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,17 +1,42 @@
 
 # Librerias necesarias -------------------------------------------------------------------------
 
-import pandas as pd
-from datetime import datetime, date
-import requests
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+from operator import itemgetter
 
 from ..baseapi.baseapi import BaseAPI
+from ..baseapi.frames import build_frame
+from ..baseapi.columnar import ColumnarSeries
+from ..baseapi.parsing import parse_values
+from ..baseapi.streaming import stream_series
+from .catalogs import CodeListCatalog, get_code_list_catalog
+from .periods import PERIOD_ALIGNMENTS, parse_periods
+from ..baseapi.asyncapi import AsyncBaseAPI
+
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
 
 # Clase -------------------------------------------------------------------------
 
 class INEGI_BIE(BaseAPI):
-    def __init__(self, api_key):
-        super().__init__(api_key, "https://www.inegi.org.mx/app/api/indicadores/desarrolladores/jsonxml")
+    provider = 'inegi'
+
+    def __init__(self, api_key, code_lists:CodeListCatalog=None, period_alignment:str='last_month', **kwargs):
+        super().__init__(api_key, "https://www.inegi.org.mx/app/api/indicadores/desarrolladores/jsonxml", **kwargs)
+
+        # Fecha que representa cada periodo. Por defecto el primer dia de su ultimo mes, como las series trimestrales de Banxico
+        if period_alignment not in PERIOD_ALIGNMENTS:
+            raise ValueError(f"period_alignment debe ser uno de {PERIOD_ALIGNMENTS}.")
+        self.period_alignment = period_alignment
+
+        # Catalogos CL_* compartidos con el resto de instancias de INEGI del proceso
+        self.code_lists = code_lists if code_lists is not None else get_code_list_catalog()
 
     # Funcion para cambiar la presentacion de los periodos de tiempo de la serie de acuerdo con las especificacionesde la metadata de la API de INEGI
     def _freq_handler(self, frequency_id:int):
@@ -27,15 +52,8 @@ class INEGI_BIE(BaseAPI):
             string: Un objeto string con la descripcion de la frecuencia de la serie.
         """
 
-        # Definir url de API
-        endpoint = f"/CL_FREQ/{frequency_id}/es/BIE/2.0/{self._BaseAPI__api_key}?type=json"
-
-        # Extraer y convertir datos
-        data_json = self._make_request(endpoint=endpoint)
-        serie_data = data_json['CODE'][0]
-        freq_str = serie_data['Description']
-
-        return freq_str
+        # Se resuelve con el catalogo CL_FREQ en memoria, que se descarga completo una sola vez
+        return self.code_lists.describe(self, 'CL_FREQ', frequency_id)
     
     
     def _unit_handler(self, unit_id:int):
@@ -49,95 +67,26 @@ class INEGI_BIE(BaseAPI):
             string: Un objeto string con la descripcion de las unidades de la serie.
         """
         
-        # Definir url de API
-        endpoint = f"/CL_UNIT/{unit_id}/es/BIE/2.0/{self._BaseAPI__api_key}?type=json"
-
-        # Extraer y convertir datos 
-        data_json = self._make_request(endpoint=endpoint)
-        serie_data = data_json['CODE'][0]
-        unit_str = serie_data['Description']
-
-        return unit_str
+        # Se resuelve con el catalogo CL_UNIT en memoria, que se descarga completo una sola vez
+        return self.code_lists.describe(self, 'CL_UNIT', unit_id)
     
     
-    def _transform_time_periods(self, time_periods:list, frequency_id:int):
+    def _transform_time_periods(self, time_periods:list, frequency_id:int | list) -> pd.DatetimeIndex:
         """
-        Recibe los datos de los periodos de tiempo de la serie y, de acuerdo con la metadata y descripcion revisada desde la API de INEGI, devuelve las fechas correspondientes en tipo datetime.
+        Recibe los periodos de tiempo de la serie y, de acuerdo con su frecuencia CL_FREQ, devuelve las fechas
+        correspondientes. Se admiten las 13 frecuencias del BIE y 'frequency_id' puede indicar la frecuencia de cada
+        periodo, para convertir series de distinta frecuencia en una sola pasada.
 
         Args:
             time_periods (list): Los periodos de tiempo de la serie.
-            frequency_id (int): El ID de la frecuencia de la serie.
-        
+            frequency_id (int | list): El ID de la frecuencia de la serie o de cada periodo.
+
         Returns:
-            datetime.date: Una lista de objetos datetime.date con las fechas correspondientes a los periodos de tiempo de la serie.
+            pandas.DatetimeIndex: La fecha de cada periodo segun 'period_alignment': el primer dia de su ultimo mes, su inicio o su ultimo dia.
         """
 
-        if frequency_id == 1: # 10 años
-        
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 2: # 5 años
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 3: # Anual
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 4: # Semestral
-            
-            time_periods_formatted = []
-            for period in time_periods:
-                year, quarter = map(int, period.split('/'))
-                time_periods_formatted.append(str(date(year,quarter*3,1)))
-
-        elif frequency_id == 5: # Cuatrimestral
-            
-            time_periods_formatted = []
-            for period in time_periods:
-                year, quarter = map(int, period.split('/'))
-                time_periods_formatted.append(str(date(year,quarter*3,1)))
-        
-        elif frequency_id == 6: # Trimestral
-
-            time_periods_formatted = []
-            for period in time_periods:
-                year, quarter = map(int, period.split('/'))
-                time_periods_formatted.append(str(date(year,quarter*3,1)))
-        
-        elif frequency_id == 7: # Bimestral
-
-            time_periods_formatted = []
-            for period in time_periods:
-                year, quarter = map(int, period.split('/'))
-                time_periods_formatted.append(str(date(year,quarter*3,1)))
-
-        elif frequency_id == 8: # Mensual
-            
-            time_periods_formatted = [pd.to_datetime(period, dayfirst=True).strftime('%Y-%m-%d') for period in time_periods]
-
-        elif frequency_id == 9: # Quincenal
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 10: # Decenal
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 11: # Semanal
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 12: # Diaria
-            
-            time_periods_formatted = [pd.to_datetime(period, dayfirst=True) for period in time_periods]
+        return parse_periods(time_periods, frequency_id, how=self.period_alignment)
 
-        elif frequency_id == 13: # Irregular
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        return time_periods_formatted
-    
     def _set_series_params(self, serie_id:str | list, last_data:bool=False) -> str:
         """
         Establece los parámetros necesarios para realizar una solicitud a la API de INEGI (BIE) y los devuelve en un diccionario.
@@ -205,9 +154,6 @@ class INEGI_BIE(BaseAPI):
         # Inicializar un diccionario vacío para almacenar los metadatos
         series_dict = {}
 
-        # Extraer y convertir datos
-        data_json = self._make_request(endpoint=endpoint)
-
         for serie_data in data_json['Series']:
         
             # Extraer metadatos
@@ -226,7 +172,7 @@ class INEGI_BIE(BaseAPI):
 
 
     # Función para obtener los datos de una serie desde la API de INEGI
-    def get_series_data(self, serie_id:str | list, last_data:bool=False) -> pd.DataFrame:
+    def get_series_data(self, serie_id:str | list, last_data:bool=False, stream:bool=False, columnar:bool=False) -> pd.DataFrame | list:
         """
         Obtiene datos de series económicas y estadísticas desde la API de INEGI (BIE) y los devuelve en un DataFrame de pandas.
 
@@ -235,6 +181,11 @@ class INEGI_BIE(BaseAPI):
                                 Si se proporciona un solo ID, puede ser una cadena de texto (str).
             last_data (bool, optional): Si se establece en True, obtendrá solo las últimas observaciones disponibles de la serie.
                                     Por defecto es False.
+            stream (bool, optional): Si se establece en True, la respuesta se lee de forma incremental y las observaciones se
+                                    convierten por bloques, reduciendo el pico de memoria. La respuesta no pasa por la cache.
+                                    Requiere la libreria 'ijson'. Por defecto es False.
+            columnar (bool, optional): Si se establece en True, devuelve una lista de ColumnarSeries en lugar de un DataFrame.
+                                    Ocupa menos memoria al mantener muchas series. Por defecto es False.
 
         Returns:
             pandas.DataFrame: Un DataFrame con las series obtenidas. Las columnas representan las series, y las filas 
@@ -252,36 +203,80 @@ class INEGI_BIE(BaseAPI):
 
         # Definir url de API y realizar la solicitud
         endpoint = self._set_series_params(serie_id, last_data)
+        if stream:
+            return self._assemble_series_data(self._stream_series_data(endpoint), columnar)
+
         data_json = self._make_request(endpoint=endpoint)
 
-        # Inicializar un DataFrame vacío para almacenar los datos
-        series_df = pd.DataFrame()
+        return self._parse_series_data(data_json, columnar)
 
-        for serie_data in data_json['Series']:
-        
-            # Extraer metadatos
-            serie_id = serie_data['INDICADOR']
-            freq = int(serie_data['FREQ'])
 
-            # Extraer datos de la serie
-            obs = serie_data['OBSERVATIONS']
+    def _parse_series_data(self, data_json:dict, columnar:bool=False) -> pd.DataFrame | list:
 
-            # Extraer los valores y las fechas
-            obs_values = [float(entry['OBS_VALUE']) for entry in obs]
-            time_periods = [entry['TIME_PERIOD'] for entry in obs]
+        if self.parser is not None:
+            # Las series se reparten entre los procesos del backend, que devuelven las fechas y los valores ya convertidos
+            entries = [
+                (
+                    serie_data['INDICADOR'],
+                    list(map(itemgetter('TIME_PERIOD'), serie_data['OBSERVATIONS'])),
+                    list(map(itemgetter('OBS_VALUE'), serie_data['OBSERVATIONS'])),
+                    (int(serie_data['FREQ']),),
+                )
+                for serie_data in data_json['Series']
+            ]
+            parsed = self.parser.parse(entries, partial(parse_periods, how=self.period_alignment), na_values=('',))
+            return self._build_series_data([(serie_id, freq, dates, obs_values) for (serie_id, dates, obs_values), (_, _, _, (freq,)) in zip(parsed, entries)], columnar)
 
-            # Transforma los periodos y frecuencia para que sea mas legible
-            time_periods_formatted = self._transform_time_periods(time_periods, freq)
+        # Extraer los metadatos, los valores y los periodos de cada serie. Los valores se convierten de forma vectorizada
+        parsed = (
+            (
+                serie_data['INDICADOR'],
+                int(serie_data['FREQ']),
+                list(map(itemgetter('TIME_PERIOD'), serie_data['OBSERVATIONS'])),
+                parse_values(list(map(itemgetter('OBS_VALUE'), serie_data['OBSERVATIONS'])), na_values=('',)),
+            )
+            for serie_data in data_json['Series']
+        )
 
-            # Crear una serie de pandas con los datos obtenidos
-            serie = pd.Series(obs_values, index=time_periods_formatted, name=serie_id)
+        return self._assemble_series_data(parsed, columnar)
 
-            # Agregar la serie al DataFrame
-            series_df = pd.concat([series_df, serie], axis=1, join='outer')
-        
-        
-        # Ordenar el DataFrame por fecha
-        series_df = series_df.sort_index()
+
+    def _stream_series_data(self, endpoint:str):
+
+        # Leer la respuesta de forma incremental y convertir las observaciones por bloques
+        with self._stream_request(endpoint) as response:
+            for header, time_periods, obs_values in stream_series(response.raw, 'OBSERVATIONS', 'TIME_PERIOD', 'OBS_VALUE', series_path='Series', header_keys=('INDICADOR', 'FREQ'), na_values=('',)):
+                yield header['INDICADOR'], int(header['FREQ']), list(time_periods), obs_values
+
+
+    def _assemble_series_data(self, parsed, columnar:bool=False) -> pd.DataFrame | list:
+
+        parsed = list(parsed)
+
+        # Los periodos de todas las series se convierten en una sola pasada, aunque tengan frecuencias distintas
+        lengths = [len(time_periods) for _, _, time_periods, _ in parsed]
+        dates = self._transform_time_periods(
+            [period for _, _, time_periods, _ in parsed for period in time_periods],
+            np.repeat([freq for _, freq, _, _ in parsed], lengths).astype('int64'),
+        )
+        offsets = np.cumsum([0] + lengths)
+
+        return self._build_series_data([(serie_id, freq, dates[offsets[position]:offsets[position + 1]], obs_values) for position, (serie_id, freq, _, obs_values) in enumerate(parsed)], columnar)
+
+
+    def _build_series_data(self, parsed:list, columnar:bool=False) -> pd.DataFrame | list:
+
+        # Crear una serie columnar por indicador con sus fechas ya convertidas, sin copiar los arreglos. El DataFrame se arma una sola vez al final
+        series_list = [
+            ColumnarSeries.from_index(serie_id, dates, obs_values, provider=self.provider, freq=str(freq))
+            for serie_id, freq, dates, obs_values in parsed
+        ]
+
+        if columnar:
+            return series_list
+
+        # Alinear todas las series sobre la union de sus fechas en un solo paso (el resultado queda ordenado por fecha)
+        series_df = build_frame(series_list)
 
         # Verificar que el indice es del  tipo datetime
         if not pd.api.types.is_datetime64_any_dtype(series_df.index):
@@ -289,3 +284,46 @@ class INEGI_BIE(BaseAPI):
         
         return series_df
 
+
+
+class AsyncINEGI_BIE(INEGI_BIE, AsyncBaseAPI):
+    """
+    Variante asincrona de INEGI_BIE. Las descripciones de frecuencia y unidades se resuelven con el catalogo
+    compartido de INEGI, por lo que la metadata solo requiere la solicitud del indicador.
+
+    Example:
+        >>> inegi_api = AsyncINEGI_BIE(token)
+        >>> df = asyncio.run(inegi_api.get_series_data(['736183', '628208']))
+    """
+
+    async def get_series_metadata(self, serie_id:str | list) -> dict:
+        """
+        Version asincrona de INEGI_BIE.get_series_metadata.
+        """
+
+        endpoint = self._set_series_params(serie_id, last_data=False)
+        data_json = await self._make_request(endpoint=endpoint)
+
+        # Los catalogos se cargan fuera del event loop porque la primera vez pueden requerir una descarga
+        await asyncio.gather(*(asyncio.to_thread(self.code_lists.load, self, code_list) for code_list in ('CL_FREQ', 'CL_UNIT')))
+
+        series_dict = {}
+        for serie_data in data_json['Series']:
+            freq_str, unit_str = await asyncio.gather(
+                asyncio.to_thread(self._freq_handler, int(serie_data['FREQ'])),
+                asyncio.to_thread(self._unit_handler, int(serie_data['UNIT'])),
+            )
+            series_dict[serie_data['INDICADOR']] = {'periodicidad': freq_str, 'unidad': unit_str}
+
+        return series_dict
+
+
+    async def get_series_data(self, serie_id:str | list, last_data:bool=False, columnar:bool=False) -> pd.DataFrame | list:
+        """
+        Version asincrona de INEGI_BIE.get_series_data.
+        """
+
+        endpoint = self._set_series_params(serie_id, last_data)
+        data_json = await self._make_request(endpoint=endpoint)
+
+        return self._parse_series_data(data_json, columnar)
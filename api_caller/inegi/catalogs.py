@@ -0,0 +1,239 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+import os
+import json
+import time
+import logging
+import threading
+import requests
+
+from ..baseapi.baseapi import BaseAPI
+from ..baseapi.ratelimit import get_rate_limiter
+
+# Constantes -----------------------------------------------------------------------------------
+
+# Los catalogos CL_* se consultan siempre en la API del BIE
+BIE_BASE_URL = "https://www.inegi.org.mx/app/api/indicadores/desarrolladores/jsonxml"
+
+CODE_LISTS = ('CL_INDICATOR', 'CL_UNIT', 'CL_UNIT_MULT', 'CL_FREQ', 'CL_SOURCE', 'CL_NOTE', 'CL_TOPIC', 'CL_STATUS', 'CL_GEO_AREA')
+
+# Catalogos del DENUE. Su API no publica catalogos: las clases SCIAN se aprenden de las busquedas y los estratos son fijos
+DENUE_CODE_LISTS = ('SCIAN', 'ESTRATO')
+
+# Estratos de personal ocupado del endpoint Cuantificar
+DENUE_STRATA = {
+    '1': '0 a 5 personas',
+    '2': '6 a 10 personas',
+    '3': '11 a 30 personas',
+    '4': '31 a 50 personas',
+    '5': '51 a 100 personas',
+    '6': '101 a 250 personas',
+    '7': '251 y más personas',
+}
+
+# Clase ----------------------------------------------------------------------------------------
+
+class CodeListCatalog:
+    """
+    Cache de los catalogos de codigos de INEGI (CL_FREQ, CL_UNIT y el resto de tablas CL_*). Cada catalogo se
+    descarga completo una sola vez (consultando el codigo 'null') y despues se resuelve en memoria. Si un codigo
+    no aparece en la descarga completa se consulta de forma individual y se agrega al catalogo. Si la descarga
+    completa falla, los codigos se consultan de forma individual y no se vuelve a intentar hasta que pasen
+    'retry_after' segundos.
+
+    Tambien guarda los catalogos del DENUE (DENUE_CODE_LISTS), que no se descargan: INEGI_DENUE agrega las clases
+    SCIAN que aparecen en sus busquedas y las usa para describir los codigos de Cuantificar.
+
+    Por defecto todas las instancias de INEGI_BIE e INEGI_DENUE comparten el catalogo del proceso, ver
+    get_code_list_catalog.
+
+    Args:
+        path (str, optional): Archivo JSON donde se persisten los catalogos entre ejecuciones. Por defecto no se persisten.
+        ttl (float, optional): Segundos que un catalogo se considera vigente antes de volver a descargarlo. Por defecto es una semana.
+        retry_after (float, optional): Segundos de espera antes de reintentar una descarga completa que fallo. Por defecto es una hora.
+
+    Example:
+        >>> catalog = CodeListCatalog(path='inegi_catalogs.json', ttl=30*86400)
+        >>> inegi_api = INEGI_BIE(token, code_lists=catalog)
+    """
+
+    def __init__(self, path:str=None, ttl:float=7*86400, retry_after:float=3600):
+        self.path = path
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self._tables = {}
+        self._failed_at = {}
+        self._clients = {}
+        self._lock = threading.RLock()
+
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as file:
+                    self._tables = json.load(file)
+            except ValueError:
+                logging.warning(f"No se pudo leer el archivo de catalogos de INEGI '{path}'. Se ignorara.")
+
+    def _client(self, connector) -> BaseAPI:
+        # Se reutiliza el conector si apunta a la API del BIE; en otro caso se usa un cliente propio con la misma llave
+        if connector.base_url == BIE_BASE_URL:
+            return connector
+        api_key = connector.api_key
+        with self._lock:
+            if api_key not in self._clients:
+                self._clients[api_key] = BaseAPI(api_key, BIE_BASE_URL, cache=connector.cache, rate_limiter=get_rate_limiter('inegi'))
+            return self._clients[api_key]
+
+    def _fetch(self, connector, code_list:str, code:str) -> list:
+        client = self._client(connector)
+        endpoint = f"/{code_list}/{code}/es/BIE/2.0/{client.api_key}?type=json"
+
+        # Se usa la implementacion sincrona de BaseAPI para que el catalogo funcione tambien con los conectores asincronos
+        data_json = BaseAPI._make_request(client, endpoint=endpoint)
+        return data_json['CODE']
+
+    def _save(self):
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self._tables, file, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def load(self, connector, code_list:str) -> dict:
+        """
+        Devuelve el catalogo completo {codigo: descripcion}, descargandolo si no esta en memoria o si ya expiro.
+
+        Args:
+            connector: Un conector de INEGI del que se toma la llave de la API.
+            code_list (str): El nombre del catalogo, por ejemplo 'CL_FREQ'.
+
+        Returns:
+            dict: Un diccionario con las descripciones por codigo.
+        """
+
+        if code_list not in CODE_LISTS:
+            raise ValueError(f"code_list debe ser uno de los siguientes valores: {', '.join(CODE_LISTS)}")
+
+        with self._lock:
+            table = self._tables.get(code_list)
+            if table is not None and time.time() - table['loaded_at'] < self.ttl:
+                return table['codes']
+
+            # Tras un fallo reciente no se reintenta la descarga completa; los codigos se consultan de forma individual
+            if time.time() - self._failed_at.get(code_list, float('-inf')) < self.retry_after:
+                return self._tables.setdefault(code_list, {'loaded_at': 0, 'codes': {}})['codes']
+
+        # La descarga se hace fuera del candado para no bloquear las consultas de los otros catalogos
+        try:
+            codes = {str(entry['value']): entry['Description'] for entry in self._fetch(connector, code_list, 'null')}
+        except (requests.exceptions.RequestException, KeyError, TypeError, ValueError) as fetch_err:
+            # Si la descarga completa no esta disponible, o la respuesta es un mensaje en lugar de la lista de codigos,
+            # se resolveran los codigos de forma individual. El catalogo no se marca como vigente y la descarga completa
+            # se reintenta despues de 'retry_after' segundos
+            logging.warning(f"No se pudo descargar el catalogo {code_list} completo ({fetch_err!r}). Se consultaran los codigos de forma individual.")
+            with self._lock:
+                self._failed_at[code_list] = time.time()
+                return self._tables.setdefault(code_list, {'loaded_at': 0, 'codes': {}})['codes']
+
+        with self._lock:
+            self._failed_at.pop(code_list, None)
+            self._tables[code_list] = {'loaded_at': time.time(), 'codes': codes}
+            self._save()
+
+        return codes
+
+    def describe(self, connector, code_list:str, code) -> str:
+        """
+        Devuelve la descripcion de un codigo de un catalogo de INEGI.
+
+        Args:
+            connector: Un conector de INEGI del que se toma la llave de la API.
+            code_list (str): El nombre del catalogo, por ejemplo 'CL_UNIT'.
+            code (int | str): El codigo a describir.
+
+        Returns:
+            str: La descripcion del codigo.
+        """
+
+        code = str(code)
+        codes = self.load(connector, code_list)
+        if code in codes:
+            return codes[code]
+
+        # Codigo ausente en la descarga completa: se consulta individualmente y se agrega al catalogo
+        description = self._fetch(connector, code_list, code)[0]['Description']
+        with self._lock:
+            codes[code] = description
+            self._save()
+
+        return description
+
+    def add(self, code_list:str, codes:dict):
+        """
+        Agrega codigos a un catalogo del DENUE, por ejemplo las clases SCIAN de una busqueda.
+
+        Args:
+            code_list (str): El nombre del catalogo, 'SCIAN' o 'ESTRATO'.
+            codes (dict): Las descripciones por codigo.
+        """
+
+        if code_list not in DENUE_CODE_LISTS:
+            raise ValueError(f"code_list debe ser uno de los siguientes valores: {', '.join(DENUE_CODE_LISTS)}")
+
+        with self._lock:
+            table = self._tables.setdefault(code_list, {'loaded_at': time.time(), 'codes': {}})
+            new = {str(code): description for code, description in codes.items() if table['codes'].get(str(code)) != description}
+            if new:
+                table['codes'].update(new)
+                self._save()
+
+    def lookup(self, code_list:str, code) -> str:
+        """
+        Devuelve la descripcion de un codigo de un catalogo del DENUE sin consultar la API, o None si aun no se conoce.
+        """
+
+        if code_list not in DENUE_CODE_LISTS:
+            raise ValueError(f"code_list debe ser uno de los siguientes valores: {', '.join(DENUE_CODE_LISTS)}")
+
+        code = str(code)
+        with self._lock:
+            description = self._tables.get(code_list, {}).get('codes', {}).get(code)
+        if description is None and code_list == 'ESTRATO':
+            description = DENUE_STRATA.get(code)
+        return description
+
+    def clear(self):
+        with self._lock:
+            self._tables = {}
+            self._failed_at = {}
+            self._save()
+
+
+# Catalogo compartido por todas las instancias del proceso
+_default_catalog = None
+_default_catalog_lock = threading.Lock()
+
+
+def get_code_list_catalog() -> CodeListCatalog:
+    """
+    Devuelve el catalogo de codigos compartido por el proceso, creandolo la primera vez.
+    """
+    global _default_catalog
+    with _default_catalog_lock:
+        if _default_catalog is None:
+            _default_catalog = CodeListCatalog()
+        return _default_catalog
+
+
+def set_code_list_catalog(catalog:CodeListCatalog):
+    """
+    Reemplaza el catalogo compartido por el proceso, por ejemplo para persistirlo en disco.
+
+    Example:
+        >>> set_code_list_catalog(CodeListCatalog(path='inegi_catalogs.json'))
+    """
+    global _default_catalog
+    if not isinstance(catalog, CodeListCatalog):
+        raise ValueError("catalog debe ser una instancia de CodeListCatalog.")
+    with _default_catalog_lock:
+        _default_catalog = catalog
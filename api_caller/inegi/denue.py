@@ -1,279 +1,296 @@
 # Librerias necesarias -------------------------------------------------------------------------
 
-import pandas as pd
-from datetime import datetime, date
-import requests
+from __future__ import annotations
+
+from urllib.parse import quote
 
 from ..baseapi.baseapi import BaseAPI
+from .catalogs import CodeListCatalog, get_code_list_catalog, DENUE_STRATA
+
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# Constantes -----------------------------------------------------------------------------------
+
+# Registros por pagina en las consultas por rango (BuscarEntidad y BuscarAreaAct)
+DEFAULT_PAGE_SIZE = 1000
+
+# Columnas de la respuesta con pocos valores distintos, que se guardan como categorias
+CATEGORICAL_COLUMNS = ('Clase_actividad', 'Estrato', 'Tipo', 'Tipo_vialidad', 'tipo_corredor_industrial', 'nom_corredor_industrial')
+
+# Columnas numericas de la respuesta
+INTEGER_COLUMNS = ('Id',)
+FLOAT_COLUMNS = ('Latitud', 'Longitud')
+
+# Funciones ------------------------------------------------------------------------------------
+
+def _records(data_json) -> list:
+    # El DENUE responde con una lista de establecimientos, o con un mensaje cuando no hay resultados
+    if isinstance(data_json, list) and data_json and isinstance(data_json[0], dict):
+        return data_json
+    return []
+
+
+def _parse_page(entries:list) -> dict:
+    # Convierte una pagina de establecimientos a columnas, para no mantener en memoria la lista de diccionarios
+    keys = list(dict.fromkeys(key for entry in entries[:1] for key in entry))
+    return {key: np.array([entry.get(key) for entry in entries], dtype=object) for key in keys}
+
+
+def _length(chunk:dict) -> int:
+    return len(next(iter(chunk.values()))) if chunk else 0
+
+
+def build_table(chunks:list) -> pd.DataFrame:
+    """
+    Une las paginas de establecimientos en una tabla con tipos: identificadores enteros, coordenadas float64 y
+    categorias para las columnas con pocos valores distintos. A partir de la CLEE se agregan los codigos de la
+    entidad, el municipio y la clase de actividad SCIAN como categorias.
 
-# Clase -------------------------------------------------------------------------
+    Args:
+        chunks (list): Paginas convertidas a columnas (diccionarios {columna: arreglo}).
+
+    Returns:
+        pandas.DataFrame: Un establecimiento por fila.
+    """
+
+    chunks = [chunk for chunk in chunks if chunk]
+    if not chunks:
+        return pd.DataFrame()
+
+    columns = list(dict.fromkeys(key for chunk in chunks for key in chunk))
+    lengths = [_length(chunk) for chunk in chunks]
+
+    table = {}
+    for column in columns:
+        values = np.concatenate([chunk[column] if column in chunk else np.full(length, None, dtype=object) for chunk, length in zip(chunks, lengths)])
+
+        if column in INTEGER_COLUMNS:
+            table[column] = pd.array(pd.to_numeric(values, errors='coerce'), dtype='Int64')
+        elif column in FLOAT_COLUMNS:
+            table[column] = pd.to_numeric(values, errors='coerce').astype('float64', copy=False)
+        elif column in CATEGORICAL_COLUMNS:
+            table[column] = pd.Categorical(values)
+        else:
+            table[column] = values
+
+    # La CLEE empieza con la entidad (2 digitos), el municipio (3) y la clase de actividad SCIAN (6)
+    if 'CLEE' in table:
+        clee = pd.Series(table['CLEE'], dtype=object).fillna('').astype(str)
+        valid = clee.str.len() >= 11
+        table['Entidad'] = pd.Categorical(clee.str[:2].where(valid))
+        table['Municipio'] = pd.Categorical(clee.str[2:5].where(valid))
+        table['SCIAN'] = pd.Categorical(clee.str[5:11].where(valid))
+
+    return pd.DataFrame(table)
+
+# Clase ----------------------------------------------------------------------------------------
 
 class INEGI_DENUE(BaseAPI):
-    def __init__(self, api_key):
-        super().__init__(api_key, "https://www.inegi.org.mx/app/api/denue/v1/consulta/")
+    """
+    Conector a la API del Directorio Estadistico Nacional de Unidades Economicas (DENUE) de INEGI. Las consultas por
+    rango de registros se descargan por paginas en paralelo y cada pagina se convierte a columnas en cuanto llega,
+    de modo que una extraccion de cientos de miles de establecimientos no se guarda como una lista de diccionarios.
 
-    # Funcion para cambiar la presentacion de los periodos de tiempo de la serie de acuerdo con las especificacionesde la metadata de la API de INEGI
-    def _freq_handler(self, frequency_id:int):
-        """
-        Recibe los datos de la frecuencia de actualización de los datos, de acuerdo con la metadata y descripcion revisada desde la API de INEGI, devuelve las fechas correspondientes en tipo datetime.
+    Las clases SCIAN que aparecen en las busquedas se agregan al catalogo de codigos compartido con INEGI_BIE, y
+    count las usa para describir los codigos de actividad.
 
-        Args:
-            time_periods (list): Los periodos de tiempo de la serie.
-            frequency_id (int): El ID de la frecuencia de la serie.
+    Args:
+        api_key (str): El token de la API del DENUE.
+        page_size (int, optional): Registros por pagina en las consultas por rango. Por defecto es 1000.
+        code_lists (CodeListCatalog, optional): Catalogo de codigos. Por defecto se usa el catalogo compartido del proceso.
+        **kwargs: Argumentos adicionales de BaseAPI (por ejemplo 'cache').
 
-        Returns:
-            datetime.date: Una lista de objetos datetime.date con las fechas correspondientes a los periodos de tiempo de la serie.
-            string: Un objeto string con la descripcion de la frecuencia de la serie.
-        """
+    Example:
+        >>> denue_api = INEGI_DENUE(token)
+        >>> df = denue_api.search_by_area_activity(state='09', sector='46')
+        >>> df.groupby('SCIAN', observed=True).size()
+    """
+    provider = 'inegi_denue'
 
-        # Definir url de API
-        endpoint = f"/CL_FREQ/{frequency_id}/es/BIE/2.0/{self._BaseAPI__api_key}?type=json"
+    def __init__(self, api_key, page_size:int=DEFAULT_PAGE_SIZE, code_lists:CodeListCatalog=None, **kwargs):
+        super().__init__(api_key, "https://www.inegi.org.mx/app/api/denue/v1/consulta", **kwargs)
 
-        # Extraer y convertir datos
-        data_json = self._make_request(endpoint=endpoint)
-        serie_data = data_json['CODE'][0]
-        freq_str = serie_data['Description']
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError("page_size debe ser un entero mayor o igual a 1.")
+        self.page_size = page_size
 
-        return freq_str
-    
-    
-    def _unit_handler(self, unit_id:int):
-        """
-        Recibe el identificador de las unidades de medida de la serie y, de acuerdo con la metadata y descripcion revisada desde la API de INEGI, devuelve la descripcion de las unidades de medida.
+        # Catalogo de codigos compartido por todas las instancias de INEGI_BIE e INEGI_DENUE
+        self.code_lists = code_lists if code_lists is not None else get_code_list_catalog()
 
-        Args:
-            unit_id (int): El identificador de la unidad de medida.
 
-        Returns:
-            string: Un objeto string con la descripcion de las unidades de la serie.
-        """
-        
-        # Definir url de API
-        endpoint = f"/CL_UNIT/{unit_id}/es/BIE/2.0/{self._BaseAPI__api_key}?type=json"
-
-        # Extraer y convertir datos 
-        data_json = self._make_request(endpoint=endpoint)
-        serie_data = data_json['CODE'][0]
-        unit_str = serie_data['Description']
-
-        return unit_str
-    
-    
-    def _transform_time_periods(self, time_periods:list, frequency_id:int):
-
-        if frequency_id == 1: # 10 años
-        
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 2: # 5 años
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 3: # Anual
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 4: # Semestral
-            
-            time_periods_formatted = []
-            for period in time_periods:
-                year, quarter = map(int, period.split('/'))
-                time_periods_formatted.append(str(date(year,quarter*3,1)))
-
-        elif frequency_id == 5: # Cuatrimestral
-            
-            time_periods_formatted = []
-            for period in time_periods:
-                year, quarter = map(int, period.split('/'))
-                time_periods_formatted.append(str(date(year,quarter*3,1)))
-        
-        elif frequency_id == 6: # Trimestral
-
-            time_periods_formatted = []
-            for period in time_periods:
-                year, quarter = map(int, period.split('/'))
-                time_periods_formatted.append(str(date(year,quarter*3,1)))
-        
-        elif frequency_id == 7: # Bimestral
-
-            time_periods_formatted = []
-            for period in time_periods:
-                year, quarter = map(int, period.split('/'))
-                time_periods_formatted.append(str(date(year,quarter*3,1)))
-
-        elif frequency_id == 8: # Mensual
-            
-            time_periods_formatted = [pd.to_datetime(period, dayfirst=True).strftime('%Y-%m-%d') for period in time_periods]
-
-        elif frequency_id == 9: # Quincenal
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 10: # Decenal
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 11: # Semanal
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        elif frequency_id == 12: # Diaria
-            
-            time_periods_formatted = [pd.to_datetime(period, dayfirst=True).strftime('%Y-%m-%d') for period in time_periods]
-
-        elif frequency_id == 13: # Irregular
-            
-            raise ValueError('Frecuencia no soportada actualmente. Es necesario modificar el codigo para soportar esta frecuencia.')
-
-        # Cambiamos el tipo de datos a datetime
-        time_periods_formatted = pd.to_datetime(time_periods_formatted).date
-
-        return time_periods_formatted
-    
-    def _set_params(self, serie_id:str | list, last_data:bool=False) -> str:
-        """
-        Establece los parámetros necesarios para realizar una solicitud a la API de INEGI (BIE) y los devuelve en un diccionario.
+    def _path(self, *parts) -> str:
+        # Cada parte se codifica para que las palabras clave con espacios o acentos formen una ruta valida
+        return '/' + '/'.join(quote(str(part), safe=',') for part in parts) + f"/{self._BaseAPI__api_key}"
 
-        Args:
-            serie_id (str | list): El ID de la serie o una lista de IDs de series a consultar desde la API de Banxico. 
-                                Si se proporciona un solo ID, puede ser una cadena de texto (str).
-            last_data (bool, optional): Si se establece en True, obtendrá solo las últimas observaciones disponibles de la serie.
-                                    Por defecto es False.
 
-        Returns:
-            dict: Un diccionario con los parámetros necesarios para realizar una solicitud a la API de Banxico.
-                            
-        Raises:
-            ValueError: Si los argumentos no son del tipo esperado.
+    def _learn_codes(self, df:pd.DataFrame) -> pd.DataFrame:
+        # Las descripciones de las clases SCIAN de la busqueda se agregan al catalogo compartido
+        if 'SCIAN' in df.columns and 'Clase_actividad' in df.columns:
+            pairs = df[['SCIAN', 'Clase_actividad']].dropna().drop_duplicates('SCIAN')
+            if not pairs.empty:
+                self.code_lists.add('SCIAN', dict(zip(pairs['SCIAN'].astype(str), pairs['Clase_actividad'].astype(str))))
+        return df
+
+
+    def _fetch_page(self, endpoint:str) -> dict:
+        # Cada pagina se convierte en el hilo que la descargo
+        return _parse_page(_records(self._make_request(endpoint)))
 
+
+    def _fetch_ranges(self, endpoint_for_range, max_workers:int=8, limit:int=None) -> pd.DataFrame:
+        """
+        Descarga una consulta por rangos de registros. Se piden 'max_workers' paginas a la vez y se detiene en la
+        primera pagina incompleta, que marca el final de los resultados.
         """
 
-        # Verifica tipo y cambia el formato para adecuarse a la API
-        if not isinstance(last_data, bool):
-            raise ValueError(f"last_data debe ser un valor booleano.")
-        if last_data:
-            last_data = 'true'
-        else:
-            last_data = 'false'
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError("max_workers debe ser un entero mayor o igual a 1.")
+        if limit is not None and (not isinstance(limit, int) or limit < 1):
+            raise ValueError("limit debe ser un entero mayor o igual a 1.")
 
-        # Validar los tipos de datos de los argumentos
-        if isinstance(serie_id, str):
-            serie_id = [serie_id]
-        elif isinstance(serie_id, list) and all(isinstance(i, str) for i in serie_id):
-            pass
-        else:
-            raise ValueError("El 'serie_id' debe ser una cadena de texto o una lista de cadenas de texto.")
+        chunks = []
+        first = 1
+        while True:
+            ranges = [(start, start + self.page_size - 1) for start in range(first, first + max_workers * self.page_size, self.page_size)]
+            if limit is not None:
+                ranges = [(start, min(end, limit)) for start, end in ranges if start <= limit]
+            if not ranges:
+                break
 
-        # Definir url de API
-        endpoint = f"/INDICATOR/{','.join(serie_id)}/es/0700/{last_data}/BIE/2.0/{self._BaseAPI__api_key}?type=json"
+            pages = self._run_concurrently(lambda record_range: self._fetch_page(endpoint_for_range(*record_range)), ranges, max_workers)
+            chunks.extend(pages)
 
-        return endpoint
+            # Una pagina incompleta marca el final de los resultados
+            if any(_length(page) < end - start + 1 for page, (start, end) in zip(pages, ranges)):
+                break
+            first = ranges[-1][1] + 1
 
+        return self._learn_codes(build_table(chunks))
 
-    def get_metadata(self, serie_id:str | list) -> dict:
+
+    def search(self, condition:str='todos', latitude:float=None, longitude:float=None, meters:int=250) -> pd.DataFrame:
         """
-        Obtiene la metadata de una serie económica o estadística desde la API de INEGI (BIE) y la devuelve en un diccionario.
+        Busca establecimientos alrededor de un punto (endpoint Buscar).
 
         Args:
-            serie_id (str | list): El ID de la serie o una lista de IDs de series a consultar desde la API de Banxico. 
-                                Si se proporciona un solo ID, puede ser una cadena de texto (str).
+            condition (str, optional): Palabra o frase a buscar en el nombre, razon social, calle o actividad. 'todos' devuelve todos
+                                los establecimientos. Por defecto es 'todos'.
+            latitude (float): Latitud del punto.
+            longitude (float): Longitud del punto.
+            meters (int, optional): Radio de busqueda en metros, hasta 5000. Por defecto es 250.
 
         Returns:
-            dict: Un diccionario con informacion de la serie
-                            
-        Raises:
-            Exception: Si la solicitud a la API de Banxico falla, devuelve un mensaje con el código de error y la respuesta.
+            pandas.DataFrame: Un establecimiento por fila.
 
         Example:
-            Obtener la metadata de una serie:
-            >>> serie_info = get_metadata('736183')
-
+            >>> df = denue_api.search('restaurantes', 19.4326, -99.1332, meters=500)
         """
 
-        # Definir url de API y realizar la solicitud
-        endpoint = self._set_params(serie_id, last_data=False)
-        data_json = self._make_request(endpoint=endpoint)
+        if latitude is None or longitude is None:
+            raise ValueError("Se deben proporcionar la latitud y la longitud del punto de busqueda.")
+        if not isinstance(meters, int) or not 1 <= meters <= 5000:
+            raise ValueError("meters debe ser un entero entre 1 y 5000.")
 
-        # Inicializar un diccionario vacío para almacenar los metadatos
-        series_dict = {}
+        endpoint = self._path('Buscar', condition, f"{float(latitude)},{float(longitude)}", meters)
+        return self._learn_codes(build_table([self._fetch_page(endpoint)]))
 
-        # Extraer y convertir datos
-        data_json = self._make_request(endpoint=endpoint)
 
-        for serie_data in data_json['Series']:
-        
-            # Extraer metadatos
-            serie_id = serie_data['INDICADOR']
-            freq = int(serie_data['FREQ'])
-            unit = int(serie_data['UNIT'])
+    def search_by_state(self, condition:str='todos', state:str='00', max_workers:int=8, limit:int=None) -> pd.DataFrame:
+        """
+        Busca establecimientos en una entidad federativa por palabra clave (endpoint BuscarEntidad). Los rangos de
+        registros se descargan en paralelo.
 
-            # Tranforma las unidades de medida y freciuencia de actualizacion para que sea mas legible
-            freq_str = self._freq_handler(freq)
-            unit_str = self._unit_handler(unit)
+        Args:
+            condition (str, optional): Palabra o frase a buscar. 'todos' devuelve todos los establecimientos. Por defecto es 'todos'.
+            state (str, optional): Clave de la entidad a dos digitos; '00' para todo el pais. Por defecto es '00'.
+            max_workers (int, optional): Numero de paginas que se descargan a la vez. Por defecto es 8.
+            limit (int, optional): Numero maximo de establecimientos. Por defecto todos.
 
-            # Se crea el diccionario con la metadata de la serie
-            series_dict[serie_id] = {'periodicidad': freq_str, 'unidad': unit_str}
-        
-        return series_dict
+        Returns:
+            pandas.DataFrame: Un establecimiento por fila.
 
+        Example:
+            >>> df = denue_api.search_by_state('farmacia', state='14')
+        """
 
-    # Función para obtener los datos de una serie desde la API de INEGI
-    def get_data(self, serie_id:str | list, last_data:bool=False) -> pd.DataFrame:
+        state = str(state).zfill(2)
+        return self._fetch_ranges(lambda first, last: self._path('BuscarEntidad', condition, state, first, last), max_workers, limit)
+
+
+    def search_by_area_activity(self, state:str='0', municipality:str='0', locality:str='0', ageb:str='0', block:str='0', sector:str='0', subsector:str='0', branch:str='0', activity_class:str='0', name:str='0', establishment_id:str='0', max_workers:int=8, limit:int=None) -> pd.DataFrame:
         """
-        Obtiene datos de series económicas y estadísticas desde la API de INEGI (BIE) y los devuelve en un DataFrame de pandas.
+        Busca establecimientos por area geografica y actividad economica SCIAN (endpoint BuscarAreaAct). Los rangos de
+        registros se descargan en paralelo. Un valor '0' en cualquier filtro significa sin filtro.
 
         Args:
-            serie_id (str | list): El ID de la serie o una lista de IDs de series a consultar desde la API de Banxico. 
-                                Si se proporciona un solo ID, puede ser una cadena de texto (str).
-            last_data (bool, optional): Si se establece en True, obtendrá solo las últimas observaciones disponibles de la serie.
-                                    Por defecto es False.
+            state (str, optional): Clave de la entidad.
+            municipality (str, optional): Clave del municipio.
+            locality (str, optional): Clave de la localidad.
+            ageb (str, optional): Clave del AGEB.
+            block (str, optional): Clave de la manzana.
+            sector (str, optional): Sector SCIAN (2 digitos).
+            subsector (str, optional): Subsector SCIAN (3 digitos).
+            branch (str, optional): Rama SCIAN (4 digitos).
+            activity_class (str, optional): Clase SCIAN (6 digitos).
+            name (str, optional): Nombre o razon social del establecimiento.
+            establishment_id (str, optional): Identificador del establecimiento.
+            max_workers (int, optional): Numero de paginas que se descargan a la vez. Por defecto es 8.
+            limit (int, optional): Numero maximo de establecimientos. Por defecto todos.
 
         Returns:
-            pandas.DataFrame: Un DataFrame con las series obtenidas. Las columnas representan las series, y las filas 
-                            corresponden a las fechas de observación.
-            dict: Un diccionario con informacion de la serie
-                            
-        Raises:
-            Exception: Si la solicitud a la API de Banxico falla, devuelve un mensaje con el código de error y la respuesta.
+            pandas.DataFrame: Un establecimiento por fila.
 
         Example:
-            Obtener la última observación de varias series:
-            >>> df, dict = get_BIE_data(['736183','628208'],last_data=True)
-
+            Todo el comercio al por menor de la Ciudad de Mexico:
+            >>> df = denue_api.search_by_area_activity(state='09', sector='46')
         """
 
-        # Definir url de API y realizar la solicitud
-        endpoint = self._set_params(serie_id, last_data)
-        data_json = self._make_request(endpoint=endpoint)
+        filters = (state, municipality, locality, ageb, block, sector, subsector, branch, activity_class, name)
+        return self._fetch_ranges(lambda first, last: self._path('BuscarAreaAct', *filters, first, last, establishment_id), max_workers, limit)
 
-        # Inicializar un DataFrame vacío para almacenar los datos
-        series_df = pd.DataFrame()
 
-        for serie_data in data_json['Series']:
-        
-            # Extraer metadatos
-            serie_id = serie_data['INDICADOR']
-            freq = int(serie_data['FREQ'])
+    def count(self, activity:str | list='0', area:str | list='0', stratum:str='0') -> pd.DataFrame:
+        """
+        Cuenta los establecimientos por actividad economica y area geografica (endpoint Cuantificar).
+
+        Args:
+            activity (str | list, optional): Codigos SCIAN (2 a 6 digitos); '0' para todas las actividades. Por defecto es '0'.
+            area (str | list, optional): Claves de entidad (2 digitos) o de entidad y municipio (5 digitos); '0' para todo el pais.
+            stratum (str, optional): Estrato de personal ocupado, del '1' (0 a 5 personas) al '7' (251 y más personas); '0'
+                                para todos. Por defecto es '0'.
 
-            # Extraer datos de la serie
-            obs = serie_data['OBSERVATIONS']
+        Returns:
+            pandas.DataFrame: Una fila por combinacion de actividad y area, con los codigos como categorias y el total como
+                            entero. La columna 'Actividad' describe las clases SCIAN que ya aparecieron en alguna busqueda
+                            y, si se filtra por estrato, la columna 'Estrato' lo describe.
+
+        Example:
+            >>> df = denue_api.count(['46', '72'], ['09', '14'])
+        """
 
-            # Extraer los valores y las fechas
-            obs_values = [float(entry['OBS_VALUE']) for entry in obs]
-            time_periods = [entry['TIME_PERIOD'] for entry in obs]
+        stratum = str(stratum)
+        if stratum != '0' and stratum not in DENUE_STRATA:
+            raise ValueError(f"stratum debe ser '0' o uno de los siguientes valores: {', '.join(DENUE_STRATA)}")
 
-            # Transforma los periodos y frecuencia para que sea mas legible
-            time_periods_formatted = self._transform_time_periods(time_periods, freq)
+        activity = ','.join(activity) if isinstance(activity, list) else activity
+        area = ','.join(area) if isinstance(area, list) else area
 
-            # Crear una serie de pandas con los datos obtenidos
-            serie = pd.Series(obs_values, index=time_periods_formatted, name=serie_id)
+        df = build_table([_parse_page(_records(self._make_request(self._path('Cuantificar', activity, area, stratum))))])
+        for column in df.columns:
+            if column.lower() == 'total':
+                df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+            elif df[column].dtype == object:
+                df[column] = pd.Categorical(df[column])
 
-            # Agregar la serie al DataFrame
-            series_df = pd.concat([series_df, serie], axis=1, join='outer')
-        
-        
-        # Ordenar el DataFrame por fecha
-        series_df = series_df.sort_index()
-        
-        return series_df
+        # Descripciones del catalogo compartido; se resuelven una vez por codigo distinto
+        if 'AE' in df.columns:
+            descriptions = {code: self.code_lists.lookup('SCIAN', code) for code in df['AE'].cat.categories}
+            df['Actividad'] = pd.Categorical(df['AE'].astype(object).map(descriptions))
+        if stratum != '0' and not df.empty:
+            df['Estrato'] = pd.Categorical([self.code_lists.lookup('ESTRATO', stratum)] * len(df))
 
+        return df
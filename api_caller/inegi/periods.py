@@ -0,0 +1,193 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+from __future__ import annotations
+
+from .._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# Constantes -----------------------------------------------------------------------------------
+
+# Codigo CL_FREQ del BIE: (descripcion, frecuencia de pandas, meses por periodo, dias por periodo, periodos por mes).
+# Las frecuencias de uno o mas meses se definen por 'meses por periodo'; las menores a un mes por sus dias
+FREQUENCIES = {
+    1: ('Decenal (10 años)', '10Y', 120, None, None),
+    2: ('Quinquenal', '5Y', 60, None, None),
+    3: ('Anual', 'Y', 12, None, None),
+    4: ('Semestral', '6M', 6, None, None),
+    5: ('Cuatrimestral', '4M', 4, None, None),
+    6: ('Trimestral', 'Q', 3, None, None),
+    7: ('Bimestral', '2M', 2, None, None),
+    8: ('Mensual', 'M', 1, None, None),
+    9: ('Quincenal', 'D', None, 15, 2),
+    10: ('Decenal (10 dias)', 'D', None, 10, 3),
+    11: ('Semanal', 'W', None, 7, None),
+    12: ('Diaria', 'D', None, 1, None),
+    13: ('Irregular', 'D', None, 1, None),
+}
+
+# Fecha que representa cada periodo: el primer dia de su ultimo mes (como los trimestres de Banxico, que se desplazan
+# dos meses), su inicio o su ultimo dia (fin de mes en las frecuencias mensuales o menores)
+PERIOD_ALIGNMENTS = ('last_month', 'start', 'end')
+
+# Funciones ------------------------------------------------------------------------------------
+
+def _table(column:int, default:int=0) -> np.ndarray:
+    # Columna de FREQUENCIES como arreglo indexado por el codigo, para consultarla de forma vectorizada
+    table = np.full(max(FREQUENCIES) + 1, default, dtype='int64')
+    for code, row in FREQUENCIES.items():
+        if row[column] is not None:
+            table[code] = row[column]
+    return table
+
+
+def _weekday_of_december_31(years:np.ndarray) -> np.ndarray:
+    # Dia de la semana del 31 de diciembre (0 es domingo y 4 es jueves)
+    return (years + years // 4 - years // 100 + years // 400) % 7
+
+
+def _to_int(parts:pd.Series) -> np.ndarray:
+    return pd.to_numeric(parts, errors='coerce').fillna(0).astype('int64').to_numpy()
+
+
+def parse_periods(time_periods, frequency_id, how:str='last_month') -> pd.DatetimeIndex:
+    """
+    Convierte los periodos del BIE ('2020', '2020/03', '2020/03/2', '31/03/2020') a fechas de forma vectorizada, de
+    acuerdo con el codigo CL_FREQ de cada periodo. Los periodos de una misma lista pueden tener frecuencias distintas,
+    por lo que las series de una consulta se convierten en una sola pasada.
+
+    Los periodos 'YYYY/NN' se interpretan segun la frecuencia: semestres, cuatrimestres, trimestres, bimestres o meses
+    del año, quincenas (1 a 24), decenas (1 a 36) o semanas ISO. En 'YYYY/MM/N' las quincenas y decenas se cuentan
+    dentro del mes.
+
+    Args:
+        time_periods: Los periodos en texto (TIME_PERIOD).
+        frequency_id (int | list): El codigo CL_FREQ de todos los periodos o de cada uno.
+        how (str, optional): 'last_month' devuelve el primer dia del ultimo mes de cada periodo (el primer trimestre
+                            de 2020 es 2020-03-01), 'start' la fecha de inicio y 'end' el ultimo dia (fin de mes en las
+                            series mensuales o de menor frecuencia). En los periodos menores a un mes 'last_month'
+                            equivale a 'start'. Por defecto es 'last_month'.
+
+    Returns:
+        pandas.DatetimeIndex: La fecha de cada periodo.
+
+    Raises:
+        ValueError: Si la frecuencia no existe en CL_FREQ o algun periodo no es valido para su frecuencia.
+
+    Example:
+        >>> parse_periods(['2020/01', '2020/04'], 6)
+        DatetimeIndex(['2020-03-01', '2020-12-01'], dtype='datetime64[ns]', freq=None)
+        >>> parse_periods(['2020/01', '2020/04'], 6, how='start')
+        DatetimeIndex(['2020-01-01', '2020-10-01'], dtype='datetime64[ns]', freq=None)
+        >>> parse_periods(['2020/01', '2020/02'], 8, how='end')
+        DatetimeIndex(['2020-01-31', '2020-02-29'], dtype='datetime64[ns]', freq=None)
+    """
+
+    if how not in PERIOD_ALIGNMENTS:
+        raise ValueError(f"how debe ser uno de {PERIOD_ALIGNMENTS}.")
+
+    periods = pd.Series(pd.Index(time_periods, dtype=object).astype(str).str.strip())
+    if periods.empty:
+        return pd.DatetimeIndex([])
+
+    codes = np.broadcast_to(np.asarray(frequency_id, dtype='int64'), (len(periods),))
+    unknown = ~np.isin(codes, list(FREQUENCIES))
+    if unknown.any():
+        raise ValueError(f"Frecuencias no soportadas: {sorted(set(codes[unknown].tolist()))}. Los codigos CL_FREQ validos son del 1 al 13.")
+
+    months_per_period = _table(2)[codes]
+    days_per_period = _table(3, default=1)[codes]
+    periods_per_month = _table(4)[codes]
+    weekly = codes == 11
+
+    parts = periods.str.split('/', expand=True).reindex(columns=range(3))
+    n_parts = parts.notna().sum(axis=1).to_numpy()
+    first, second, third = (_to_int(parts[column]) for column in range(3))
+    year_first = parts[0].str.len().to_numpy() == 4
+
+    # 'YYYY': el inicio del año
+    years = first.copy()
+    months = np.ones(len(periods), dtype='int64')
+    days = np.ones(len(periods), dtype='int64')
+
+    # 'YYYY/NN': el numero del periodo dentro del año
+    numbered = n_parts == 2
+    by_month = numbered & (months_per_period > 0)
+    months[by_month] = (second[by_month] - 1) * months_per_period[by_month] + 1
+    within_month = numbered & (periods_per_month > 0)
+    index = second[within_month] - 1
+    months[within_month] = index // periods_per_month[within_month] + 1
+    days[within_month] = index % periods_per_month[within_month] * days_per_period[within_month] + 1
+    plain = numbered & (months_per_period == 0) & (periods_per_month == 0) & ~weekly
+    months[plain] = second[plain]
+
+    # 'YYYY/MM/DD' o 'DD/MM/YYYY'. En quincenas y decenas 'YYYY/MM/N' es el numero del periodo dentro del mes
+    dated = n_parts == 3
+    months[dated] = second[dated]
+    years[dated & ~year_first] = third[dated & ~year_first]
+    days[dated] = np.where(year_first[dated], third[dated], first[dated])
+    counted = dated & year_first & (periods_per_month > 0) & (third <= periods_per_month)
+    days[counted] = (third[counted] - 1) * days_per_period[counted] + 1
+
+    starts = pd.to_datetime({'year': years, 'month': months, 'day': days}, errors='coerce').to_numpy(dtype='datetime64[D]')
+
+    # 'YYYY/WW': las semanas ISO inician en lunes; la semana 1 es la que contiene el 4 de enero
+    iso_weeks = numbered & weekly
+    if iso_weeks.any():
+        january_4 = (years[iso_weeks] - 1970).astype('datetime64[Y]').astype('datetime64[D]') + 3
+        monday = january_4 - (january_4.astype('int64') + 3) % 7
+        starts[iso_weeks] = monday + (second[iso_weeks] - 1) * 7
+
+        # Un año tiene 53 semanas ISO si termina en jueves, o si el año anterior termino en miercoles
+        weeks_in_year = 52 + ((_weekday_of_december_31(years[iso_weeks]) == 4) | (_weekday_of_december_31(years[iso_weeks] - 1) == 3))
+        out_of_range = (second[iso_weeks] < 1) | (second[iso_weeks] > weeks_in_year)
+        starts[np.flatnonzero(iso_weeks)[out_of_range]] = np.datetime64('NaT')
+
+    invalid = np.isnat(starts) | (n_parts > 3)
+    if invalid.any():
+        examples = ', '.join(f"'{period}' (CL_FREQ {code})" for period, code in zip(periods[invalid][:5], codes[invalid][:5]))
+        raise ValueError(f"Periodos no validos para su frecuencia: {examples}.")
+
+    if how == 'start':
+        return pd.DatetimeIndex(starts.astype('datetime64[ns]'))
+
+    by_months = months_per_period > 0
+    if how == 'last_month':
+        dates = starts.copy()
+        dates[by_months] = (starts[by_months].astype('datetime64[M]') + months_per_period[by_months] - 1).astype('datetime64[D]')
+        return pd.DatetimeIndex(dates.astype('datetime64[ns]'))
+
+    # Ultimo dia de cada periodo: antes del inicio del siguiente, o fin de mes en la ultima quincena o decena del mes
+    ends = starts + (days_per_period - 1)
+    ends[by_months] = (starts[by_months].astype('datetime64[M]') + months_per_period[by_months]).astype('datetime64[D]') - 1
+    last_in_month = (periods_per_month > 0) & ((days - 1) // np.maximum(days_per_period, 1) >= periods_per_month - 1)
+    ends[last_in_month] = (starts[last_in_month].astype('datetime64[M]') + 1).astype('datetime64[D]') - 1
+
+    return pd.DatetimeIndex(ends.astype('datetime64[ns]'))
+
+
+def period_index(time_periods, frequency_id:int) -> pd.PeriodIndex:
+    """
+    Convierte los periodos de una serie del BIE a un PeriodIndex con la frecuencia de pandas equivalente al codigo
+    CL_FREQ. Las quincenas, decenas y frecuencias irregulares no tienen equivalente en pandas y se representan con el
+    dia de inicio de cada periodo.
+
+    Args:
+        time_periods: Los periodos en texto (TIME_PERIOD).
+        frequency_id (int): El codigo CL_FREQ de la serie.
+
+    Returns:
+        pandas.PeriodIndex: Los periodos de la serie.
+
+    Example:
+        >>> period_index(['2020/01', '2020/02'], 6)
+        PeriodIndex(['2020Q1', '2020Q2'], dtype='period[Q-DEC]')
+    """
+
+    frequency_id = int(frequency_id)
+    if frequency_id not in FREQUENCIES:
+        raise ValueError(f"Frecuencia no soportada: {frequency_id}. Los codigos CL_FREQ validos son del 1 al 13.")
+
+    return pd.PeriodIndex(parse_periods(time_periods, frequency_id, how='start'), freq=FREQUENCIES[frequency_id][1])
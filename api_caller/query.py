@@ -0,0 +1,210 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+from __future__ import annotations
+
+import inspect
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .baseapi.columnar import ColumnarSeries, SeriesHeader
+from .baseapi.frames import build_frame
+from ._lazy import LazyModule
+
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+pd = LazyModule('pandas')
+
+# Constantes -----------------------------------------------------------------------------------
+
+# Conector de cada proveedor como (modulo, clase). Solo se importan los proveedores que aparecen en una consulta
+PROVIDERS = {
+    'banxico': ('api_caller.banxico.sie', 'Banxico_SIE'),
+    'fred': ('api_caller.fed.fed', 'Fred'),
+    'inegi': ('api_caller.inegi.bie', 'INEGI_BIE'),
+    'bis': ('api_caller.bis.bis', 'BIS_SDMX'),
+    'worldbank': ('api_caller.wrldbank.wrldbank', 'WorldBank'),
+}
+
+# Proveedores cuya API no requiere clave
+KEYLESS_PROVIDERS = {'bis', 'worldbank'}
+
+# Separador entre el proveedor y el ID de la serie, por ejemplo 'banxico:SF43718'
+SEPARATOR = ':'
+
+# Funciones ------------------------------------------------------------------------------------
+
+def _split(qualified_id:str) -> tuple:
+    # Separa 'proveedor:ID' en (proveedor, ID), con el proveedor en minusculas
+    provider, separator, serie_id = qualified_id.partition(SEPARATOR)
+    provider, serie_id = provider.strip().lower(), serie_id.strip()
+    if not separator or not provider or not serie_id:
+        raise ValueError(f"El ID '{qualified_id}' debe tener el formato 'proveedor:ID', por ejemplo 'banxico:SF43718'.")
+    return provider, serie_id
+
+# Clase ----------------------------------------------------------------------------------------
+
+class QueryPlanner:
+    """
+    Consulta en un solo paso series de varios proveedores, identificadas como 'proveedor:ID'. Las series se agrupan
+    por proveedor, cada proveedor recibe una sola llamada a get_series_data (que ya agrupa las series en lotes cuando
+    la API lo permite) y las llamadas de los distintos proveedores se ejecutan de forma concurrente, por lo que la
+    latencia total es la del proveedor mas lento y no la suma de todos. El resultado es un solo DataFrame alineado
+    sobre la union de las fechas, con una columna por serie en el orden solicitado.
+
+    Los conectores se crean la primera vez que se necesitan, con la clave de 'api_keys', y se reutilizan en las
+    consultas siguientes. Tambien se pueden pasar conectores ya creados en 'connectors'.
+
+    Args:
+        api_keys (dict, optional): Claves de las APIs por proveedor, por ejemplo {'banxico': token, 'fred': key}.
+        connectors (dict, optional): Conectores ya creados por proveedor. Tienen prioridad sobre 'api_keys'.
+        max_workers (int, optional): Numero maximo de proveedores consultados a la vez. Por defecto todos.
+        **connector_kwargs: Argumentos adicionales para crear los conectores (cache, rate_limiter, etc.).
+
+    Example:
+        >>> planner = QueryPlanner(api_keys={'banxico': banxico_token, 'fred': fred_key, 'inegi': inegi_token})
+        >>> df = planner.get_series_data(['banxico:SF43718', 'fred:GDP', 'inegi:736183'], start_date='2020-01-01')
+
+        Las series del Banco Mundial se identifican con el pais y el indicador, y no requieren clave:
+        >>> df = planner.get_series_data(['banxico:SF43718', 'worldbank:MEX/NY.GDP.MKTP.CD'], start_date='2000-01-01')
+    """
+
+    def __init__(self, api_keys:dict=None, connectors:dict=None, max_workers:int=None, **connector_kwargs):
+        self.api_keys = dict(api_keys or {})
+        self.connectors = dict(connectors or {})
+        self.max_workers = max_workers
+        self.connector_kwargs = connector_kwargs
+        self._lock = threading.Lock()
+
+    def connector(self, provider:str):
+        """
+        Devuelve el conector de un proveedor, creandolo la primera vez.
+        """
+        with self._lock:
+            if provider in self.connectors:
+                return self.connectors[provider]
+
+            if provider not in PROVIDERS:
+                raise ValueError(f"Proveedor desconocido: '{provider}'. Los proveedores disponibles son: {', '.join(sorted(PROVIDERS))}.")
+            if provider not in self.api_keys and provider not in KEYLESS_PROVIDERS:
+                raise ValueError(f"No se proporciono la clave de la API del proveedor '{provider}'.")
+
+            module_name, class_name = PROVIDERS[provider]
+            connector_class = getattr(importlib.import_module(module_name), class_name)
+            connector = connector_class(self.api_keys.get(provider), **self.connector_kwargs)
+            self.connectors[provider] = connector
+            return connector
+
+    def plan(self, series_ids:str | list) -> dict:
+        """
+        Agrupa los IDs calificados por proveedor, sin duplicados y conservando el orden en que aparecen.
+
+        Args:
+            series_ids (str | list): Un ID calificado ('banxico:SF43718') o una lista de ellos.
+
+        Returns:
+            dict: Diccionario {proveedor: [IDs de las series]}.
+
+        Example:
+            >>> planner.plan(['banxico:SF43718', 'fred:GDP', 'banxico:SF61745'])
+            {'banxico': ['SF43718', 'SF61745'], 'fred': ['GDP']}
+        """
+
+        if isinstance(series_ids, str):
+            series_ids = [series_ids]
+        elif not (isinstance(series_ids, list) and all(isinstance(i, str) for i in series_ids)):
+            raise ValueError("'series_ids' debe ser una cadena de texto o una lista de cadenas de texto.")
+
+        plan = {}
+        for provider, serie_id in map(_split, series_ids):
+            ids = plan.setdefault(provider, [])
+            if serie_id not in ids:
+                ids.append(serie_id)
+
+        unknown = [provider for provider in plan if provider not in PROVIDERS and provider not in self.connectors]
+        if unknown:
+            raise ValueError(f"Proveedores desconocidos: {', '.join(unknown)}. Los proveedores disponibles son: {', '.join(sorted(PROVIDERS))}.")
+
+        return plan
+
+    def _fetch_provider(self, provider:str, serie_ids:list, start_date, end_date) -> list:
+        # Una sola llamada por proveedor. Devuelve ColumnarSeries nombradas con el ID calificado
+        connector = self.connector(provider)
+        parameters = inspect.signature(connector.get_series_data).parameters
+
+        # Solo se pasan las fechas indicadas, para que cada conector use sus propios valores por defecto
+        kwargs = {}
+        if 'start_date' in parameters:
+            kwargs = {key: value for key, value in (('start_date', start_date), ('end_date', end_date)) if value is not None}
+
+        if 'columnar' in parameters:
+            fetched = {serie.name: serie for serie in connector.get_series_data(serie_ids, columnar=True, **kwargs)}
+        else:
+            df = connector.get_series_data(serie_ids, **kwargs)
+            fetched = {id: ColumnarSeries.from_index(id, df.index, df[id].to_numpy(dtype='float64'), provider=provider) for id in serie_ids if id in df.columns}
+
+        series_list = []
+        for id in serie_ids:
+            serie = fetched.get(id)
+            if serie is None:
+                serie = ColumnarSeries.from_index(id, [], [], provider=provider)
+            elif 'start_date' not in parameters:
+                # El conector no filtra por fechas (INEGI_BIE), por lo que el rango se aplica aqui
+                serie = serie.between(start_date, end_date)
+
+            # Se cambia solo el encabezado; las fechas y los valores se comparten con la serie original
+            header = serie.header
+            qualified = SeriesHeader(f"{provider}{SEPARATOR}{id}", provider=provider, freq=header.freq, title=header.title, unit=header.unit)
+            series_list.append(ColumnarSeries(qualified, serie.dates, serie.values))
+
+        return series_list
+
+    def execute(self, plan:dict, start_date:str=None, end_date:str=None) -> dict:
+        """
+        Ejecuta un plan de consulta, un proveedor por hilo.
+
+        Args:
+            plan (dict): Diccionario {proveedor: [IDs]}, como el que devuelve plan().
+            start_date (str, optional): Fecha de inicio en formato 'YYYY-MM-DD'.
+            end_date (str, optional): Fecha de fin en formato 'YYYY-MM-DD'. Por defecto es la fecha actual.
+
+        Returns:
+            dict: Diccionario {ID calificado: ColumnarSeries}.
+        """
+
+        if not plan:
+            return {}
+
+        # Los conectores se crean antes de lanzar los hilos para que un error de configuracion se reporte de inmediato
+        for provider in plan:
+            self.connector(provider)
+
+        max_workers = min(len(plan), self.max_workers or len(plan))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._fetch_provider, provider, serie_ids, start_date, end_date) for provider, serie_ids in plan.items()]
+            return {serie.name: serie for future in futures for serie in future.result()}
+
+    def get_series_data(self, series_ids:str | list, start_date:str=None, end_date:str=None, columnar:bool=False) -> pd.DataFrame | list:
+        """
+        Obtiene series de varios proveedores en una sola consulta y las alinea en un DataFrame.
+
+        Args:
+            series_ids (str | list): IDs calificados como 'proveedor:ID', por ejemplo ['banxico:SF43718', 'fred:GDP'].
+            start_date (str, optional): Fecha de inicio en formato 'YYYY-MM-DD'. Por defecto cada proveedor devuelve la serie completa.
+            end_date (str, optional): Fecha de fin en formato 'YYYY-MM-DD'. Por defecto es la fecha actual.
+            columnar (bool, optional): Si es True devuelve una lista de ColumnarSeries en lugar de un DataFrame.
+
+        Returns:
+            pandas.DataFrame | list: Una columna por serie, nombrada con su ID calificado y en el orden solicitado.
+
+        Example:
+            >>> df = planner.get_series_data(['banxico:SF43718', 'fred:DEXMXUS', 'inegi:736183'], start_date='2020-01-01')
+        """
+
+        plan = self.plan(series_ids)
+        fetched = self.execute(plan, start_date, end_date)
+
+        # Las columnas siguen el orden de la solicitud, no el de los proveedores
+        order = dict.fromkeys(SEPARATOR.join(_split(qualified_id)) for qualified_id in ([series_ids] if isinstance(series_ids, str) else series_ids))
+        series_list = [fetched[qualified_id] for qualified_id in order]
+
+        return series_list if columnar else build_frame(series_list)
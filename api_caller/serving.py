@@ -0,0 +1,248 @@
+# Librerias necesarias -------------------------------------------------------------------------
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from .baseapi.singleflight import SingleFlight
+
+# Clases ---------------------------------------------------------------------------------------
+
+class _Entry:
+    # Resultado guardado de una llamada: el valor, cuando se obtuvo y el estado de su actualizacion en segundo plano
+    __slots__ = ('value', 'fetched_at', 'loaded', 'refreshing', 'error')
+
+    def __init__(self, value):
+        self.value = value
+        self.fetched_at = time.time()
+        self.loaded = time.monotonic()
+        self.refreshing = False
+        self.error = None
+
+
+class ServedResult:
+    """
+    Resultado de StaleWhileRevalidate con su informacion de frescura.
+
+    Attributes:
+        value: El resultado de la llamada al conector (por ejemplo un DataFrame). Es el mismo objeto para todas las
+            llamadas que lo reciben, por lo que no debe modificarse.
+        fetched_at (datetime): Momento en que se obtuvo de la API, en UTC.
+        age (float): Segundos desde que se obtuvo.
+        is_stale (bool): True si ya paso 'refresh_after' y se entrego mientras se actualiza en segundo plano.
+        refreshing (bool): True si hay una actualizacion en curso.
+        error (str): El error de la ultima actualizacion en segundo plano, si fallo.
+    """
+
+    __slots__ = ('value', 'fetched_at', 'age', 'is_stale', 'refreshing', 'error')
+
+    def __init__(self, entry:_Entry, is_stale:bool):
+        self.value = entry.value
+        self.fetched_at = datetime.fromtimestamp(entry.fetched_at, tz=timezone.utc)
+        self.age = time.monotonic() - entry.loaded
+        self.is_stale = is_stale
+        self.refreshing = entry.refreshing
+        self.error = entry.error
+
+    def __repr__(self):
+        return f"ServedResult(fetched_at={self.fetched_at.isoformat()!r}, age={self.age:.1f}s, is_stale={self.is_stale})"
+
+
+class StaleWhileRevalidate:
+    """
+    Modo de servicio para tableros sobre cualquier conector. Cada llamada se guarda en memoria con el momento en que se
+    obtuvo y se resuelve asi:
+
+    - Si el resultado tiene menos de 'refresh_after' segundos, se devuelve de inmediato.
+    - Si es mas antiguo pero esta dentro del presupuesto de 'max_staleness' segundos adicionales, tambien se devuelve
+      de inmediato, marcado como viejo, y se lanza una sola actualizacion en segundo plano para la siguiente llamada.
+    - Si no hay resultado o ya excedio el presupuesto, la llamada espera a la API. Las llamadas simultaneas con los
+      mismos argumentos comparten una sola consulta.
+
+    Si la actualizacion en segundo plano falla, se registra el error y se sigue entregando el ultimo resultado mientras
+    este dentro del presupuesto. Las llamadas se identifican por metodo y argumentos, y se guardan como maximo
+    'max_entries' resultados (se descartan los menos usados).
+
+    Args:
+        connector: El conector (Banxico_SIE, Fred, INEGI_BIE, QueryPlanner, etc.). Sus metodos deben ser sincronos.
+        refresh_after (float, optional): Segundos durante los que un resultado se considera fresco. Por defecto es 60.
+        max_staleness (float, optional): Segundos adicionales durante los que un resultado viejo se entrega mientras se
+                                    actualiza. Por defecto es una hora.
+        max_entries (int, optional): Numero maximo de resultados guardados. Por defecto es 256.
+        max_workers (int, optional): Numero de actualizaciones simultaneas en segundo plano. Por defecto es 4.
+
+    Example:
+        >>> banxico = StaleWhileRevalidate(Banxico_SIE(token), refresh_after=300)
+        >>> served = banxico.get_series_data(['SF43718', 'SF61745'], last_data=True)
+        >>> served.value, served.fetched_at, served.is_stale
+    """
+
+    def __init__(self, connector, refresh_after:float=60, max_staleness:float=3600, max_entries:int=256, max_workers:int=4):
+        if refresh_after < 0 or max_staleness < 0:
+            raise ValueError("refresh_after y max_staleness deben ser mayores o iguales a 0.")
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("max_entries debe ser un entero mayor o igual a 1.")
+        if not isinstance(max_workers, int) or max_workers < 1:
+            raise ValueError("max_workers debe ser un entero mayor o igual a 1.")
+
+        self.connector = connector
+        self.refresh_after = refresh_after
+        self.max_staleness = max_staleness
+        self.max_entries = max_entries
+        self.max_workers = max_workers
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._single_flight = SingleFlight()
+        self._executor = None
+
+        # Generaciones de los resultados: invalidate las incrementa para que las consultas que ya estaban en vuelo no
+        # vuelvan a guardar un resultado eliminado
+        self._epoch = 0
+        self._generations = {}
+        self._stats = {'fresh': 0, 'stale': 0, 'misses': 0, 'refreshes': 0, 'refresh_errors': 0}
+
+    def _key(self, method:str, args:tuple, kwargs:dict) -> str:
+        return repr((method, args, sorted(kwargs.items())))
+
+    def _generation(self, key:str) -> tuple:
+        return self._epoch, self._generations.get(key, 0)
+
+    def _fetch(self, key:str, method:str, args:tuple, kwargs:dict) -> _Entry:
+        # Consulta la API y guarda el resultado. Las llamadas simultaneas con la misma llave y generacion comparten la
+        # consulta; despues de invalidate se inicia una nueva
+        with self._lock:
+            generation = self._generation(key)
+
+        def fetch():
+            entry = _Entry(getattr(self.connector, method)(*args, **kwargs))
+            with self._lock:
+                if self._generation(key) != generation:
+                    return entry
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return entry
+
+        entry, _ = self._single_flight.do(f"{key}#{generation}", fetch)
+        return entry
+
+    def _refresh_in_background(self, key:str, entry:_Entry, method:str, args:tuple, kwargs:dict):
+        # Solo se lanza una actualizacion por resultado, aunque lleguen muchas llamadas mientras tanto
+        with self._lock:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='api_caller_swr')
+            self._stats['refreshes'] += 1
+
+        def refresh():
+            try:
+                self._fetch(key, method, args, kwargs)
+            except Exception as refresh_err:
+                entry.error = str(refresh_err)
+                with self._lock:
+                    self._stats['refresh_errors'] += 1
+                logging.error(f"No se pudo actualizar en segundo plano {method}: {refresh_err}")
+            finally:
+                entry.refreshing = False
+
+        self._executor.submit(refresh)
+
+    def call(self, method:str, *args, **kwargs) -> ServedResult:
+        """
+        Llama a un metodo del conector con la politica stale-while-revalidate.
+
+        Args:
+            method (str): El nombre del metodo, por ejemplo 'get_series_data'.
+            *args, **kwargs: Los argumentos del metodo.
+
+        Returns:
+            ServedResult: El resultado con su informacion de frescura.
+
+        Example:
+            >>> served = fred.call('get_series_data', ['GDP', 'UNRATE'], start_date='2020-01-01')
+        """
+
+        key = self._key(method, args, kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None:
+            age = time.monotonic() - entry.loaded
+            if age <= self.refresh_after:
+                with self._lock:
+                    self._stats['fresh'] += 1
+                return ServedResult(entry, is_stale=False)
+            if age <= self.refresh_after + self.max_staleness:
+                self._refresh_in_background(key, entry, method, args, kwargs)
+                with self._lock:
+                    self._stats['stale'] += 1
+                return ServedResult(entry, is_stale=True)
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return ServedResult(self._fetch(key, method, args, kwargs), is_stale=False)
+
+    def get_series_data(self, *args, **kwargs) -> ServedResult:
+        """
+        Version stale-while-revalidate de get_series_data del conector.
+        """
+        return self.call('get_series_data', *args, **kwargs)
+
+    def get_series_metadata(self, *args, **kwargs) -> ServedResult:
+        """
+        Version stale-while-revalidate de get_series_metadata del conector.
+        """
+        return self.call('get_series_metadata', *args, **kwargs)
+
+    def refresh(self, method:str, *args, **kwargs) -> ServedResult:
+        """
+        Consulta la API de inmediato y reemplaza el resultado guardado, sin importar su antiguedad.
+        """
+        return ServedResult(self._fetch(self._key(method, args, kwargs), method, args, kwargs), is_stale=False)
+
+    def invalidate(self, method:str=None, *args, **kwargs):
+        """
+        Elimina el resultado de una llamada, o todos los resultados si no se indica el metodo. Las consultas que ya
+        estaban en vuelo no vuelven a guardar su resultado.
+        """
+        with self._lock:
+            if method is None:
+                self._entries.clear()
+                self._generations.clear()
+                self._epoch += 1
+            else:
+                key = self._key(method, args, kwargs)
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def stats(self) -> dict:
+        """
+        Devuelve el numero de llamadas respondidas con resultados frescos ('fresh') y viejos ('stale'), las que
+        esperaron a la API ('misses'), las actualizaciones lanzadas en segundo plano y las que fallaron.
+        """
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries)}
+
+    def close(self):
+        """
+        Espera a las actualizaciones en curso y detiene los hilos de segundo plano.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,6 @@
+from .._lazy import lazy_exports
+
+_EXPORTS = {'WorldBank': '.wrldbank', 'parse_periods': '.wrldbank'}
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
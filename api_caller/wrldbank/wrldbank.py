@@ -1,36 +1,257 @@
 
 # Librerias necesarias -------------------------------------------------------------------------
 
-import requests
-import pandas as pd
+from __future__ import annotations
 
 from ..baseapi.baseapi import BaseAPI
+from ..baseapi.frames import build_frame
+from ..baseapi.columnar import ColumnarSeries
 
-# Clase ---------------------------------------------------------------------------------------
+from .._lazy import LazyModule
 
-class WorldBank:
-    def __init__(self, api_key):
-        super().__init__(api_key, "https://api.worldbank.org/v2")
+# Se importan al usarse por primera vez, para que importar el paquete sea rapido
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
 
-    def get_data(self, indicator_id, country_code, start_date, end_date):
-        url = f'{self.base_url}/country/{country_code}/indicator/{indicator_id}'
-        params = {
-            'format': 'json',
-            'date': f'{start_date}:{end_date}',
-            'per_page': 100,
-            'api_key': self.api_key
+# Constantes -----------------------------------------------------------------------------------
+
+# Observaciones por pagina. Paginas mas chicas permiten descargar mas paginas en paralelo
+DEFAULT_PER_PAGE = 1000
+
+# Funciones ------------------------------------------------------------------------------------
+
+def parse_periods(periods:list) -> pd.DatetimeIndex:
+    """
+    Convierte los periodos del Banco Mundial ('2020', '2020Q1', '2020M01') a fechas de inicio de periodo, de forma
+    vectorizada. Una misma lista puede mezclar frecuencias.
+
+    Args:
+        periods (list): Los periodos en texto.
+
+    Returns:
+        pandas.DatetimeIndex: La fecha de inicio de cada periodo.
+    """
+    periods = pd.Index(periods, dtype=object).astype(str)
+    if len(periods) == 0:
+        return pd.DatetimeIndex([])
+
+    years = periods.str[:4].astype('int64')
+    kind = np.asarray(periods.str[4:5])
+    number = pd.to_numeric(periods.str[5:], errors='coerce').fillna(1).astype('int64').to_numpy()
+
+    # Los trimestres inician en los meses 1, 4, 7 y 10; los meses se toman tal cual y los años inician en enero
+    months = np.where(kind == 'Q', (number - 1) * 3 + 1, np.where(kind == 'M', number, 1))
+    return pd.DatetimeIndex(pd.to_datetime({'year': years, 'month': months, 'day': 1}))
+
+# Clase ----------------------------------------------------------------------------------------
+
+class WorldBank(BaseAPI):
+    provider = 'worldbank'
+
+    def __init__(self, api_key:str=None, **kwargs):
+        # La API de indicadores del Banco Mundial no requiere clave
+        super().__init__(api_key, "https://api.worldbank.org/v2", **kwargs)
+
+
+    def _set_indicator_params(self, start_date:str=None, end_date:str=None, last_data:bool=False, per_page:int=DEFAULT_PER_PAGE) -> dict:
+
+        if not isinstance(per_page, int) or per_page < 1:
+            raise ValueError("per_page debe ser un entero mayor o igual a 1.")
+
+        params = {'format': 'json', 'per_page': per_page}
+
+        if last_data:
+            # Validar que si last_data es True, no se proporcionen fechas de inicio y fin
+            if start_date is not None or end_date is not None:
+                raise ValueError("Si last_data es True, no se pueden proporcionar fechas de inicio y fin.")
+
+            # Ultimo valor no vacio de cada pais
+            params['mrnev'] = 1
+            return params
+
+        if start_date is not None or end_date is not None:
+            try:
+                start_year = pd.to_datetime(start_date).year if start_date is not None else 1960
+                end_year = pd.to_datetime(end_date).year if end_date is not None else pd.Timestamp.today().year
+            except ValueError:
+                raise ValueError("The provided dates must be in format 'YYYY-MM-DD'.")
+
+            if start_year > end_year:
+                raise ValueError("La fecha de inicio no puede ser mayor a la fecha de fin.")
+
+            # La API filtra por años; el rango exacto se aplica despues de convertir las fechas
+            params['date'] = f"{start_year}:{end_year}"
+
+        return params
+
+
+    def _fetch_page(self, indicator_id:str, countries:list, params:dict, page:int) -> tuple:
+
+        endpoint = f"/country/{';'.join(countries)}/indicator/{indicator_id}"
+        data_json = self._make_request(endpoint, params={**params, 'page': page})
+
+        # Los errores de la API llegan con estado 200 y un mensaje en lugar de la pagina
+        if not isinstance(data_json, list) or not data_json or 'message' in data_json[0]:
+            message = data_json[0].get('message') if isinstance(data_json, list) and data_json else data_json
+            raise ValueError(f"La API del Banco Mundial rechazo la consulta del indicador '{indicator_id}': {message}")
+
+        header = data_json[0]
+        entries = data_json[1] if len(data_json) > 1 and data_json[1] is not None else []
+
+        # Cada pagina se convierte en cuanto llega, en el hilo que la descargo, para traslapar la conversion con la red
+        return header, self._parse_page(entries)
+
+
+    def _parse_page(self, entries:list) -> dict:
+        return {
+            'indicator': np.array([entry['indicator']['id'] for entry in entries], dtype=object),
+            'country': np.array([entry['countryiso3code'] or entry['country']['id'] for entry in entries], dtype=object),
+            'country_id': np.array([entry['country']['id'] for entry in entries], dtype=object),
+            'country_name': np.array([entry['country']['value'] for entry in entries], dtype=object),
+            'date': parse_periods([entry['date'] for entry in entries]).to_numpy(),
+            'value': np.array([entry['value'] for entry in entries], dtype='float64'),
         }
 
-        response = requests.get(url, params=params)
-        data = response.json()
 
-        # Extract data and metadata
-        data_list = data[1]
-        metadata = data[0]
+    def _fetch_indicators(self, queries:dict, params:dict, max_workers:int=8) -> tuple:
+        """
+        Descarga todas las paginas de varios indicadores. Primero se pide la primera pagina de cada indicador, que trae
+        el numero total de paginas en su encabezado, y despues el resto de las paginas de todos los indicadores a la vez.
+
+        Args:
+            queries (dict): Diccionario {indicador: [codigos de pais]}.
+            params (dict): Parametros de la consulta (formato, fechas, tamaño de pagina).
+            max_workers (int, optional): Numero de hilos para descargar las paginas en paralelo.
+
+        Returns:
+            tuple: Un diccionario con las columnas de todas las observaciones y un diccionario {indicador: encabezado}.
+        """
+
+        indicators = list(queries)
+        first_pages = self._run_concurrently(lambda indicator_id: self._fetch_page(indicator_id, queries[indicator_id], params, 1), indicators, max_workers)
+
+        metadata = {indicator_id: header for indicator_id, (header, _) in zip(indicators, first_pages)}
+        remaining = [(indicator_id, page) for indicator_id, header in metadata.items() for page in range(2, int(header.get('pages') or 1) + 1)]
+        other_pages = self._run_concurrently(lambda item: self._fetch_page(item[0], queries[item[0]], params, item[1]), remaining, max_workers)
+
+        chunks = [chunk for _, chunk in first_pages + other_pages]
+        columns = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+        return columns, metadata
+
+
+    def _validate_list(self, value:str | list, name:str) -> list:
+
+        if isinstance(value, str):
+            value = [value]
+        elif not (isinstance(value, list) and value and all(isinstance(i, str) for i in value)):
+            raise ValueError(f"'{name}' debe ser una cadena de texto o una lista de cadenas de texto.")
+
+        return list(dict.fromkeys(value))
+
+
+    def get_data(self, indicator_id:str | list, country_code:str | list='all', start_date:str=None, end_date:str=None, per_page:int=DEFAULT_PER_PAGE, max_workers:int=8) -> tuple:
+        """
+        Obtiene uno o varios indicadores del Banco Mundial para uno o varios paises en formato largo (una fila por
+        indicador, pais y fecha). Todas las paginas de la respuesta se descargan en paralelo.
+
+        Args:
+            indicator_id (str | list): El ID del indicador o una lista de IDs, por ejemplo 'NY.GDP.MKTP.CD'.
+            country_code (str | list, optional): Codigo ISO2 o ISO3 del pais, una lista de codigos o 'all'. Por defecto es 'all'.
+            start_date (str, optional): Fecha de inicio en formato 'YYYY-MM-DD'. Por defecto es el inicio de la serie.
+            end_date (str, optional): Fecha de fin en formato 'YYYY-MM-DD'. Por defecto es la fecha actual.
+            per_page (int, optional): Observaciones por pagina. Por defecto es 1000.
+            max_workers (int, optional): Numero de hilos para descargar las paginas en paralelo. Por defecto es 8.
+
+        Returns:
+            pandas.DataFrame: Las observaciones con las columnas indicator, country (ISO3), country_name, date y value.
+            dict: Un diccionario {indicador: encabezado de la respuesta} con la fecha de actualizacion y el total de observaciones.
+
+        Example:
+            >>> df, metadata = worldbank_api.get_data(['NY.GDP.MKTP.CD', 'SP.POP.TOTL'], ['MEX', 'USA', 'CAN'], start_date='2000-01-01')
+        """
+
+        indicator_id = self._validate_list(indicator_id, 'indicator_id')
+        country_code = self._validate_list(country_code, 'country_code')
+        params = self._set_indicator_params(start_date, end_date, per_page=per_page)
+
+        columns, metadata = self._fetch_indicators({id: country_code for id in indicator_id}, params, max_workers)
+
+        df = pd.DataFrame({
+            'indicator': pd.Categorical(columns['indicator']),
+            'country': pd.Categorical(columns['country']),
+            'country_name': pd.Categorical(columns['country_name']),
+            'date': columns['date'],
+            'value': columns['value'],
+        })
+
+        # La API devuelve las fechas en orden descendente
+        df = df.sort_values(['indicator', 'country', 'date'], kind='stable', ignore_index=True)
+
+        # La API filtra por años, por lo que el rango exacto se aplica aqui
+        if start_date is not None:
+            df = df[df['date'] >= pd.to_datetime(start_date)]
+        if end_date is not None:
+            df = df[df['date'] <= pd.to_datetime(end_date)]
+
+        return df.reset_index(drop=True), metadata
+
+
+    def get_series_data(self, serie_id:str | list, last_data:bool=False, start_date:str=None, end_date:str=None, per_page:int=DEFAULT_PER_PAGE, max_workers:int=8, columnar:bool=False) -> pd.DataFrame | list:
+        """
+        Obtiene series del Banco Mundial, identificadas como 'PAIS/INDICADOR', y las devuelve en un DataFrame con una
+        columna por serie. Se realiza una sola consulta por indicador con todos sus paises, y las paginas se descargan
+        en paralelo.
+
+        Args:
+            serie_id (str | list): El ID de la serie o una lista de IDs, por ejemplo 'MEX/NY.GDP.MKTP.CD'. El pais puede ser
+                                un codigo ISO2 o ISO3.
+            last_data (bool, optional): Si se establece en True, obtiene solo la ultima observacion disponible de cada serie.
+            start_date (str, optional): Fecha de inicio en formato 'YYYY-MM-DD'. Por defecto es el inicio de la serie.
+            end_date (str, optional): Fecha de fin en formato 'YYYY-MM-DD'. Por defecto es la fecha actual.
+            per_page (int, optional): Observaciones por pagina. Por defecto es 1000.
+            max_workers (int, optional): Numero de hilos para descargar las paginas en paralelo. Por defecto es 8.
+            columnar (bool, optional): Si se establece en True, devuelve una lista de ColumnarSeries en lugar de un DataFrame.
+
+        Returns:
+            pandas.DataFrame | list: Las series obtenidas. Las columnas representan las series y las filas las fechas de observacion.
+
+        Example:
+            >>> df = worldbank_api.get_series_data(['MEX/NY.GDP.MKTP.CD', 'USA/NY.GDP.MKTP.CD'], start_date='2000-01-01')
+        """
+
+        serie_id = self._validate_list(serie_id, 'serie_id')
+
+        # Agrupar los paises por indicador para hacer una sola consulta por indicador
+        queries = {}
+        for id in serie_id:
+            country, separator, indicator_id = id.partition('/')
+            if not separator or not country or not indicator_id:
+                raise ValueError(f"El ID '{id}' debe tener el formato 'PAIS/INDICADOR', por ejemplo 'MEX/NY.GDP.MKTP.CD'.")
+            queries.setdefault(indicator_id, []).append(country)
+
+        params = self._set_indicator_params(start_date, end_date, last_data, per_page)
+        columns, _ = self._fetch_indicators(queries, params, max_workers)
+
+        # Posiciones de las observaciones de cada serie. La API identifica cada pais con su codigo ISO3 y su ISO2,
+        # y el pais solicitado puede venir en cualquiera de los dos
+        positions = {}
+        rows = pd.Series(np.arange(len(columns['value'])))
+        for codes in (columns['country'], columns['country_id']):
+            for key, indexer in rows.groupby([columns['indicator'], pd.Index(codes, dtype=object).str.upper()]).indices.items():
+                positions.setdefault(key, indexer)
+
+        series_list = []
+        for id in serie_id:
+            country, _, indicator_id = id.partition('/')
+            indexer = positions.get((indicator_id, country.upper()), np.array([], dtype='int64'))
+
+            # La API devuelve las fechas en orden descendente
+            indexer = indexer[np.argsort(columns['date'][indexer], kind='stable')]
+            serie = ColumnarSeries.from_index(id, columns['date'][indexer], columns['value'][indexer], provider=self.provider)
+            series_list.append(serie if last_data else serie.between(start_date, end_date))
 
-        # Convert data to dataframe
-        df = pd.DataFrame(data_list)
-        df['date'] = pd.to_datetime(df['date'])
-        df['value'] = pd.to_numeric(df['value'])
+        if columnar:
+            return series_list
 
-        return df, metadata
\ No newline at end of file
+        # Alinear todas las series sobre la union de sus fechas en un solo paso (el resultado queda ordenado por fecha)
+        return build_frame(series_list)
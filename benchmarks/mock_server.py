@@ -0,0 +1,187 @@
+"""
+Servidor HTTP local que imita las respuestas de Banxico (SIE), FRED, INEGI (BIE) y el BIS (SDMX-CSV) para los benchmarks.
+
+Las respuestas reproducen la estructura de respuestas reales y se escalan de forma sintetica al numero de
+observaciones configurado. Cada ruta empieza con el nombre del proveedor, por lo que basta con apuntar el
+'base_url' de un conector a f"{server.url}/banxico", f"{server.url}/fred", etc.
+
+Example:
+    >>> with MockServer(observations=1000) as server:
+    ...     banxico_api.base_url = f"{server.url}/banxico"
+    ...     df = banxico_api.get_series_data(['SF1', 'SF2'], start_date='1900-01-01')
+    ...     server.requests
+"""
+
+# Librerias necesarias -------------------------------------------------------------------------
+
+import re
+import json
+import zlib
+import threading
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from urllib.parse import urlsplit, parse_qs, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Constantes -----------------------------------------------------------------------------------
+
+# Fecha de la ultima observacion de todas las series sinteticas
+LAST_DATE = '2024-12-31'
+
+# Fraccion de observaciones faltantes en las series sinteticas
+MISSING_RATIO = 0.02
+
+# Payloads -------------------------------------------------------------------------------------
+
+def _observations(serie_id:str, observations:int, date_format:str, value_format:str, missing:str) -> tuple:
+    # Fechas diarias que terminan en LAST_DATE y valores deterministas por serie, con una fraccion de faltantes
+    dates = pd.date_range(end=LAST_DATE, periods=observations, freq='D').strftime(date_format).tolist()
+    rng = np.random.default_rng(zlib.crc32(serie_id.encode()))
+    values = [format(value, value_format) for value in rng.uniform(10, 20000, observations)]
+    for position in rng.choice(observations, int(observations * MISSING_RATIO), replace=False):
+        values[position] = missing
+    return dates, values
+
+
+def banxico_payload(path:str, observations:int) -> dict:
+    serie_ids = re.match(r".*/series/([^/?]+)", path).group(1).split(',')
+
+    # Sin '/datos' la ruta solicita los metadatos de las series
+    if '/datos' not in path:
+        return {'bmx': {'series': [{'idSerie': serie_id, 'titulo': f"Serie {serie_id}", 'fechaInicio': '01/01/1900', 'fechaFin': '31/12/2024', 'periodicidad': 'Diaria', 'cifra': 'Tipo de Cambio', 'unidad': 'Pesos por Dólar'} for serie_id in serie_ids]}}
+
+    series = []
+    for serie_id in serie_ids:
+        dates, values = _observations(serie_id, observations, '%d/%m/%Y', ',.4f', 'N/E')
+        series.append({'idSerie': serie_id, 'titulo': f"Serie {serie_id}", 'datos': [{'fecha': date, 'dato': value} for date, value in zip(dates, values)]})
+    return {'bmx': {'series': series}}
+
+
+def fred_payload(path:str, query:dict, observations:int) -> dict:
+    serie_id = query['series_id'][0]
+    dates, values = _observations(serie_id, observations, '%Y-%m-%d', '.3f', '.')
+    return {
+        'realtime_start': LAST_DATE, 'realtime_end': LAST_DATE, 'observation_start': dates[0], 'observation_end': dates[-1],
+        'units': 'lin', 'output_type': 1, 'file_type': 'json', 'order_by': 'observation_date', 'sort_order': 'asc',
+        'count': observations, 'offset': 0, 'limit': 100000,
+        'observations': [{'realtime_start': LAST_DATE, 'realtime_end': LAST_DATE, 'date': date, 'value': value} for date, value in zip(dates, values)],
+    }
+
+
+def inegi_payload(path:str, observations:int) -> dict:
+    serie_ids = re.search(r"/INDICATOR/([^/]+)/", path).group(1).split(',')
+    series = []
+    for serie_id in serie_ids:
+        dates, values = _observations(serie_id, observations, '%d/%m/%Y', '.6f', '')
+        series.append({
+            'INDICADOR': serie_id, 'FREQ': '12', 'TOPIC': '1', 'UNIT': '1', 'UNIT_MULT': '', 'NOTE': '', 'SOURCE': '1', 'LASTUPDATE': '01/01/2025',
+            'STATUS': None,
+            'OBSERVATIONS': [{'TIME_PERIOD': date, 'OBS_VALUE': value, 'OBS_EXCEPTION': None, 'OBS_STATUS': '3', 'OBS_SOURCE': '', 'OBS_NOTE': '', 'COBER_GEO': '00'} for date, value in zip(dates, values)],
+        })
+    return {'Header': {'Name': 'Indicadores', 'Email': ''}, 'Series': series}
+
+
+def bis_payload(path:str, observations:int) -> str:
+    # SDMX-CSV 2.0 con una dimension de frecuencia y una de serie. Como en la API REST SDMX 2.0, la clave pide varias
+    # series separandolas con ','; el operador '+' de SDMX 1.0 no se acepta
+    dataflow, key = re.search(r"/data/dataflow/[^/]+/([^/]+)/[^/]+/([^/?]+)", unquote(path)).groups()
+    freq, serie_ids = key.split('.')
+    lines = ['STRUCTURE,STRUCTURE_ID,ACTION,FREQ,SERIE,TIME_PERIOD,OBS_VALUE,UNIT_MEASURE,TITLE_TS']
+    for serie_id in serie_ids.split(','):
+        dates, values = _observations(serie_id, observations, '%Y-%m-%d', '.4f', '')
+        prefix = f"dataflow,BIS:{dataflow}(1.0),I,{freq},{serie_id}"
+        lines.extend(f"{prefix},{date},{value},XDC,Serie {serie_id}" for date, value in zip(dates, values))
+    return '\n'.join(lines)
+
+
+@lru_cache(maxsize=256)
+def render(provider:str, path:str, query:str, observations:int) -> bytes:
+    query = parse_qs(query)
+    if provider == 'banxico':
+        payload = banxico_payload(path, observations)
+    elif provider == 'fred':
+        payload = fred_payload(path, query, observations)
+    elif provider == 'inegi':
+        payload = inegi_payload(path, observations)
+    elif provider == 'bis':
+        payload = bis_payload(path, observations)
+    else:
+        raise KeyError(provider)
+    return payload.encode('utf-8') if isinstance(payload, str) else json.dumps(payload).encode('utf-8')
+
+# Servidor -------------------------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # Sin el algoritmo de Nagle, para que las conexiones persistentes no esperen el ACK retrasado del cliente
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        provider, _, path = parts.path.lstrip('/').partition('/')
+        server = self.server.mock
+
+        with server._lock:
+            server.requests += 1
+
+        try:
+            body = render(provider, f"/{path}", parts.query, server.observations)
+            status = 200
+        except (KeyError, AttributeError):
+            body, status = b'{"error": "ruta desconocida"}', 404
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/vnd.sdmx.data+csv' if provider == 'bis' else 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockServer:
+    """
+    Servidor local en un hilo de fondo. Cuenta las solicitudes recibidas y sirve series con el numero de
+    observaciones configurado en 'observations'.
+
+    Args:
+        observations (int, optional): Numero de observaciones por serie. Por defecto es 100.
+        host (str, optional): Direccion del servidor. Por defecto es '127.0.0.1'.
+        port (int, optional): Puerto del servidor. Por defecto se elige uno libre.
+    """
+
+    def __init__(self, observations:int=100, host:str='127.0.0.1', port:int=0):
+        self.observations = observations
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,287 @@
+"""
+Benchmarks de los conectores contra un servidor HTTP local (ver mock_server.py).
+
+Para cada conector, ruta de get_series_data (DataFrame, columnar, streaming) y escenario de numero de series y
+observaciones se mide la latencia de punta a punta, el tiempo de red, el tiempo de conversion (todo lo que no es
+red ni concatenacion), el tiempo de concatenacion (build_frame), la memoria pico y el numero de solicitudes.
+Los resultados se escriben en JSON para comparar versiones. En la ruta de streaming la descarga ocurre mientras se
+convierten las observaciones, por lo que su tiempo de red queda incluido en el de conversion.
+
+Uso:
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --providers banxico fred --series 1 100 --observations 1000 100000
+    python benchmarks/run_benchmarks.py --output nuevo.json --baseline bench.json
+"""
+
+# Librerias necesarias -------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import inspect
+import platform
+import argparse
+import importlib
+import statistics
+import subprocess
+import tracemalloc
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from api_caller.banxico import Banxico_SIE
+from api_caller.fed import Fred
+from api_caller.inegi import INEGI_BIE
+from api_caller.bis.bis import BIS_SDMX
+from api_caller.baseapi import MetadataRegistry
+from api_caller.baseapi import streaming
+
+from mock_server import MockServer, render
+
+# Constantes -----------------------------------------------------------------------------------
+
+# Conector, prefijo de ruta en el servidor local, modulo donde se usa build_frame y argumentos de la consulta
+CONNECTORS = {
+    'banxico': (Banxico_SIE, 'api_caller.banxico.sie', {'start_date': '1700-01-01', 'end_date': '2024-12-31'}),
+    'fred': (Fred, 'api_caller.fed.fed', {'start_date': '1700-01-01', 'end_date': '2024-12-31'}),
+    'inegi': (INEGI_BIE, 'api_caller.inegi.bie', {}),
+    'bis': (BIS_SDMX, 'api_caller.bis.bis', {'start_date': '1700-01-01', 'end_date': '2024-12-31'}),
+}
+
+# Formato de los IDs de las series sinteticas en los proveedores que no usan IDs simples
+SERIE_ID_FORMATS = {'bis': 'WS_BENCH/D.{}'}
+
+DEFAULT_SERIES = (1, 10, 100, 1000)
+DEFAULT_OBSERVATIONS = (100, 1000, 10000, 100000)
+
+# Los escenarios con mas observaciones en total (series x observaciones) se omiten por defecto
+DEFAULT_MAX_POINTS = 2_000_000
+
+# Medicion -------------------------------------------------------------------------------------
+
+class _Timings:
+    def __init__(self):
+        self.requests = []
+        self.concat = 0.0
+
+    def network(self) -> float:
+        # Union de los intervalos de red, para no contar dos veces las solicitudes concurrentes
+        total, current_start, current_end = 0.0, None, None
+        for start, end in sorted(self.requests):
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    total += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            total += current_end - current_start
+        return total
+
+
+@contextmanager
+def _instrument(connector, module_name:str, timings:_Timings):
+    # Se envuelven la sesion del conector y build_frame en el modulo del conector para medir red y concatenacion
+    module = importlib.import_module(module_name)
+    original_request, original_build_frame = connector.session.request, module.build_frame
+
+    def request(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original_request(*args, **kwargs)
+        finally:
+            timings.requests.append((start, time.perf_counter()))
+
+    def build_frame(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original_build_frame(*args, **kwargs)
+        finally:
+            timings.concat += time.perf_counter() - start
+
+    connector.session.request, module.build_frame = request, build_frame
+    try:
+        yield
+    finally:
+        connector.session.request, module.build_frame = original_request, original_build_frame
+
+
+def _make_connector(provider:str, server:MockServer):
+    connector_class = CONNECTORS[provider][0]
+    connector = connector_class('benchmark')
+
+    # Sin cache, sin limite de ritmo y con un registro de metadatos vacio para que cada corrida haga las mismas solicitudes
+    connector.base_url = f"{server.url}/{provider}"
+    connector.cache = None
+    connector.rate_limiter = None
+    connector.metadata_registry = MetadataRegistry()
+    return connector
+
+
+def _paths(connector) -> list:
+    parameters = inspect.signature(connector.get_series_data).parameters
+    paths = ['frame']
+    if 'columnar' in parameters:
+        paths.append('columnar')
+    if 'stream' in parameters and streaming.ijson is not None:
+        paths.append('stream')
+    return paths
+
+
+def _call(connector, provider:str, path:str, serie_ids:list):
+    kwargs = dict(CONNECTORS[provider][2])
+    if path == 'columnar':
+        kwargs['columnar'] = True
+    elif path == 'stream':
+        kwargs['stream'] = True
+    return connector.get_series_data(serie_ids, **kwargs)
+
+
+def run_scenario(server:MockServer, provider:str, path:str, n_series:int, n_observations:int, repeat:int) -> dict:
+    """
+    Ejecuta un escenario y devuelve sus metricas. La primera corrida calienta el servidor y no se mide.
+    """
+
+    serie_ids = [SERIE_ID_FORMATS.get(provider, '{}').format(f"SB{position:05d}") for position in range(n_series)]
+    _call(_make_connector(provider, server), provider, path, serie_ids)
+
+    latencies, networks, parses, concats, requests = [], [], [], [], []
+    for _ in range(repeat):
+        connector = _make_connector(provider, server)
+        timings = _Timings()
+        server.reset()
+
+        with _instrument(connector, CONNECTORS[provider][1], timings):
+            start = time.perf_counter()
+            _call(connector, provider, path, serie_ids)
+            latency = time.perf_counter() - start
+
+        latencies.append(latency)
+        networks.append(timings.network())
+        concats.append(timings.concat)
+        parses.append(max(0.0, latency - networks[-1] - timings.concat))
+        requests.append(server.requests)
+
+    # La memoria pico se mide en una corrida aparte, porque tracemalloc hace mas lentas las demas mediciones
+    connector = _make_connector(provider, server)
+    tracemalloc.start()
+    try:
+        result = _call(connector, provider, path, serie_ids)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    rows = len(result) if isinstance(result, pd.DataFrame) else max((len(serie) for serie in result), default=0)
+
+    return {
+        'provider': provider,
+        'path': path,
+        'series': n_series,
+        'observations': n_observations,
+        'repeat': repeat,
+        'latency_median_s': statistics.median(latencies),
+        'latency_min_s': min(latencies),
+        'network_median_s': statistics.median(networks),
+        'parse_median_s': statistics.median(parses),
+        'concat_median_s': statistics.median(concats),
+        'peak_memory_bytes': peak_memory,
+        'requests': statistics.median(requests),
+        'rows': rows,
+    }
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    try:
+        from importlib.metadata import version
+        package_version = version('api_caller')
+    except Exception:
+        package_version = None
+
+    return {
+        'timestamp': pd.Timestamp.now(tz='UTC').isoformat(),
+        'git_commit': commit,
+        'package_version': package_version,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def compare(results:list, baseline:list, threshold:float) -> list:
+    """
+    Compara la latencia mediana contra un archivo de resultados anterior y devuelve los escenarios mas lentos
+    que el umbral indicado (por ejemplo 0.1 para un 10%).
+    """
+    key = lambda row: (row['provider'], row['path'], row['series'], row['observations'])
+    previous = {key(row): row for row in baseline}
+
+    regressions = []
+    for row in results:
+        old = previous.get(key(row))
+        if old is None or old['latency_median_s'] <= 0:
+            continue
+        ratio = row['latency_median_s'] / old['latency_median_s']
+        if ratio > 1 + threshold:
+            regressions.append({**dict(zip(('provider', 'path', 'series', 'observations'), key(row))), 'ratio': ratio})
+    return regressions
+
+
+def main(argv:list=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de los conectores de api_caller contra un servidor local.")
+    parser.add_argument('--providers', nargs='+', choices=sorted(CONNECTORS), default=sorted(CONNECTORS))
+    parser.add_argument('--paths', nargs='+', choices=('frame', 'columnar', 'stream'), default=None, help="Rutas de get_series_data a medir. Por defecto todas las disponibles.")
+    parser.add_argument('--series', nargs='+', type=int, default=DEFAULT_SERIES)
+    parser.add_argument('--observations', nargs='+', type=int, default=DEFAULT_OBSERVATIONS)
+    parser.add_argument('--max-points', type=int, default=DEFAULT_MAX_POINTS, help="Omite los escenarios con mas series x observaciones.")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', default=None, help="Archivo de resultados anterior para detectar regresiones.")
+    parser.add_argument('--threshold', type=float, default=0.1, help="Aumento relativo de latencia que se reporta como regresion.")
+    args = parser.parse_args(argv)
+
+    results = []
+    with MockServer() as server:
+        for n_observations in args.observations:
+            server.observations = n_observations
+            render.cache_clear()
+
+            for provider in args.providers:
+                for path in _paths(_make_connector(provider, server)):
+                    if args.paths is not None and path not in args.paths:
+                        continue
+                    for n_series in args.series:
+                        if n_series * n_observations > args.max_points:
+                            continue
+
+                        row = run_scenario(server, provider, path, n_series, n_observations, args.repeat)
+                        results.append(row)
+                        print(f"{provider:8s} {path:9s} series={n_series:<5d} obs={n_observations:<7d} "
+                              f"latencia={row['latency_median_s']*1000:9.1f} ms  conversion={row['parse_median_s']*1000:9.1f} ms  "
+                              f"concat={row['concat_median_s']*1000:8.1f} ms  memoria={row['peak_memory_bytes']/2**20:8.1f} MiB  "
+                              f"solicitudes={row['requests']:g}", flush=True)
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({'environment': _environment(), 'results': results}, file, indent=2)
+    print(f"Resultados escritos en {args.output}")
+
+    if args.baseline is not None:
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file)['results'], args.threshold)
+        for row in regressions:
+            print(f"REGRESION {row['provider']} {row['path']} series={row['series']} obs={row['observations']}: {row['ratio']:.2f}x")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
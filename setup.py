@@ -20,5 +20,11 @@ setup(
         "requests",
         "python-dotenv",
     ],
-    python_requires=">=3.6",  # Versión mínima de Python compatible
+    extras_require={
+        "stream": ["ijson"],  # Lectura incremental de respuestas grandes (get_series_data(..., stream=True))
+        "store": ["pyarrow"],  # Almacen local en Arrow/Parquet (ArrowStore)
+        "otel": ["opentelemetry-api"],  # Exportacion de solicitudes como spans (OpenTelemetryExporter)
+        "http2": ["httpx[http2]"],  # Transporte HTTP/2 opcional (ConnectionManager(http2=True))
+    },
+    python_requires=">=3.10",  # Versión mínima de Python compatible (anotaciones str | list y asyncio.to_thread)
 )